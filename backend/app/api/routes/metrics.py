@@ -0,0 +1,67 @@
+"""
+Prometheus metrics endpoint.
+"""
+from typing import Iterator
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import Sample, registry
+from app.services.admission import embedding_admission, llm_admission
+from app.services.agents import llm_singleflight
+from app.services.llm_cache import get_llm_cache
+from app.services.ollama_pool import get_embedding_pool, get_generation_pool
+from app.services.stage_memo import get_stage_memo
+from app.services.vector_store import get_vector_store
+from app.services.web_search import get_web_search
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _cache_samples(cache: str, hits: int, misses: int, entries: int) -> Iterator[Sample]:
+    labels = {"cache": cache}
+    lookups = hits + misses
+    yield "mapey_cache_hits_total", "counter", "Cache lookups answered from the cache", labels, hits
+    yield "mapey_cache_misses_total", "counter", "Cache lookups that missed", labels, misses
+    yield "mapey_cache_hit_ratio", "gauge", "Share of cache lookups that hit since startup", labels, hits / lookups if lookups else 0.0
+    yield "mapey_cache_entries", "gauge", "Entries currently cached", labels, entries
+
+
+def collect_service_metrics() -> Iterator[Sample]:
+    """Read gauges and counters the services already keep, at scrape time."""
+    store = get_vector_store()
+    yield "mapey_vector_store_vectors", "gauge", "Texts indexed in the vector store", {}, len(store.texts)
+    
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        yield from _cache_samples("llm", llm_cache.hits, llm_cache.misses, llm_cache.get_stats()["entries"])
+    stage_memo = get_stage_memo()
+    if stage_memo is not None:
+        yield from _cache_samples("stage_memo", stage_memo.hits, stage_memo.misses, stage_memo.get_stats()["entries"])
+    search = get_web_search()
+    if search is not None:
+        yield from _cache_samples("web_search", search.hits + search.stale_hits, search.misses, len(search.cache))
+    
+    coalescing = llm_singleflight.get_stats()
+    yield "mapey_llm_coalesced_calls_total", "counter", "LLM calls answered by an identical in-flight call", {}, coalescing["collapsed"]
+    
+    for controller in (llm_admission, embedding_admission):
+        labels = {"pool": controller.name}
+        yield "mapey_admission_active", "gauge", "Calls holding an admission slot", labels, controller.active
+        yield "mapey_admission_queue_depth", "gauge", "Calls waiting for an admission slot", labels, controller.waiting
+        yield "mapey_admission_rejected_total", "counter", "Calls rejected because the wait queue was full", labels, controller.rejected
+    
+    for pool in (get_generation_pool(), get_embedding_pool()):
+        stats = pool.get_stats()
+        yield "mapey_ollama_backends_healthy", "gauge", "Ollama backends currently in rotation", {"pool": pool.name}, stats["healthy_backends"]
+        for backend in stats["backends"]:
+            yield "mapey_ollama_backend_outstanding", "gauge", "Requests in progress per Ollama backend", {"pool": pool.name, "backend": backend["url"]}, backend["outstanding"]
+
+
+registry.add_collector(collect_service_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -4,13 +4,25 @@ API routes for roadmap generation.
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, AsyncGenerator
-from app.models.schemas import RoadmapRequest, RoadmapResponse, ErrorResponse
-from app.services.agents import roadmap_graph, MapeyState
+from app.models.schemas import RoadmapRequest, RoadmapResponse, ErrorResponse, JobRequest, JobResponse
+from app.services.admission import AdmissionRejected, check_admission, llm_admission, embedding_admission
+from app.services.agents import MapeyState, llm_singleflight
+from app.services.checkpoints import new_run_id, run_config, get_durable_graph, get_run_state, finish_run, restore_run_inputs
 from app.services.file_processor import read_resume_file, chunk_text
+from app.services.job_queue import get_job_queue
+from app.services.jobs import get_job_store, job_response
 from app.services.vector_store import get_vector_store
+from app.services.llm_cache import get_llm_cache
+from app.services.llm_metrics import llm_metrics, track_request_metrics
+from app.services.stage_memo import get_stage_memo
+from app.services.web_search import get_web_search
+from app.services.resource_catalog import get_resource_catalog
+from app.services.ollama_pool import get_generation_pool, get_embedding_pool
 from app.core.config import settings
 from app.core.auth import get_current_user
-from app.core.logging import get_logger
+from app.core.logging import bind_log_context, get_logger
+from app.core.metrics import GENERATIONS_IN_FLIGHT
+from app.core.webhooks import resolve_webhook_host
 import time
 import json
 import asyncio
@@ -20,6 +32,41 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/roadmap", tags=["roadmap"])
 
 
+def _run_failed(run_id: str, e: Exception) -> HTTPException:
+    """500 error pointing the client at the resume endpoint for a failed run."""
+    return HTTPException(
+        status_code=500,
+        detail=f"Internal server error: {str(e)}. Resume with POST /roadmap/runs/{run_id}/resume",
+        headers={"X-Run-ID": run_id}
+    )
+
+
+def _too_busy(e: AdmissionRejected, run_id: Optional[str] = None) -> HTTPException:
+    """429 error telling the client when to retry."""
+    headers = {"Retry-After": str(e.retry_after)}
+    if run_id:
+        headers["X-Run-ID"] = run_id
+    return HTTPException(
+        status_code=429,
+        detail=f"Server is busy ({str(e)}). Retry after {e.retry_after} seconds",
+        headers=headers
+    )
+
+
+def sse_event(data: dict) -> str:
+    """Serialise one Server-Sent Events message."""
+    return f"data: {json.dumps(data)}\n\n"
+
+
+def _admit() -> None:
+    """Reject a new generation with 429 while the LLM or embedding queue is full."""
+    try:
+        check_admission()
+    except AdmissionRejected as e:
+        logger.warning(f"Generation rejected by admission control: {str(e)}")
+        raise _too_busy(e)
+
+
 @router.post("/generate", response_model=RoadmapResponse)
 async def generate_roadmap(
     current_user: dict = Depends(get_current_user),
@@ -39,7 +86,10 @@ async def generate_roadmap(
         Complete roadmap with analysis, skill gaps, curriculum, and resources
     """
     request_id = f"req_{int(time.time() * 1000)}"
+    run_id = new_run_id()
     start_time = time.time()
+    bind_log_context(request_id=request_id, run_id=run_id)
+    llm_totals = track_request_metrics()
     
     logger.info(
         f"Roadmap generation request received",
@@ -51,7 +101,10 @@ async def generate_roadmap(
         }
     )
     
+    GENERATIONS_IN_FLIGHT.inc(kind="generate")
     try:
+        _admit()
+        
         # Validate file
         if not resume_file.filename:
             raise HTTPException(status_code=400, detail="No file provided")
@@ -73,7 +126,7 @@ async def generate_roadmap(
         
         # Process resume file
         logger.info(f"Processing resume file: {resume_file.filename}")
-        resume_text = read_resume_file(file_content, resume_file.filename)
+        resume_text = await asyncio.to_thread(read_resume_file, file_content, resume_file.filename)
         
         if len(resume_text.strip()) < 50:
             raise HTTPException(
@@ -84,25 +137,33 @@ async def generate_roadmap(
         # Add resume to vector store for RAG
         chunks = chunk_text(resume_text)
         vector_store = get_vector_store()
-        vector_store.add_texts(chunks)
+        await vector_store.aadd_texts(chunks)
         logger.info(f"Added {len(chunks)} resume chunks to vector store")
         
         # Prepare state for LangGraph
         initial_state: MapeyState = {
             "topic": topic.strip(),
             "resume": resume_text,
+            "resume_digest": "",
             "jd": jd or "",
             "analysis": "",
             "skill_gaps": "",
             "curriculum": "",
             "rag_context": "",
             "resources": "",
-            "roadmap": ""
+            "roadmap": "",
+            "deadline": time.time() + settings.GENERATION_DEADLINE_SECONDS,
+            "incomplete_stages": [],
+            "reused_stages": [],
+            "stage_models": {},
+            "structured": {}
         }
         
-        # Execute the roadmap generation graph
-        logger.info(f"Starting roadmap generation workflow")
-        result = roadmap_graph.invoke(initial_state)
+        # Execute the roadmap generation graph with durable checkpoints
+        logger.info(f"Starting roadmap generation workflow", extra={"run_id": run_id})
+        graph = await get_durable_graph()
+        result = await graph.ainvoke(initial_state, config=run_config(run_id))
+        await finish_run(run_id, result)
         
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -110,34 +171,26 @@ async def generate_roadmap(
             f"Roadmap generation completed successfully",
             extra={
                 "request_id": request_id,
-                "processing_time_seconds": round(processing_time, 2)
+                "processing_time_seconds": round(processing_time, 2),
+                "llm_metrics": llm_totals
             }
         )
         
-        # Return response
-        response = RoadmapResponse(
-            roadmap=result.get("roadmap", ""),
-            skill_gaps=result.get("skill_gaps", ""),
-            curriculum=result.get("curriculum", ""),
-            resources=result.get("resources", ""),
-            analysis=result.get("analysis"),
-            rag_context=result.get("rag_context")
-        )
-        
-        return response
+        return RoadmapResponse.from_state(result, run_id)
         
     except HTTPException:
         raise
+    except AdmissionRejected as e:
+        raise _too_busy(e, run_id)
     except Exception as e:
         logger.error(
             f"Error generating roadmap: {str(e)}",
             extra={"request_id": request_id},
             exc_info=True
         )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
-        )
+        raise _run_failed(run_id, e)
+    finally:
+        GENERATIONS_IN_FLIGHT.dec(kind="generate")
 
 
 @router.post("/generate-from-text", response_model=RoadmapResponse)
@@ -156,7 +209,10 @@ async def generate_roadmap_from_text(
         Complete roadmap with analysis, skill gaps, curriculum, and resources
     """
     request_id = f"req_{int(time.time() * 1000)}"
+    run_id = new_run_id()
     start_time = time.time()
+    bind_log_context(request_id=request_id, run_id=run_id)
+    llm_totals = track_request_metrics()
     
     logger.info(
         f"Roadmap generation from text request received",
@@ -167,30 +223,40 @@ async def generate_roadmap_from_text(
             "has_jd": request.jd is not None
         }
     )
+    _admit()
     
+    GENERATIONS_IN_FLIGHT.inc(kind="generate_from_text")
     try:
         # Add resume to vector store for RAG
         chunks = chunk_text(request.resume)
         vector_store = get_vector_store()
-        vector_store.add_texts(chunks)
+        await vector_store.aadd_texts(chunks)
         logger.info(f"Added {len(chunks)} resume chunks to vector store")
         
         # Prepare state for LangGraph
         initial_state: MapeyState = {
             "topic": request.topic,
             "resume": request.resume,
+            "resume_digest": "",
             "jd": request.jd or "",
             "analysis": "",
             "skill_gaps": "",
             "curriculum": "",
             "rag_context": "",
             "resources": "",
-            "roadmap": ""
+            "roadmap": "",
+            "deadline": time.time() + settings.GENERATION_DEADLINE_SECONDS,
+            "incomplete_stages": [],
+            "reused_stages": [],
+            "stage_models": {},
+            "structured": {}
         }
         
-        # Execute the roadmap generation graph
-        logger.info(f"Starting roadmap generation workflow")
-        result = roadmap_graph.invoke(initial_state)
+        # Execute the roadmap generation graph with durable checkpoints
+        logger.info(f"Starting roadmap generation workflow", extra={"run_id": run_id})
+        graph = await get_durable_graph()
+        result = await graph.ainvoke(initial_state, config=run_config(run_id))
+        await finish_run(run_id, result)
         
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -198,32 +264,24 @@ async def generate_roadmap_from_text(
             f"Roadmap generation completed successfully",
             extra={
                 "request_id": request_id,
-                "processing_time_seconds": round(processing_time, 2)
+                "processing_time_seconds": round(processing_time, 2),
+                "llm_metrics": llm_totals
             }
         )
         
-        # Return response
-        response = RoadmapResponse(
-            roadmap=result.get("roadmap", ""),
-            skill_gaps=result.get("skill_gaps", ""),
-            curriculum=result.get("curriculum", ""),
-            resources=result.get("resources", ""),
-            analysis=result.get("analysis"),
-            rag_context=result.get("rag_context")
-        )
-        
-        return response
+        return RoadmapResponse.from_state(result, run_id)
         
+    except AdmissionRejected as e:
+        raise _too_busy(e, run_id)
     except Exception as e:
         logger.error(
             f"Error generating roadmap: {str(e)}",
             extra={"request_id": request_id},
             exc_info=True
         )
-        raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
-        )
+        raise _run_failed(run_id, e)
+    finally:
+        GENERATIONS_IN_FLIGHT.dec(kind="generate_from_text")
 
 
 @router.post("/generate-from-text-stream")
@@ -235,14 +293,26 @@ async def generate_roadmap_from_text_stream(
     Generate a career roadmap with real-time progress streaming using Server-Sent Events.
     
     Returns progress updates as they happen, including percentage and current step description.
+    While an LLM stage is running, its output is forwarded token by token as
+    ``status: "streaming"`` events tagged with ``node`` and ``field`` (``analysis``,
+    ``skill_gaps``, ``curriculum`` or ``roadmap``) so clients can render each
+    section progressively. With ``STRUCTURED_OUTPUTS`` the skill gap and
+    curriculum stages generate JSON: their token events have ``format: "json"``
+    (otherwise ``"text"``), and the rendered markdown is in the final ``result``. The final event carries the ``result`` and has
+    ``status: "complete"``, or ``status: "partial"`` with ``incomplete_stages``
+    when some stages ran out of time.
     """
     async def event_generator() -> AsyncGenerator[str, None]:
         request_id = f"req_{int(time.time() * 1000)}"
+        run_id = new_run_id()
         start_time = time.time()
+        bind_log_context(request_id=request_id, run_id=run_id)
+        llm_totals = track_request_metrics()
         
+        GENERATIONS_IN_FLIGHT.inc(kind="stream")
         try:
             # Send initial progress
-            yield f"data: {json.dumps({'progress': 0, 'step': 'Initializing roadmap generation', 'status': 'processing'})}\n\n"
+            yield sse_event({'progress': 0, 'step': 'Initializing roadmap generation', 'status': 'processing', 'run_id': run_id})
             await asyncio.sleep(0.1)
             
             logger.info(
@@ -256,23 +326,24 @@ async def generate_roadmap_from_text_stream(
             )
             
             # Send progress update
-            yield f"data: {json.dumps({'progress': 5, 'step': 'Processing resume content', 'status': 'processing'})}\n\n"
+            yield sse_event({'progress': 5, 'step': 'Processing resume content', 'status': 'processing'})
             await asyncio.sleep(0.1)
             
             # Add resume to vector store for RAG
             chunks = chunk_text(request.resume)
             vector_store = get_vector_store()
-            vector_store.add_texts(chunks)
+            await vector_store.aadd_texts(chunks)
             logger.info(f"Added {len(chunks)} resume chunks to vector store")
             
             # Send progress update
-            yield f"data: {json.dumps({'progress': 8, 'step': f'Added {len(chunks)} knowledge chunks to context', 'status': 'processing'})}\n\n"
+            yield sse_event({'progress': 8, 'step': f'Added {len(chunks)} knowledge chunks to context', 'status': 'processing'})
             await asyncio.sleep(0.1)
             
             # Prepare state for LangGraph
             initial_state: MapeyState = {
                 "topic": request.topic,
                 "resume": request.resume,
+                "resume_digest": "",
                 "jd": request.jd or "",
                 "analysis": "",
                 "skill_gaps": "",
@@ -281,35 +352,64 @@ async def generate_roadmap_from_text_stream(
                 "resources": "",
                 "roadmap": "",
                 "progress": 10,
-                "current_step": "Starting workflow"
+                "current_step": "Starting workflow",
+                "deadline": time.time() + settings.GENERATION_DEADLINE_SECONDS,
+                "incomplete_stages": [],
+                "reused_stages": [],
+                "stage_models": {},
+                "structured": {}
             }
             
-            # Execute the roadmap generation graph in a thread
-            logger.info(f"Starting roadmap generation workflow")
+            # Execute the roadmap generation graph. "updates" events arrive as each
+            # node completes and carry the progress/current_step it reported;
+            # "custom" events carry LLM tokens as they are generated.
+            logger.info(f"Starting roadmap generation workflow", extra={"run_id": run_id})
             
-            # Track last progress to send updates
             last_progress = 10
-            
-            # Run the graph and periodically check for updates
-            # Since we can't easily stream from LangGraph, we'll poll the state
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(roadmap_graph.invoke, initial_state)
-                
-                # Poll for completion and send periodic updates
-                while not future.done():
-                    await asyncio.sleep(2)  # Check every 2 seconds
-                    # Send a heartbeat to keep connection alive
-                    current_progress = min(last_progress + 5, 95)
-                    yield f"data: {json.dumps({'progress': current_progress, 'step': 'Processing...', 'status': 'processing'})}\n\n"
-                    last_progress = current_progress
+            result = dict(initial_state)
+            graph = await get_durable_graph()
+            async for mode, chunk in graph.astream(
+                initial_state,
+                config=run_config(run_id),
+                stream_mode=["updates", "custom"]
+            ):
+                if mode == "custom":
+                    token_data = {
+                        "progress": last_progress,
+                        "step": f"Generating {chunk['field'].replace('_', ' ')}",
+                        "status": "streaming",
+                        "node": chunk["node"],
+                        "field": chunk["field"],
+                        "format": chunk.get("format", "text"),
+                        "token": chunk["token"]
+                    }
+                    yield sse_event(token_data)
+                    continue
                 
-                # Get the result
-                result = future.result()
+                for node, update in chunk.items():
+                    if not update:
+                        continue
+                    incomplete = result["incomplete_stages"] + update.get("incomplete_stages", [])
+                    reused = result["reused_stages"] + update.get("reused_stages", [])
+                    stage_models = {**result["stage_models"], **update.get("stage_models", {})}
+                    structured = {**result["structured"], **update.get("structured", {})}
+                    result.update(update)
+                    result["incomplete_stages"] = incomplete
+                    result["reused_stages"] = reused
+                    result["stage_models"] = stage_models
+                    result["structured"] = structured
+                    # Parallel nodes finish out of order; never move the bar backwards
+                    last_progress = max(last_progress, update.get("progress") or 0)
+                    result["progress"] = last_progress
+                    progress_data = {
+                        "progress": last_progress,
+                        "step": update.get("current_step") or f"{node.replace('_', ' ').capitalize()} complete",
+                        "status": "processing",
+                        "node": node
+                    }
+                    yield sse_event(progress_data)
             
-            # Send final progress
-            yield f"data: {json.dumps({'progress': 100, 'step': 'Roadmap generation complete!', 'status': 'processing'})}\n\n"
-            await asyncio.sleep(0.1)
+            await finish_run(run_id, result)
             
             # Calculate processing time
             processing_time = time.time() - start_time
@@ -317,26 +417,28 @@ async def generate_roadmap_from_text_stream(
                 f"Roadmap generation completed successfully",
                 extra={
                     "request_id": request_id,
-                    "processing_time_seconds": round(processing_time, 2)
+                    "processing_time_seconds": round(processing_time, 2),
+                    "llm_metrics": llm_totals
                 }
             )
             
-            # Send final result
+            # Send final result, with the same status as the non-streaming endpoints
+            response = RoadmapResponse.from_state(result, run_id)
+            if response.status == "partial":
+                step = f"Completed without {', '.join(s.replace('_', ' ') for s in response.incomplete_stages)} (deadline reached)"
+            else:
+                step = "Complete"
             response_data = {
                 "progress": 100,
-                "step": "Complete",
-                "status": "complete",
+                "step": step,
+                "status": response.status,
+                "incomplete_stages": response.incomplete_stages,
                 "result": {
-                    "roadmap": result.get("roadmap", ""),
-                    "skill_gaps": result.get("skill_gaps", ""),
-                    "curriculum": result.get("curriculum", ""),
-                    "resources": result.get("resources", ""),
-                    "analysis": result.get("analysis"),
-                    "rag_context": result.get("rag_context"),
+                    **response.model_dump(),
                     "processing_time": round(processing_time, 2)
                 }
             }
-            yield f"data: {json.dumps(response_data)}\n\n"
+            yield sse_event(response_data)
             
         except Exception as e:
             logger.error(
@@ -348,10 +450,16 @@ async def generate_roadmap_from_text_stream(
                 "progress": 0,
                 "step": f"Error: {str(e)}",
                 "status": "error",
-                "error": str(e)
+                "error": str(e),
+                "run_id": run_id
             }
-            yield f"data: {json.dumps(error_data)}\n\n"
+            if isinstance(e, AdmissionRejected):
+                error_data["retry_after"] = e.retry_after
+            yield sse_event(error_data)
+        finally:
+            GENERATIONS_IN_FLIGHT.dec(kind="stream")
     
+    _admit()
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
@@ -363,6 +471,99 @@ async def generate_roadmap_from_text_stream(
     )
 
 
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_roadmap_job(
+    request: JobRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Submit a roadmap generation job and return immediately.
+    
+    The job is queued for a worker (embedded in the API or a standalone
+    ``python -m mapey worker`` process); poll ``GET /roadmap/jobs/{job_id}``
+    for its status and result, or pass ``webhook_url`` to be notified with a
+    POST of the finished job.
+    """
+    if request.webhook_url:
+        try:
+            # Names like 127.0.0.1.nip.io pass URL validation but resolve to internal addresses
+            await resolve_webhook_host(request.webhook_url.host, request.webhook_url.port)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    store = get_job_store()
+    job = store.create(
+        request.model_dump(exclude={"webhook_url"}),
+        owner=current_user["sub"],
+        webhook_url=str(request.webhook_url) if request.webhook_url else None
+    )
+    get_job_queue().enqueue(job["id"])
+    logger.info(f"Roadmap job queued", extra={"job_id": job["id"], "topic": request.topic})
+    return job_response(job)
+
+
+@router.get("/job-queue/stats")
+async def get_job_queue_stats():
+    """Get the depth of the shared job queue."""
+    return get_job_queue().get_stats()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_roadmap_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """Get the status of a roadmap generation job, including its result once completed."""
+    job = get_job_store().get(job_id)
+    if job is None or job["owner"] != current_user["sub"]:
+        raise HTTPException(status_code=404, detail=f"No job found with ID {job_id}")
+    return job_response(job)
+
+
+@router.post("/runs/{run_id}/resume", response_model=RoadmapResponse)
+async def resume_roadmap(
+    run_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Resume a failed or interrupted roadmap generation from its last checkpoint.
+    
+    Stages that already completed are not re-run; only the failed node and
+    everything downstream of it are executed. A run that finished with
+    incomplete stages keeps its checkpoints until ``CHECKPOINT_TTL_SECONDS``
+    expire and returns its stored partial result.
+    
+    Args:
+        run_id: Run ID returned by a generation endpoint (``X-Run-ID`` header or ``run_id`` field)
+        
+    Returns:
+        Complete roadmap with analysis, skill gaps, curriculum, and resources
+    """
+    snapshot = await get_run_state(run_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No resumable run found with ID {run_id}")
+    
+    bind_log_context(run_id=run_id)
+    logger.info(f"Resuming roadmap generation", extra={"pending_nodes": list(snapshot.next)})
+    _admit()
+    GENERATIONS_IN_FLIGHT.inc(kind="resume")
+    try:
+        result = snapshot.values
+        if snapshot.next:
+            await restore_run_inputs(snapshot)
+            graph = await get_durable_graph()
+            deadline = time.time() + settings.GENERATION_DEADLINE_SECONDS
+            result = await graph.ainvoke(None, config=run_config(run_id, deadline=deadline))
+        await finish_run(run_id, result)
+        return RoadmapResponse.from_state(result, run_id)
+    except AdmissionRejected as e:
+        raise _too_busy(e, run_id)
+    except Exception as e:
+        logger.error(f"Error resuming roadmap run: {str(e)}", extra={"run_id": run_id}, exc_info=True)
+        raise _run_failed(run_id, e)
+    finally:
+        GENERATIONS_IN_FLIGHT.dec(kind="resume")
+
+
 @router.get("/vector-store/stats")
 async def get_vector_store_stats():
     """Get statistics about the vector store."""
@@ -386,3 +587,109 @@ async def clear_vector_store():
     except Exception as e:
         logger.error(f"Error clearing vector store: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@router.get("/llm-cache/stats")
+async def get_llm_cache_stats():
+    """Get hit/miss statistics about the LLM response cache."""
+    try:
+        cache = get_llm_cache()
+        if cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **cache.get_stats()}
+    except Exception as e:
+        logger.error(f"Error getting LLM cache stats: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stage-memo/stats")
+async def get_stage_memo_stats():
+    """Get hit/miss statistics about reused stage outputs."""
+    try:
+        memo = get_stage_memo()
+        if memo is None:
+            return {"enabled": False}
+        return {"enabled": True, **memo.get_stats()}
+    except Exception as e:
+        logger.error(f"Error getting stage memo stats: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/web-search/stats")
+async def get_web_search_stats():
+    """Get hit/miss statistics about the web search result cache."""
+    search = get_web_search()
+    if search is None:
+        return {"enabled": False}
+    return {"enabled": True, **search.get_stats()}
+
+
+@router.get("/resource-catalog/stats")
+async def get_resource_catalog_stats():
+    """Get statistics about the local resource catalog index."""
+    catalog = get_resource_catalog()
+    if catalog is None:
+        return {"enabled": False}
+    return {"enabled": True, "mode": settings.RESOURCE_CATALOG_MODE, **catalog.get_stats()}
+
+
+@router.get("/llm-metrics/stats")
+async def get_llm_metrics_stats():
+    """
+    Get rolling per-node LLM histograms: wall time, time to first token,
+    prompt/output tokens and tokens/sec, with call counts by source.
+    """
+    return llm_metrics.get_stats()
+
+
+@router.get("/llm-coalescing/stats")
+async def get_llm_coalescing_stats():
+    """Get statistics about LLM calls collapsed into shared in-flight requests."""
+    return llm_singleflight.get_stats()
+
+
+@router.get("/admission/stats")
+async def get_admission_stats():
+    """Get concurrency and queue depth of the LLM and embedding admission controllers."""
+    return {
+        "llm": llm_admission.get_stats(),
+        "embedding": embedding_admission.get_stats(),
+    }
+
+
+@router.get("/ollama/backends")
+async def get_ollama_backends():
+    """Get health and load of the Ollama generation and embedding backends."""
+    return {
+        "generation": get_generation_pool().get_stats(),
+        "embedding": get_embedding_pool().get_stats(),
+    }
+
+
+@router.post("/llm-cache/clear")
+async def clear_llm_cache():
+    """Clear all cached LLM responses."""
+    try:
+        cache = get_llm_cache()
+        if cache is not None:
+            cache.clear()
+        logger.info("LLM response cache cleared via API")
+        return {"message": "LLM response cache cleared successfully"}
+    except Exception as e:
+        logger.error(f"Error clearing LLM cache: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stage-memo/clear")
+async def clear_stage_memo():
+    """Clear all stored stage outputs, forcing every stage to recompute."""
+    try:
+        memo = get_stage_memo()
+        if memo is not None:
+            memo.clear()
+        logger.info("Stage memo cleared via API")
+        return {"message": "Stored stage outputs cleared successfully"}
+    except Exception as e:
+        logger.error(f"Error clearing stage memo: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
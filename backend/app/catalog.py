@@ -0,0 +1,53 @@
+"""
+Local resource catalog maintenance.
+
+Rebuilds the BM25 index of the resource catalog after the data file changed,
+or runs a search against it to check the ranking.
+
+Usage (from the backend directory):
+    python -m app.catalog [rebuild] [--source PATH] [--output PATH]
+    python -m app.catalog search QUERY [--kind course|project|interview] [-k N]
+"""
+import argparse
+import time
+from app.core.config import settings
+from app.core.logging import setup_logging, get_logger
+from app.services.resource_catalog import RESOURCE_KINDS, ResourceCatalog, catalog_source_path, rebuild_index
+
+logger = get_logger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mapey resource catalog")
+    commands = parser.add_subparsers(dest="command")
+
+    rebuild = commands.add_parser("rebuild", help="Build the index from the catalog data file (default)")
+    rebuild.add_argument("--source", default=None, help="Catalog data file (default: RESOURCE_CATALOG_PATH)")
+    rebuild.add_argument("--output", default=None, help="Index file (default: RESOURCE_CATALOG_INDEX_PATH)")
+
+    search = commands.add_parser("search", help="Search the catalog")
+    search.add_argument("query", help="Query, e.g. a target role")
+    search.add_argument("--kind", choices=RESOURCE_KINDS, default=None, help="Only this kind of resource")
+    search.add_argument("-k", type=int, default=settings.SEARCH_MAX_RESULTS, help="Number of results")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.command == "search":
+        catalog = ResourceCatalog.from_file(catalog_source_path())
+        started_at = time.perf_counter()
+        results = catalog.search(args.query, k=args.k, kind=args.kind)
+        elapsed_us = (time.perf_counter() - started_at) * 1e6
+        for r in results:
+            print(f"{r['score']:7.3f}  [{r['kind']}] {r['title']} - {r['url']}")
+        print(f"{len(results)} results in {elapsed_us:.0f} us")
+        return
+
+    source = getattr(args, "source", None) or catalog_source_path()
+    output = getattr(args, "output", None) or settings.RESOURCE_CATALOG_INDEX_PATH
+    catalog = rebuild_index(source, output)
+    stats = catalog.get_stats()
+    logger.info(f"Indexed {stats['resources']} resources ({stats['terms']} terms) from {source} into {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Uses pydantic-settings for environment variable management.
 """
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 import os
 
 
@@ -25,9 +25,114 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_TEMPERATURE: float = 0.4
     OLLAMA_NUM_CTX: int = 4096
+    OLLAMA_NUM_PREDICT: Optional[int] = None  # Max tokens per answer (None = model default)
+    OLLAMA_KEEP_ALIVE: str = "30m"  # How long Ollama keeps models loaded after a request
+    
+    # Per-stage LLM overrides; unset values fall back to the OLLAMA_* defaults above
+    RESUME_CONDENSER_MODEL: Optional[str] = None
+    RESUME_CONDENSER_TEMPERATURE: Optional[float] = None
+    RESUME_CONDENSER_NUM_CTX: Optional[int] = None
+    RESUME_CONDENSER_NUM_PREDICT: Optional[int] = None
+    TOPIC_ANALYZER_MODEL: Optional[str] = None
+    TOPIC_ANALYZER_TEMPERATURE: Optional[float] = None
+    TOPIC_ANALYZER_NUM_CTX: Optional[int] = None
+    TOPIC_ANALYZER_NUM_PREDICT: Optional[int] = None
+    SKILL_GAP_AGENT_MODEL: Optional[str] = None
+    SKILL_GAP_AGENT_TEMPERATURE: Optional[float] = None
+    SKILL_GAP_AGENT_NUM_CTX: Optional[int] = None
+    SKILL_GAP_AGENT_NUM_PREDICT: Optional[int] = None
+    CURRICULUM_PLANNER_MODEL: Optional[str] = None
+    CURRICULUM_PLANNER_TEMPERATURE: Optional[float] = None
+    CURRICULUM_PLANNER_NUM_CTX: Optional[int] = None
+    CURRICULUM_PLANNER_NUM_PREDICT: Optional[int] = None
+    VALIDATOR_MODEL: Optional[str] = None
+    VALIDATOR_TEMPERATURE: Optional[float] = None
+    VALIDATOR_NUM_CTX: Optional[int] = None
+    VALIDATOR_NUM_PREDICT: Optional[int] = None
+    
+    # Ollama backend pools - comma-separated base URLs. Generation falls back to
+    # OLLAMA_BASE_URL and embeddings fall back to the generation backends.
+    OLLAMA_GENERATION_URLS: Union[str, list[str]] = ""
+    OLLAMA_EMBEDDING_URLS: Union[str, list[str]] = ""
+    OLLAMA_BACKEND_FAILURE_THRESHOLD: int = 3  # Consecutive failures before a backend is skipped
+    OLLAMA_BACKEND_COOLDOWN_SECONDS: float = 30.0
+    
+    # Admission control: concurrent calls (match Ollama's parallel slots summed
+    # over the backends) and how many more may wait before requests get a 429
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_MAX_QUEUE: int = 32
+    EMBED_MAX_CONCURRENCY: int = 8
+    EMBED_MAX_QUEUE: int = 64
+    
+    # Prompt budgeting: tokens kept free for the answer (capped at half of
+    # OLLAMA_NUM_CTX) and the characters-per-token estimate used to count tokens
+    PROMPT_RESERVED_OUTPUT_TOKENS: int = 1024
+    PROMPT_CHARS_PER_TOKEN: float = 4.0
+    
+    # Resumes longer than this are condensed (chunked, summarised in parallel)
+    # into a skills/experience digest before the skill gap stage
+    RESUME_CONDENSE_THRESHOLD_TOKENS: int = 1500
+    RESUME_CONDENSE_CHUNK_WORDS: int = 400
+    
+    # Skill gap and curriculum stages answer in Ollama JSON mode and hand the
+    # next stages compact JSON instead of prose
+    STRUCTURED_OUTPUTS: bool = True
+    
+    # Per-node LLM metrics: observations kept per rolling histogram
+    LLM_METRICS_WINDOW: int = 500
+    
+    # Time limits: end-to-end deadline per generation and max time per stage
+    GENERATION_DEADLINE_SECONDS: float = 600.0
+    STAGE_TIMEOUT_SECONDS: float = 300.0
+    
+    # LLM response cache (SQLite, keyed by prompt + model parameters)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "cache/llm_cache.sqlite3"
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # 1 week
+    
+    # Stage output reuse (SQLite, keyed by a content hash of each node's inputs)
+    STAGE_MEMO_ENABLED: bool = True
+    STAGE_MEMO_PATH: str = "cache/stage_memo.sqlite3"
+    STAGE_MEMO_MAX_ENTRIES: int = 2000
+    STAGE_MEMO_TTL_SECONDS: int = 24 * 3600  # 1 day
+    
+    # Durable graph checkpoints (resumable runs)
+    CHECKPOINT_DB_PATH: str = "cache/checkpoints.sqlite3"
+    CHECKPOINT_TTL_SECONDS: int = 24 * 3600  # Failed/partial runs stay resumable this long (0 = forever)
+    
+    # Asynchronous generation jobs. JOBS_DB_PATH holds the job store and the
+    # job queue shared with standalone workers; JOB_WORKERS is the concurrency
+    # of the worker embedded in the API (0 disables it).
+    JOBS_DB_PATH: str = "cache/jobs.sqlite3"
+    JOB_WORKERS: int = 2
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = 60.0  # Lease length, extended while a job runs
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    JOB_WEBHOOK_RETRIES: int = 3
+    # Webhooks may only target public addresses; listed hosts are allowed even if internal
+    JOB_WEBHOOK_ALLOWED_HOSTS: Union[str, list[str]] = ""
     
     # Tavily API
     TAVILY_API_KEY: Optional[str] = None
+    TAVILY_BASE_URL: str = "https://api.tavily.com"  # Point at a stand-in server for offline runs
+    
+    # Web search: results per query, request timeout and the persistent result
+    # cache (fresh for the TTL, then served stale while refreshing for STALE seconds)
+    SEARCH_MAX_RESULTS: int = 5
+    SEARCH_TIMEOUT_SECONDS: float = 10.0
+    SEARCH_CACHE_PATH: str = "cache/search_cache.sqlite3"
+    SEARCH_CACHE_TTL_SECONDS: int = 24 * 3600  # 1 day
+    SEARCH_CACHE_STALE_SECONDS: int = 7 * 24 * 3600  # 1 week
+    SEARCH_CACHE_MAX_ENTRIES: int = 5000
+    
+    # Local resource catalog (courses, projects, interview prep) searched with BM25.
+    # 'primary' answers from the catalog and searches the web only where it has
+    # no match, 'fallback' uses it when web search is unavailable or fails.
+    RESOURCE_CATALOG_MODE: Literal["primary", "fallback", "off"] = "fallback"
+    RESOURCE_CATALOG_PATH: Optional[str] = None  # None = bundled app/data/resource_catalog.json
+    RESOURCE_CATALOG_INDEX_PATH: str = "cache/resource_catalog_index.json"
     
     # Embedding Model
     EMBED_MODEL_NAME: str = "nomic-embed-text"  # Ollama's standard embedding model (274MB, high quality)
@@ -36,6 +141,12 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # 'json' or 'text'
     
+    # Tracing: spans exported as OTLP JSON to a local file or an OTLP/HTTP collector
+    TRACING_EXPORTER: Literal["none", "file", "otlp"] = "none"
+    TRACING_FILE_PATH: str = "logs/traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SERVICE_NAME: str = "mapey-backend"
+    
     # Vector Store
     VECTOR_STORE_INDEX_PATH: Optional[str] = None  # Optional: persist index to disk
     
@@ -54,6 +165,22 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(",") if origin.strip()]
         return v
     
+    @field_validator("OLLAMA_GENERATION_URLS", "OLLAMA_EMBEDDING_URLS", mode="before")
+    @classmethod
+    def parse_ollama_urls(cls, v):
+        """Parse comma-separated Ollama backend URLs into list."""
+        if isinstance(v, str):
+            return [url.strip() for url in v.split(",") if url.strip()]
+        return v
+    
+    @field_validator("JOB_WEBHOOK_ALLOWED_HOSTS", mode="before")
+    @classmethod
+    def parse_webhook_hosts(cls, v):
+        """Parse comma-separated webhook hosts into list."""
+        if isinstance(v, str):
+            return [host.strip() for host in v.split(",") if host.strip()]
+        return v
+    
     @field_validator("ALLOWED_EXTENSIONS", mode="before")
     @classmethod
     def parse_allowed_extensions(cls, v):
@@ -5,11 +5,37 @@ Supports both JSON and text formats for structured logging.
 import logging
 import sys
 import json
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 from app.core.config import settings
 
+# Fields attached to every log record emitted while handling a request
+_log_context: ContextVar[Optional[dict]] = ContextVar("log_context", default=None)
+
+
+def bind_log_context(**fields: Any) -> dict:
+    """
+    Add fields (e.g. ``request_id``) to every log record emitted from the current
+    context from now on, including graph nodes and tasks started from it.
+    """
+    context = {**(_log_context.get() or {}), **fields}
+    _log_context.set(context)
+    return context
+
+
+class LogContextFilter(logging.Filter):
+    """Copies the bound log context onto records that do not set those fields themselves."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if context:
+            for key, value in context.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return True
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
@@ -47,7 +73,7 @@ class JSONFormatter(logging.Formatter):
             if key not in reserved_fields and not key.startswith("_"):
                 try:
                     # Convert value to string, handling various types
-                    if isinstance(value, (str, int, float, bool, type(None))):
+                    if isinstance(value, (str, int, float, bool, type(None), dict, list)):
                         log_data[key] = value
                     else:
                         log_data[key] = str(value)
@@ -55,7 +81,7 @@ class JSONFormatter(logging.Formatter):
                     # Skip fields that can't be serialized
                     pass
         
-        return json.dumps(log_data)
+        return json.dumps(log_data, default=str)
 
 
 def setup_logging() -> None:
@@ -88,22 +114,27 @@ def setup_logging() -> None:
     # Clear existing handlers
     root_logger.handlers.clear()
     
+    context_filter = LogContextFilter()
+    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(console_formatter)
+    console_handler.addFilter(context_filter)
     root_logger.addHandler(console_handler)
     
     # File handler for all logs
     file_handler = logging.FileHandler(log_dir / "app.log")
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
+    file_handler.addFilter(context_filter)
     root_logger.addHandler(file_handler)
     
     # Error file handler (errors and above)
     error_handler = logging.FileHandler(log_dir / "errors.log")
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
+    error_handler.addFilter(context_filter)
     root_logger.addHandler(error_handler)
     
     # Suppress noisy loggers
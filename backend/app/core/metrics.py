@@ -0,0 +1,224 @@
+"""
+Prometheus metrics in the text exposition format.
+
+A small in-process registry of counters, gauges and histograms. Recording a
+value is a dictionary lookup and a few additions under a lock, so it can sit
+on hot paths. Values that already live elsewhere (cache hit counts, vector
+store size, admission queues) are not tracked twice: collectors registered
+with :meth:`MetricsRegistry.add_collector` read them when ``/metrics`` is scraped.
+"""
+import bisect
+import math
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds: sub-millisecond HTTP handlers up to multi-minute generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# A scrape-time sample: (metric name, type, help, labels, value)
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        return lines + self._render_samples()
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(k))} {_format_value(v)}" for k, v in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        """Count the enclosed block as in progress."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts (non-cumulative, last is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            values = [(k, list(counts), total, count) for k, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, counts, total, count in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, n in zip([*self.buckets, math.inf], counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered together on ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Add a function that yields samples read from elsewhere at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+
+        # Samples of one metric must be contiguous, whichever collector produced them
+        families: Dict[str, List[str]] = {}
+        for collector in self._collectors:
+            for name, type_, help, labels, value in collector():
+                if name not in families:
+                    families[name] = [f"# HELP {name} {help}", f"# TYPE {name} {type_}"]
+                families[name].append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for family in families.values():
+            lines += family
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "mapey_http_request_duration_seconds",
+    "HTTP request latency by route (time to response headers for streams)",
+    ["method", "route", "status"],
+)
+GENERATIONS_IN_FLIGHT = registry.gauge(
+    "mapey_generations_in_flight",
+    "Roadmap generations currently running",
+    ["kind"],
+)
+LLM_STAGE_DURATION = registry.histogram(
+    "mapey_llm_stage_duration_seconds",
+    "Wall time of LLM calls per graph stage",
+    ["node", "source"],
+)
+LLM_TIME_TO_FIRST_TOKEN = registry.histogram(
+    "mapey_llm_time_to_first_token_seconds",
+    "Time from sending a generation to Ollama until its first token",
+    ["node"],
+)
+LLM_PROMPT_TOKENS = registry.counter(
+    "mapey_llm_prompt_tokens_total",
+    "Prompt tokens evaluated by Ollama per graph stage",
+    ["node"],
+)
+LLM_OUTPUT_TOKENS = registry.counter(
+    "mapey_llm_output_tokens_total",
+    "Tokens generated by Ollama per graph stage",
+    ["node"],
+)
+LLM_EVAL_SECONDS = registry.counter(
+    "mapey_llm_eval_seconds_total",
+    "Seconds Ollama spent generating tokens per graph stage (output tokens / this = tokens/sec)",
+    ["node"],
+)
+EMBEDDING_DURATION = registry.histogram(
+    "mapey_embedding_duration_seconds",
+    "Latency of Ollama embedding calls",
+)
@@ -0,0 +1,338 @@
+"""
+Request tracing with OpenTelemetry-style spans.
+
+A span covers one operation (an HTTP request, PDF parsing, embedding, a web
+search, a graph node, an LLM call) and records its start and end time,
+attributes and status. The active span is kept in a context variable, so
+spans opened while another is active become its children, including across
+``await``, graph nodes and threads started with a copied context. The HTTP
+middleware continues the caller's trace when it sends a W3C ``traceparent``
+header.
+
+Finished spans are batched on a background thread and exported in the OTLP
+JSON encoding, either appended to a local JSON-lines file (one export
+request per line) or POSTed to an OTLP/HTTP collector's ``/v1/traces``.
+With ``TRACING_EXPORTER=none`` spans are not recorded at all.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import httpx
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str] = None, kind: str = "internal", start_ns: Optional[int] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def update_name(self, name: str) -> None:
+        self.name = name
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def record_exception(self, error: BaseException) -> None:
+        """Mark the span as failed."""
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value for this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        """The span in the OTLP JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class _NoopSpan:
+    """Span handed out when tracing is disabled; every method does nothing."""
+
+    trace_id = ""
+    span_id = ""
+
+    def update_name(self, name: str) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """``(trace_id, parent_span_id)`` from a W3C ``traceparent`` header, or ``None`` if absent or invalid."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2]
+
+
+class SpanExporter(ABC):
+    """Destination for batches of finished spans."""
+
+    @abstractmethod
+    def export(self, payload: dict) -> None:
+        """Send one OTLP ``ExportTraceServiceRequest``."""
+
+    def shutdown(self) -> None:
+        """Release the exporter's resources."""
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends each export request as one JSON line to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, payload: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """POSTs export requests to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, payload: dict) -> None:
+        self._client.post(self.endpoint, json=payload).raise_for_status()
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+class Tracer:
+    """Creates spans and exports finished ones in batches from a background thread."""
+
+    def __init__(self, exporter: SpanExporter, service_name: str, max_batch: int = 256, flush_interval: float = 2.0, max_queue: int = 10000):
+        """
+        Args:
+            exporter: Where finished spans are sent
+            service_name: ``service.name`` resource attribute
+            max_batch: Spans per export request
+            flush_interval: Seconds between exports while spans are pending
+            max_queue: Finished spans buffered before new ones are dropped
+        """
+        self.exporter = exporter
+        self.service_name = service_name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def finish(self, span: Span) -> None:
+        """Queue a finished span for export; never blocks the caller."""
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _payload(self, spans: List[Span]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "mapey"}, "spans": [s.to_otlp() for s in spans]}],
+            }]
+        }
+
+    def _export(self, spans: List[Span]) -> None:
+        try:
+            self.exporter.export(self._payload(spans))
+            self.exported += len(spans)
+        except Exception as e:
+            self.failed += len(spans)
+            logger.warning(f"Exporting {len(spans)} spans failed: {str(e)}")
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                self._export(batch)
+
+    def shutdown(self) -> None:
+        """Export the remaining spans and stop the background thread."""
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self.exporter.shutdown()
+
+    def get_stats(self) -> dict:
+        return {
+            "exporter": type(self.exporter).__name__,
+            "pending": self._queue.qsize(),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# Global tracer - lazy initialization (``None`` when tracing is disabled)
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Get or create the global tracer, or ``None`` if tracing is disabled."""
+    global _tracer
+    if settings.TRACING_EXPORTER == "none":
+        return None
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                if settings.TRACING_EXPORTER == "otlp":
+                    exporter: SpanExporter = OTLPHttpSpanExporter(settings.TRACING_OTLP_ENDPOINT)
+                else:
+                    exporter = FileSpanExporter(settings.TRACING_FILE_PATH)
+                _tracer = Tracer(exporter, settings.TRACING_SERVICE_NAME)
+                logger.info(f"Tracing enabled ({settings.TRACING_EXPORTER} exporter)")
+    return _tracer
+
+
+def shutdown_tracing() -> None:
+    """Flush and stop the global tracer."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.shutdown()
+        _tracer = None
+
+
+def current_span() -> Optional[Span]:
+    """The span active in the current context, if any."""
+    return _current_span.get()
+
+
+@contextmanager
+def trace_span(name: str, kind: str = "internal", traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Record the enclosed block as a span, a child of the active span.
+
+    Args:
+        name: Operation name
+        kind: "internal", "server" (incoming request), "client" (outgoing call) or "consumer" (queued job)
+        traceparent: W3C header of a remote parent; only used when no span is active
+        **attributes: Initial span attributes
+
+    Exceptions escaping the block mark the span as failed and are re-raised.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    parent = _current_span.get()
+    if parent is not None:
+        span = Span(name, parent.trace_id, parent.span_id, kind)
+    else:
+        remote = parse_traceparent(traceparent)
+        trace_id, parent_id = remote if remote else (os.urandom(16).hex(), None)
+        span = Span(name, trace_id, parent_id, kind)
+    span.attributes.update(attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        tracer.finish(span)
+
+
+def record_span(name: str, duration_seconds: float, error: Optional[BaseException] = None, **attributes: Any) -> None:
+    """Record an operation that just finished and took ``duration_seconds`` as a child of the active span."""
+    tracer = get_tracer()
+    parent = _current_span.get()
+    if tracer is None or parent is None:
+        return
+    end_ns = time.time_ns()
+    span = Span(name, parent.trace_id, parent.span_id, start_ns=end_ns - int(duration_seconds * 1e9))
+    span.end_ns = end_ns
+    span.attributes.update(attributes)
+    if error is not None:
+        span.record_exception(error)
+    tracer.finish(span)
@@ -0,0 +1,110 @@
+"""
+Target checks for job completion webhooks.
+
+Webhook URLs come from API clients, so without checks a job could make the
+server POST to itself, to other internal services or to a cloud metadata
+endpoint. Webhooks may only reach public addresses, unless their host is
+listed in ``JOB_WEBHOOK_ALLOWED_HOSTS`` (e.g. a receiver on the internal
+network). A host name's addresses are checked when the job is submitted
+and again before each delivery, and the delivery then connects to exactly
+the address that was checked (see :class:`PinnedAddressTransport`), so a DNS
+answer that changes between the check and the request cannot redirect it.
+"""
+import asyncio
+import ipaddress
+import socket
+from typing import Optional
+import httpx
+from app.core.config import settings
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable (not private, loopback, link-local, reserved or multicast)."""
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _literal_address(host: str) -> Optional[str]:
+    """The host as an IP address string if it is one, otherwise ``None``."""
+    host = host.strip("[]")
+    try:
+        return str(ipaddress.ip_address(host))
+    except ValueError:
+        return None
+
+
+def is_allowed_host(host: str) -> bool:
+    """Whether ``host`` is listed in ``JOB_WEBHOOK_ALLOWED_HOSTS``."""
+    return host.lower() in {h.lower() for h in settings.JOB_WEBHOOK_ALLOWED_HOSTS}
+
+
+def check_webhook_host(host: Optional[str]) -> None:
+    """
+    Reject a webhook host that is a non-public IP address or ``localhost``.
+
+    Raises:
+        ValueError: If the host may not receive webhooks
+    """
+    if not host:
+        raise ValueError("webhook_url must include a host")
+    if is_allowed_host(host):
+        return
+    name = host.lower().rstrip(".")
+    if name == "localhost" or name.endswith(".localhost"):
+        raise ValueError("webhook_url must not point to localhost")
+    address = _literal_address(host)
+    if address is not None and not is_public_address(address):
+        raise ValueError("webhook_url must not point to a private, loopback or link-local address")
+
+
+async def resolve_webhook_host(host: str, port: Optional[int]) -> Optional[str]:
+    """
+    Check every address ``host`` currently resolves to.
+
+    Returns:
+        The vetted address to connect to, or ``None`` for hosts in ``JOB_WEBHOOK_ALLOWED_HOSTS``
+
+    Raises:
+        ValueError: If the host may not receive webhooks, does not resolve or
+            resolves to a non-public address
+    """
+    check_webhook_host(host)
+    if is_allowed_host(host):
+        return None
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host.strip("[]"), port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise ValueError(f"webhook host {host} does not resolve: {str(e)}") from e
+    if not infos:
+        raise ValueError(f"webhook host {host} does not resolve")
+    for *_, sockaddr in infos:
+        if not is_public_address(sockaddr[0]):
+            raise ValueError(f"webhook host {host} resolves to non-public address {sockaddr[0]}")
+    return infos[0][4][0]
+
+
+class PinnedAddressTransport(httpx.AsyncHTTPTransport):
+    """
+    Transport that connects to a fixed IP address instead of resolving the URL's host.
+
+    The request keeps its original ``Host`` header, and TLS uses the original
+    host name for SNI and certificate verification.
+    """
+
+    def __init__(self, address: str, **kwargs):
+        super().__init__(**kwargs)
+        self.address = address
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        request.url = request.url.copy_with(host=self.address)
+        request.extensions = {**request.extensions, "sni_hostname": host}
+        return await super().handle_async_request(request)
+
+
+def webhook_client(address: Optional[str], timeout: float) -> httpx.AsyncClient:
+    """HTTP client for webhook deliveries, pinned to ``address`` when given; redirects are never followed."""
+    transport = PinnedAddressTransport(address) if address else None
+    return httpx.AsyncClient(timeout=timeout, transport=transport, follow_redirects=False)
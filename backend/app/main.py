@@ -6,10 +6,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+import asyncio
 import time
 from app.core.config import settings
-from app.core.logging import setup_logging, get_logger
-from app.api.routes import roadmap, health
+from app.core.logging import bind_log_context, setup_logging, get_logger
+from app.core.metrics import HTTP_REQUEST_DURATION
+from app.core.tracing import shutdown_tracing, trace_span
+from app.api.routes import roadmap, health, metrics
 from app.models.schemas import ErrorResponse
 
 # Setup logging first
@@ -36,6 +39,12 @@ app.add_middleware(
 )
 
 
+def _route_label(request: Request) -> str:
+    """Route template of a request (``/api/v1/roadmap/jobs/{job_id}``), so metrics are not split by path parameters."""
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -43,8 +52,9 @@ async def log_requests(request: Request, call_next):
     start_time = time.time()
     request_id = f"req_{int(start_time * 1000)}"
     
-    # Add request ID to request state
+    # Add request ID to request state and to every log record of the request
     request.state.request_id = request_id
+    bind_log_context(request_id=request_id)
     
     logger.info(
         f"Request received",
@@ -56,36 +66,53 @@ async def log_requests(request: Request, call_next):
         }
     )
     
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        logger.info(
-            f"Request completed",
-            extra={
-                "request_id": request_id,
-                "status_code": response.status_code,
-                "process_time_seconds": round(process_time, 3)
-            }
-        )
-        
-        # Add process time header
-        response.headers["X-Process-Time"] = str(process_time)
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(
-            f"Request failed",
-            extra={
-                "request_id": request_id,
-                "error": str(e),
-                "process_time_seconds": round(process_time, 3)
-            },
-            exc_info=True
-        )
-        raise
+    with trace_span(
+        f"HTTP {request.method}",
+        kind="server",
+        traceparent=request.headers.get("traceparent"),
+        **{"http.method": request.method, "http.target": request.url.path, "request_id": request_id}
+    ) as span:
+        if span.trace_id:
+            bind_log_context(trace_id=span.trace_id)
+        try:
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            route = _route_label(request)
+            HTTP_REQUEST_DURATION.observe(process_time, method=request.method, route=route, status=response.status_code)
+            # Streams end this span at the response headers, like the latency metric
+            span.update_name(f"HTTP {request.method} {route}")
+            span.set_attributes({"http.route": route, "http.status_code": response.status_code})
+            
+            logger.info(
+                f"Request completed",
+                extra={
+                    "request_id": request_id,
+                    "status_code": response.status_code,
+                    "process_time_seconds": round(process_time, 3)
+                }
+            )
+            
+            # Add process time header
+            response.headers["X-Process-Time"] = str(process_time)
+            response.headers["X-Request-ID"] = request_id
+            if span.trace_id:
+                response.headers["traceparent"] = span.traceparent
+            
+            return response
+        except Exception as e:
+            process_time = time.time() - start_time
+            HTTP_REQUEST_DURATION.observe(process_time, method=request.method, route=_route_label(request), status=500)
+            span.set_attribute("http.status_code", 500)
+            logger.error(
+                f"Request failed",
+                extra={
+                    "request_id": request_id,
+                    "error": str(e),
+                    "process_time_seconds": round(process_time, 3)
+                },
+                exc_info=True
+            )
+            raise
 
 
 # Exception handlers
@@ -104,7 +131,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         content=ErrorResponse(
             error=exc.detail,
             code=f"HTTP_{exc.status_code}"
-        ).model_dump()
+        ).model_dump(),
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -150,6 +178,7 @@ async def general_exception_handler(request: Request, exc: Exception):
 # Include routers
 app.include_router(health.router, prefix=settings.API_V1_PREFIX)
 app.include_router(roadmap.router, prefix=settings.API_V1_PREFIX)
+app.include_router(metrics.router)
 
 
 @app.on_event("startup")
@@ -169,19 +198,41 @@ async def startup_event():
     try:
         from app.services.vector_store import get_vector_store
         vector_store = get_vector_store()
-        if vector_store.ollama_client:
+        if vector_store.ready:
             logger.info("Vector store initialized successfully")
         else:
             logger.warning("Vector store initialized but Ollama connection failed. Will retry on first use.")
     except Exception as e:
         logger.error(f"Error initializing vector store: {str(e)}", exc_info=True)
         logger.warning("Service will start but vector operations may fail until Ollama is available")
+    
+    # Load the generation model in the background so startup is not blocked
+    from app.services.agents import warm_up_llm
+    app.state.llm_warmup = asyncio.create_task(warm_up_llm())
+    
+    # Start the embedded job worker (set JOB_WORKERS=0 to leave jobs to
+    # standalone `python -m mapey worker` processes)
+    if settings.JOB_WORKERS > 0:
+        from app.services.jobs import get_job_worker
+        get_job_worker().start()
+    else:
+        # The job worker prunes expired checkpoints; without one, prune them once at startup
+        from app.services.checkpoints import prune_runs
+        app.state.checkpoint_prune = asyncio.create_task(prune_runs())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown."""
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
+    if settings.JOB_WORKERS > 0:
+        from app.services.jobs import get_job_worker
+        await get_job_worker().stop()
+    from app.services.checkpoints import close_checkpointer
+    await close_checkpointer()
+    from app.services.web_search import close_web_search
+    await close_web_search()
+    await asyncio.to_thread(shutdown_tracing)
 
 
 @app.get("/")
@@ -1,8 +1,9 @@
 """
 Pydantic models for request/response validation.
 """
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Literal
+from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field, field_validator
+from typing import Dict, List, Optional, Literal
+from app.core.webhooks import check_webhook_host
 
 
 class RoadmapRequest(BaseModel):
@@ -17,6 +18,107 @@ class RoadmapRequest(BaseModel):
         return v.strip()
 
 
+class SkillGap(BaseModel):
+    """A skill the candidate is missing or only partially has."""
+    model_config = ConfigDict(extra="forbid")
+    
+    skill: str = Field(..., min_length=1, description="Skill or topic")
+    priority: Literal["high", "medium", "low"] = Field("medium", description="Priority by hiring impact and dependency order")
+    note: str = Field("", description="What is missing and why it matters")
+    
+    @field_validator("priority", mode="before")
+    @classmethod
+    def normalize_priority(cls, v):
+        return v.strip().lower() if isinstance(v, str) else v
+
+
+class SkillGapReport(BaseModel):
+    """Structured output of the skill gap stage; unknown keys and empty gap or target lists fail validation."""
+    model_config = ConfigDict(extra="forbid")
+    
+    strengths: List[str] = Field(..., description="Skills demonstrated with evidence")
+    partial_matches: List[SkillGap] = Field(default_factory=list, description="Skills present but lacking depth")
+    missing_skills: List[SkillGap] = Field(..., min_length=1, description="Required skills not found in the resume")
+    interview_risks: List[str] = Field(default_factory=list, description="Topics likely to fail interviews")
+    learning_targets: List[str] = Field(..., min_length=1, description="Specific topics, tools and projects to work on")
+    jd_match_percent: Optional[int] = Field(None, ge=0, le=100, description="Estimated resume vs job description match")
+    role_match_percent: Optional[int] = Field(None, ge=0, le=100, description="Estimated resume vs ideal role match")
+    
+    def to_markdown(self) -> str:
+        """Render the report as markdown for display."""
+        def gap(g: SkillGap) -> str:
+            return f"**{g.skill}** ({g.priority} priority)" + (f": {g.note}" if g.note else "")
+
+        lines = []
+        for title, items in (
+            ("Verified Strengths", self.strengths),
+            ("Partial Matches", [gap(g) for g in self.partial_matches]),
+            ("Critical Missing Skills", [gap(g) for g in self.missing_skills]),
+            ("Interview Risk Areas", self.interview_risks),
+            ("Actionable Learning Targets", self.learning_targets),
+        ):
+            if items:
+                lines += [f"## {title}", *(f"- {item}" for item in items), ""]
+        scores = [
+            f"- {label}: {value}%"
+            for label, value in (("Resume vs JD match", self.jd_match_percent), ("Resume vs ideal role", self.role_match_percent))
+            if value is not None
+        ]
+        if scores:
+            lines += ["## Readiness Score", *scores]
+        return "\n".join(lines).strip()
+
+
+class CurriculumPhase(BaseModel):
+    """One phase of the learning curriculum."""
+    model_config = ConfigDict(extra="forbid")
+    
+    name: str = Field(..., min_length=1, description="Phase name")
+    purpose: str = Field("", description="Why this phase exists")
+    weeks: Optional[int] = Field(None, ge=0, description="Estimated duration in weeks")
+    prerequisites: List[str] = Field(default_factory=list, description="What must be known before starting")
+    skills: List[str] = Field(..., min_length=1, description="Skills and concepts, in dependency order")
+    tools: List[str] = Field(default_factory=list, description="Tools and technologies to practice")
+    practice: List[str] = Field(default_factory=list, description="Exercises and mini-projects")
+    milestone_project: str = Field("", description="Capstone or milestone project")
+    completion_criteria: List[str] = Field(default_factory=list, description="What proves readiness to move on")
+
+
+class CurriculumPlan(BaseModel):
+    """Structured output of the curriculum planning stage; unknown keys and an empty plan fail validation."""
+    model_config = ConfigDict(extra="forbid")
+    
+    phases: List[CurriculumPhase] = Field(..., min_length=1, description="Curriculum phases in order")
+    timeline_strategy: str = Field(..., description="How the phases connect and where specialization begins")
+    fast_track: List[str] = Field(default_factory=list, description="What can be skipped by strong candidates")
+    
+    def to_markdown(self) -> str:
+        """Render the plan as markdown for display."""
+        lines = []
+        for i, phase in enumerate(self.phases, 1):
+            duration = f" ({phase.weeks} weeks)" if phase.weeks else ""
+            lines += [f"## Phase {i}: {phase.name}{duration}"]
+            if phase.purpose:
+                lines.append(phase.purpose)
+            for title, items in (
+                ("Prerequisites", phase.prerequisites),
+                ("Skills & Concepts", phase.skills),
+                ("Tools & Technologies", phase.tools),
+                ("Hands-on Practice", phase.practice),
+                ("Completion Criteria", phase.completion_criteria),
+            ):
+                if items:
+                    lines += [f"**{title}:**", *(f"- {item}" for item in items)]
+            if phase.milestone_project:
+                lines.append(f"**Milestone Project:** {phase.milestone_project}")
+            lines.append("")
+        if self.timeline_strategy:
+            lines += ["## Overall Timeline Strategy", self.timeline_strategy, ""]
+        if self.fast_track:
+            lines += ["## Fast-Track Paths", *(f"- {item}" for item in self.fast_track)]
+        return "\n".join(lines).strip()
+
+
 class RoadmapResponse(BaseModel):
     """Response schema for roadmap generation."""
     roadmap: str = Field(..., description="Generated career roadmap")
@@ -25,6 +127,57 @@ class RoadmapResponse(BaseModel):
     resources: str = Field(..., description="Learning resources and links")
     analysis: Optional[str] = Field(None, description="Role analysis")
     rag_context: Optional[str] = Field(None, description="RAG context used")
+    run_id: Optional[str] = Field(None, description="Run ID, usable with the resume endpoint if generation fails")
+    status: Literal["complete", "partial"] = Field("complete", description="'partial' if some stages ran out of time")
+    incomplete_stages: List[str] = Field(default_factory=list, description="Stages that did not finish before the deadline")
+    reused_stages: List[str] = Field(default_factory=list, description="Stages reused from an earlier run because their inputs were unchanged")
+    stage_models: Dict[str, str] = Field(default_factory=dict, description="LLM model used by each stage")
+    skill_gap_report: Optional[SkillGapReport] = Field(None, description="Skill gap analysis as JSON (structured output mode)")
+    curriculum_plan: Optional[CurriculumPlan] = Field(None, description="Curriculum as JSON (structured output mode)")
+    
+    @classmethod
+    def from_state(cls, result: dict, run_id: Optional[str] = None) -> "RoadmapResponse":
+        """Build the response from the final roadmap graph state."""
+        structured = result.get("structured") or {}
+        return cls(
+            roadmap=result.get("roadmap", ""),
+            skill_gaps=result.get("skill_gaps", ""),
+            curriculum=result.get("curriculum", ""),
+            resources=result.get("resources", ""),
+            analysis=result.get("analysis"),
+            rag_context=result.get("rag_context"),
+            run_id=run_id,
+            status="partial" if result.get("incomplete_stages") else "complete",
+            incomplete_stages=result.get("incomplete_stages", []),
+            reused_stages=result.get("reused_stages", []),
+            stage_models=result.get("stage_models", {}),
+            skill_gap_report=structured.get("skill_gaps"),
+            curriculum_plan=structured.get("curriculum")
+        )
+
+
+class JobRequest(RoadmapRequest):
+    """Request schema for an asynchronous roadmap generation job."""
+    webhook_url: Optional[AnyHttpUrl] = Field(None, description="Public http(s) URL that receives a POST with the job when it finishes")
+    
+    @field_validator("webhook_url")
+    @classmethod
+    def validate_webhook_url(cls, v: Optional[AnyHttpUrl]) -> Optional[AnyHttpUrl]:
+        if v is not None:
+            check_webhook_host(v.host)
+        return v
+
+
+class JobResponse(BaseModel):
+    """Status and result of an asynchronous roadmap generation job."""
+    job_id: str = Field(..., description="Job ID")
+    status: Literal["queued", "running", "completed", "failed"] = Field(..., description="Job status")
+    created_at: float = Field(..., description="Unix time the job was submitted")
+    updated_at: float = Field(..., description="Unix time of the last status change")
+    attempts: int = Field(0, description="Number of times a worker started the job")
+    result: Optional[RoadmapResponse] = Field(None, description="Generated roadmap once the job completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    webhook_status: Optional[Literal["pending", "delivered", "failed"]] = Field(None, description="Delivery status of the completion webhook")
 
 
 class HealthResponse(BaseModel):
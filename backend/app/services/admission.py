@@ -0,0 +1,183 @@
+"""
+Admission control for LLM and embedding calls.
+
+Each controller lets a fixed number of calls run at once (matching the
+parallel slots Ollama is configured with) and queues a bounded number of
+further callers in FIFO order. Once the queue is full new calls are rejected
+immediately with an estimated retry delay, which the API turns into a
+``429 Too Many Requests`` response with ``Retry-After``.
+
+Slots are shared between async callers (:meth:`AdmissionController.slot`)
+and synchronous ones running in worker threads
+(:meth:`AdmissionController.slot_blocking`), so both graph entry points
+count against the same limit.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Deque, Iterator, Optional
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a controller's wait queue is full."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} queue is full, retry in {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO wait queue."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int):
+        """
+        Args:
+            name: Controller name used in logs, errors and stats
+            max_concurrent: Calls allowed to run at the same time
+            max_queue: Calls allowed to wait for a slot before new ones are rejected
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        # Exponentially weighted averages of time spent holding and waiting for a slot
+        self.avg_service_seconds = 0.0
+        self.avg_wait_seconds = 0.0
+        # Thread-safe futures, one per waiter, so the controller is not bound to
+        # one event loop and can also hand slots to blocking callers
+        self._waiters: Deque[Future] = deque()
+        # Reentrant, since check() runs both on its own and while a slot is taken
+        self._lock = threading.RLock()
+
+    @property
+    def waiting(self) -> int:
+        # Worker threads add and remove waiters, so the queue is only read under the lock
+        with self._lock:
+            return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queued call would get a slot."""
+        rounds = (self.waiting + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(rounds * self.avg_service_seconds))
+
+    def check(self) -> None:
+        """Raise :class:`AdmissionRejected` if a new call would be rejected right now."""
+        with self._lock:
+            if self.active >= self.max_concurrent and self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected(self.name, self.retry_after())
+
+    def _enter(self) -> Optional[Future]:
+        """Take a free slot (returning ``None``) or join the wait queue (returning the waiter)."""
+        with self._lock:
+            if self.active < self.max_concurrent and not self.waiting:
+                self.active += 1
+                return None
+            self.check()
+            waiter: Future = Future()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter: Future) -> None:
+        """Leave the wait queue, passing the slot on if it was handed over meanwhile."""
+        if not waiter.cancel():
+            self._release()
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _admitted(self, queued_at: float) -> float:
+        started_at = time.monotonic()
+        self.admitted += 1
+        self.avg_wait_seconds = 0.9 * self.avg_wait_seconds + 0.1 * (started_at - queued_at)
+        return started_at
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the controller's slots, waiting in the queue if none is free."""
+        queued_at = time.monotonic()
+        waiter = self._enter()
+        if waiter is not None:
+            try:
+                # The releasing call hands its slot over, so ``active`` is not touched here
+                await asyncio.wrap_future(waiter)
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+
+        started_at = self._admitted(queued_at)
+        try:
+            yield
+        finally:
+            self.avg_service_seconds = 0.9 * self.avg_service_seconds + 0.1 * (time.monotonic() - started_at)
+            self._release()
+
+    @contextmanager
+    def slot_blocking(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Blocking variant of :meth:`slot` for synchronous callers.
+
+        Raises:
+            TimeoutError: If no slot was free within ``timeout`` seconds
+        """
+        queued_at = time.monotonic()
+        waiter = self._enter()
+        if waiter is not None:
+            try:
+                waiter.result(timeout=timeout)
+            except TimeoutError:
+                self._abandon(waiter)
+                raise
+
+        started_at = self._admitted(queued_at)
+        try:
+            yield
+        finally:
+            self.avg_service_seconds = 0.9 * self.avg_service_seconds + 0.1 * (time.monotonic() - started_at)
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the slot to the next live waiter, or free it."""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                # False if the waiter gave up (was cancelled) in the meantime
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(None)
+                    return
+            self.active -= 1
+
+    def get_stats(self) -> dict:
+        """Get current load and admission statistics."""
+        return {
+            "name": self.name,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.avg_wait_seconds, 3),
+            "avg_service_seconds": round(self.avg_service_seconds, 3),
+        }
+
+
+llm_admission = AdmissionController("llm", settings.LLM_MAX_CONCURRENCY, settings.LLM_MAX_QUEUE)
+embedding_admission = AdmissionController("embedding", settings.EMBED_MAX_CONCURRENCY, settings.EMBED_MAX_QUEUE)
+
+
+def check_admission() -> None:
+    """Reject a new generation up front if the LLM or embedding queue is already full."""
+    llm_admission.check()
+    embedding_admission.check()
@@ -1,41 +1,167 @@
 """
 LangGraph agents for roadmap generation.
 Refactored from the original Streamlit implementation.
+
+Every node has a synchronous implementation (used by ``roadmap_graph.invoke``)
+and an async variant (used by ``roadmap_graph.ainvoke``), so the API can run
+generations on the event loop without blocking it.
 """
-from typing import TypedDict, List
+import asyncio
+import contextvars
+import json
+import operator
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Dict, NamedTuple, Optional, Tuple, TypedDict, List
+import httpx
 from langchain_ollama import OllamaLLM
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.tools import tool
-from langgraph.graph import StateGraph, END
-from tavily import TavilyClient
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.config import get_config, get_stream_writer
+from langgraph.graph import StateGraph, START, END
+from pydantic import ValidationError
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.tracing import record_span, trace_span
+from app.models.schemas import CurriculumPlan, SkillGapReport
+from app.services.admission import llm_admission
+from app.services.llm_cache import get_llm_cache, make_cache_key
+from app.services.llm_metrics import generation_metrics, ollama_metrics_handler, record_generation, start_sample
+from app.services.file_processor import chunk_text
+from app.services.ollama_pool import OllamaBackend, PartialResponseError, get_generation_pool
+from app.services.prompt_budget import count_tokens, fit_prompt_inputs
+from app.services.resource_catalog import RESOURCE_KINDS, get_resource_catalog
+from app.services.singleflight import SingleFlight
+from app.services.stage_memo import get_stage_memo, stage_input_hash
 from app.services.vector_store import get_vector_store
+from app.services.web_search import get_web_search
 
 logger = get_logger(__name__)
 
-# Initialize LLM
-llm = OllamaLLM(
-    model=settings.OLLAMA_MODEL,
-    temperature=settings.OLLAMA_TEMPERATURE,
-    num_ctx=settings.OLLAMA_NUM_CTX,
-    base_url=settings.OLLAMA_BASE_URL
-)
 parser = StrOutputParser()
 
-# Initialize Tavily client
-tavily_client = None
-if settings.TAVILY_API_KEY:
-    tavily_client = TavilyClient(api_key='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')
-else:
+# LLM stages, in graph order
+LLM_STAGES = ["resume_condenser", "topic_analyzer", "skill_gap_agent", "curriculum_planner", "validator"]
+
+
+class StageLLMConfig(NamedTuple):
+    """Generation parameters of one LLM stage."""
+    model: str
+    temperature: float
+    num_ctx: int
+    num_predict: Optional[int]
+    format: str  # "json" for stages answering in Ollama JSON mode
+
+
+def stage_llm_config(node: str) -> StageLLMConfig:
+    """
+    Get a stage's generation parameters.
+
+    Each value comes from the stage's ``<NODE>_MODEL``, ``<NODE>_TEMPERATURE``,
+    ``<NODE>_NUM_CTX`` or ``<NODE>_NUM_PREDICT`` setting when set, otherwise
+    from the matching ``OLLAMA_*`` default. Stages with structured outputs
+    (:data:`STRUCTURED_STAGES`) use Ollama JSON mode when ``STRUCTURED_OUTPUTS``
+    is enabled.
+    """
+    prefix = node.upper()
+
+    def value(name: str):
+        override = getattr(settings, f"{prefix}_{name}")
+        return override if override is not None else getattr(settings, f"OLLAMA_{name}")
+
+    return StageLLMConfig(
+        model=value("MODEL"),
+        temperature=value("TEMPERATURE"),
+        num_ctx=value("NUM_CTX"),
+        num_predict=value("NUM_PREDICT"),
+        format="json" if _is_structured(node) else ""
+    )
+
+
+# LLM clients per (stage configuration, backend URL), created on first use
+_llms: Dict[Tuple[StageLLMConfig, str], OllamaLLM] = {}
+_llms_lock = threading.Lock()
+
+
+def _llm_for(config: StageLLMConfig, backend: OllamaBackend) -> OllamaLLM:
+    """Get the LLM client for a stage configuration on a generation backend, creating it on first use."""
+    llm = _llms.get((config, backend.url))
+    if llm is not None:
+        return llm
+    with _llms_lock:
+        llm = _llms.get((config, backend.url))
+        if llm is None:
+            llm = OllamaLLM(
+                model=config.model,
+                temperature=config.temperature,
+                num_ctx=config.num_ctx,
+                num_predict=config.num_predict,
+                format=config.format,
+                base_url=backend.url,
+                # Keep the model (and its KV cache) loaded between stages and requests
+                keep_alive=settings.OLLAMA_KEEP_ALIVE,
+                # Bound every socket read so a stuck model cannot hold a connection forever
+                client_kwargs={"timeout": settings.STAGE_TIMEOUT_SECONDS},
+                # Captures Ollama's token counts and timings, which the string parser drops
+                callbacks=[ollama_metrics_handler]
+            )
+            _llms[(config, backend.url)] = llm
+    return llm
+
+
+async def warm_up_llm() -> None:
+    """
+    Load every stage's generation model on every generation backend ahead of the first request.
+
+    An empty prompt makes Ollama load the model without generating anything;
+    ``keep_alive`` then keeps it resident between stages and requests.
+    """
+    models = sorted({stage_llm_config(node).model for node in LLM_STAGES})
+
+    async def warm_up(backend: OllamaBackend, model: str) -> None:
+        try:
+            await backend.async_client.generate(model=model, prompt="", keep_alive=settings.OLLAMA_KEEP_ALIVE)
+            logger.info(f"LLM model {model} loaded on {backend.url} (keep_alive={settings.OLLAMA_KEEP_ALIVE})")
+        except Exception as e:
+            logger.warning(f"Failed to warm up LLM model {model} on {backend.url}: {str(e)}")
+
+    await asyncio.gather(*(
+        warm_up(backend, model) for backend in get_generation_pool().backends for model in models
+    ))
+
+
+# Coalesces concurrent identical LLM calls (same prompt and model parameters)
+llm_singleflight = SingleFlight("llm")
+
+if not settings.TAVILY_API_KEY:
     logger.warning("TAVILY_API_KEY not set, web search functionality will be disabled")
 
 
+def _latest(current: str, update: str) -> str:
+    """Reducer that keeps the most recent value written by any parallel node."""
+    return update
+
+
+def _merge(current: dict, update: dict) -> dict:
+    """Reducer for per-stage dicts written by parallel nodes."""
+    return {**current, **update}
+
+
+def _max_progress(current: int, update: int) -> int:
+    """Reducer that keeps progress monotonic when parallel nodes report it."""
+    return max(current or 0, update or 0)
+
+
 class MapeyState(TypedDict):
     """State schema for the LangGraph workflow."""
     topic: str
     resume: str
+    resume_digest: str  # Condensed resume for long resumes, empty if the resume is used as is
     jd: str
     analysis: str
     skill_gaps: str
@@ -43,41 +169,161 @@ class MapeyState(TypedDict):
     rag_context: str
     resources: str
     roadmap: str
-    progress: int  # Progress percentage (0-100)
-    current_step: str  # Current step description
+    progress: Annotated[int, _max_progress]  # Progress percentage (0-100), monotonic across parallel nodes
+    current_step: Annotated[str, _latest]  # Current step description
+    deadline: float  # Absolute end-to-end deadline (epoch seconds) set by the API
+    incomplete_stages: Annotated[List[str], operator.add]  # Stages that ran out of time
+    reused_stages: Annotated[List[str], operator.add]  # Stages whose stored output was reused
+    stage_models: Annotated[Dict[str, str], _merge]  # LLM model used by each stage
+    structured: Annotated[Dict[str, dict], _merge]  # Structured stage outputs by state field
 
 
-@tool
-def web_search(query: str) -> str:
-    """Search the web for learning resources."""
-    if not tavily_client:
-        logger.warning("Tavily client not available, returning empty search results")
-        return "Web search unavailable: API key not configured"
+class StageDeadlineExceeded(TimeoutError):
+    """Raised when a stage runs out of its time budget."""
     
+    def __init__(self, node: str):
+        super().__init__(f"Stage {node} exceeded its time budget")
+        self.node = node
+
+
+def _request_deadline(state: MapeyState) -> Optional[float]:
+    """
+    Deadline for the current invocation. A ``deadline`` in the run config
+    (set when a checkpointed run is resumed) overrides the one in state.
+    """
+    override = get_config().get("configurable", {}).get("deadline")
+    return override or state.get("deadline")
+
+
+def _stage_budget(node: str, deadline: Optional[float]) -> float:
+    """
+    Seconds a stage may run: the per-stage timeout, capped by the time left
+    until the request deadline.
+    """
+    budget = settings.STAGE_TIMEOUT_SECONDS
+    if deadline:
+        budget = min(budget, deadline - time.time())
+    if budget <= 0:
+        raise StageDeadlineExceeded(node)
+    return budget
+
+
+@asynccontextmanager
+async def _stage_deadline(node: str, deadline: Optional[float]) -> AsyncIterator[None]:
+    """Cancel the enclosed awaits (and their HTTP calls) when the stage budget runs out."""
+    budget = _stage_budget(node, deadline)
+    try:
+        async with asyncio.timeout(budget):
+            yield
+    except TimeoutError as e:
+        raise StageDeadlineExceeded(node) from e
+
+
+def _stage_timed_out(node: str) -> dict:
+    """State update for a stage that was abandoned because it ran out of time."""
+    logger.warning(f"{node} ran out of time budget, continuing without it")
+    return {
+        "incomplete_stages": [node],
+        "current_step": f"{node.replace('_', ' ').capitalize()} timed out"
+    }
+
+
+SEARCH_UNAVAILABLE = "Web search unavailable: API key not configured"
+
+
+def _format_search_results(query: str, results) -> str:
+    """Format one query's search results (or its error) for the prompt."""
+    if isinstance(results, Exception):
+        logger.warning(f"Error searching for '{query}': {str(results)}")
+        return f"Error searching web: {str(results)}"
+    logger.info(f"Web search completed for query: {query[:50]}...")
+    return "\n".join(r["url"] for r in results)
+
+
+def _catalog_results(query: str, kind: Optional[str] = None) -> List[dict]:
+    """Local catalog matches for a query (empty if the catalog is off)."""
+    catalog = get_resource_catalog()
+    if catalog is None:
+        return []
+    return catalog.search(query, k=settings.SEARCH_MAX_RESULTS, kind=kind)
+
+
+def _format_catalog_results(results: List[dict]) -> str:
+    return "\n".join(f"{r['title']}: {r['url']}" for r in results)
+
+
+def _resource_section(query: str, web=None, catalog: Optional[List[dict]] = None) -> str:
+    """
+    Format one query's resources: web results when there are any, otherwise
+    local catalog matches. ``web`` is the search results, the search's
+    exception, or ``None`` if the web was not searched.
+    """
+    if isinstance(web, list) and (web or not catalog):
+        return _format_search_results(query, web)
+    if catalog:
+        logger.info(f"Using local catalog for query: {query[:50]}...")
+        if isinstance(web, Exception):
+            # Keeps the "Error searching" marker so the stage is recomputed next time
+            return f"{_format_search_results(query, web)}. Local catalog results:\n{_format_catalog_results(catalog)}"
+        return _format_catalog_results(catalog)
+    if web is None:
+        return SEARCH_UNAVAILABLE
+    return _format_search_results(query, web)
+
+
+def _web_search(query: str) -> str:
+    """Search the web for learning resources, falling back to the local catalog."""
+    search = get_web_search()
+    if search is None:
+        logger.warning("Web search not configured")
+        return _resource_section(query, catalog=_catalog_results(query))
     try:
-        res = tavily_client.search(query=query, max_results=5)
-        urls = "\n".join(r["url"] for r in res.get("results", []))
-        logger.info(f"Web search completed for query: {query[:50]}...")
-        return urls
+        results = search.search(query)
     except Exception as e:
-        logger.error(f"Error in web search: {str(e)}", exc_info=True)
-        return f"Error searching web: {str(e)}"
+        return _resource_section(query, e, _catalog_results(query))
+    return _format_search_results(query, results)
 
 
-def topic_analyzer(state: MapeyState) -> dict:
-    """Analyze the target role and provide expert insights."""
-    logger.info(f"Running topic analyzer for: {state['topic']}")
-    state["progress"] = 10
-    state["current_step"] = "Analyzing target role and industry expectations"
-    
-    prompt = PromptTemplate.from_template("""
+async def _aweb_search(query: str) -> str:
+    """Search the web for learning resources without blocking the event loop."""
+    search = get_web_search()
+    if search is None:
+        logger.warning("Web search not configured")
+        return _resource_section(query, catalog=_catalog_results(query))
+    try:
+        results = await search.asearch(query)
+    except Exception as e:
+        return _resource_section(query, e, _catalog_results(query))
+    return _format_search_results(query, results)
+
+
+web_search = StructuredTool.from_function(
+    func=_web_search,
+    coroutine=_aweb_search,
+    name="web_search",
+    description="Search the web for learning resources.",
+)
+
+
+# Every stage prompt is laid out as static instructions followed by the
+# per-request data under PROMPT_INPUTS_HEADER. Keeping the instructions as an
+# unchanging prefix lets Ollama reuse its KV cache for them across requests,
+# so only the data at the end has to be evaluated for each call.
+PROMPT_INPUTS_HEADER = "### Inputs"
+
+
+def _stage_prompt(instructions: str, inputs: str) -> PromptTemplate:
+    """Build a stage prompt with the static instructions first and the input data last."""
+    return PromptTemplate.from_template(f"{instructions.strip()}\n\n{PROMPT_INPUTS_HEADER}\n\n{inputs.strip()}\n")
+
+
+TOPIC_ANALYZER_PROMPT = _stage_prompt("""
 You are a senior industry expert, hiring manager, and career mentor.
 
-Your task is to deeply analyze a target career role and produce a
-practical, execution-ready skill strategy for a candidate.
+Your task is to deeply analyze the target career role given in the
+inputs below and produce a practical, execution-ready skill strategy
+for a candidate.
 
-Target Role:
-{topic}
 Provide a structured expert analysis with the following sections:
 
 1. Role Breakdown
@@ -115,41 +361,20 @@ Provide a structured expert analysis with the following sections:
 
 Write concisely but with high signal.
 Avoid generic advice. Be specific and practical.
+""", """
+Target Role:
+{topic}
 """)
 
-    try:
-        chain = prompt | llm | parser
-        result = chain.invoke({"topic": state["topic"]})
-        logger.info("Topic analyzer completed successfully")
-        return {"analysis": result, "progress": 25, "current_step": "Topic analysis complete"}
-    except Exception as e:
-        logger.error(f"Error in topic analyzer: {str(e)}", exc_info=True)
-        return {"analysis": f"Error analyzing topic: {str(e)}"}
-
-
-def skill_gap_agent(state: MapeyState) -> dict:
-    """Perform skill gap analysis between resume and job requirements."""
-    logger.info("Running skill gap agent")
-    state["progress"] = 30
-    state["current_step"] = "Analyzing skill gaps and comparing with job requirements"
-    
-    prompt = PromptTemplate.from_template("""
+SKILL_GAP_PROMPT = _stage_prompt("""
 You are an expert technical recruiter and career coach.
 
-Your job is to perform a deep skill-gap analysis by comparing:
+Your job is to perform a deep skill-gap analysis by comparing
+the inputs below:
 1) The user's resume
 2) The target job description
 3) The target role expectations
 
-Target Role:
-{topic}
-
-Resume:
-{resume}
-
-Job Description:
-{jd}
-
 Perform structured analysis with these sections:
 
 1. Verified Strengths
@@ -189,85 +414,23 @@ Perform structured analysis with these sections:
 
 Be honest, specific, and practical.
 Avoid generic statements.
-""")
-
-    try:
-        chain = prompt | llm | parser
-        result = chain.invoke({
-            "topic": state["topic"],
-            "resume": state["resume"],
-            "jd": state.get("jd", "Not provided")
-        })
-        logger.info("Skill gap agent completed successfully")
-        return {"skill_gaps": result, "progress": 45, "current_step": "Skill gap analysis complete"}
-    except Exception as e:
-        logger.error(f"Error in skill gap agent: {str(e)}", exc_info=True)
-        return {"skill_gaps": f"Error performing skill gap analysis: {str(e)}"}
-
-
-def rag_retriever(state: MapeyState) -> dict:
-    """Retrieve relevant context from vector store."""
-    logger.info("Running RAG retriever")
-    state["progress"] = 60
-    state["current_step"] = "Retrieving relevant context from your experience"
-    
-    try:
-        vector_store = get_vector_store()
-        query = f"Learning resources for {state['topic']} skills"
-        chunks = vector_store.search(query, k=5)
-        context = "\n".join(chunks) if chunks else "No relevant context found in knowledge base."
-        logger.info(f"RAG retriever found {len(chunks)} relevant chunks")
-        return {"rag_context": context, "progress": 65, "current_step": "Context retrieval complete"}
-    except Exception as e:
-        logger.error(f"Error in RAG retriever: {str(e)}", exc_info=True)
-        return {"rag_context": "Error retrieving context from knowledge base."}
-
-
-def resource_curator(state: MapeyState) -> dict:
-    """Curate web resources for learning."""
-    logger.info("Running resource curator")
-    state["progress"] = 70
-    state["current_step"] = "Finding best learning resources and courses"
-    
-    queries = [
-        f"Best courses for {state['topic']}",
-        f"Projects for {state['topic']}",
-        f"Interview prep for {state['topic']}"
-    ]
-
-    links = []
-    for q in queries:
-        try:
-            result = web_search.invoke(q)
-            links.append(result)
-        except Exception as e:
-            logger.warning(f"Error searching for '{q}': {str(e)}")
-            links.append(f"Error searching: {str(e)}")
+""", """
+Target Role:
+{topic}
 
-    resources = "\n".join(links)
-    logger.info("Resource curator completed")
-    return {"resources": resources, "progress": 80, "current_step": "Resource curation complete"}
+Resume:
+{resume}
 
+Job Description:
+{jd}
+""")
 
-def curriculum_planner(state: MapeyState) -> dict:
-    """Create a structured learning curriculum."""
-    logger.info("Running curriculum planner")
-    state["progress"] = 50
-    state["current_step"] = "Designing personalized learning curriculum"
-    
-    prompt = PromptTemplate.from_template("""
+CURRICULUM_PLANNER_PROMPT = _stage_prompt("""
 You are a senior learning designer and technical mentor.
 
-Your task is to convert skill gap analysis and role analysis
-into a practical, dependency-aware learning curriculum.
-
-Inputs:
-
-Skill Gap Report:
-{skill_gaps}
-
-Role & Industry Analysis:
-{analysis}
+Your task is to convert the skill gap analysis and role analysis
+given in the inputs below into a practical, dependency-aware
+learning curriculum.
 
 Design a structured multi-phase curriculum with:
 
@@ -300,43 +463,20 @@ Rules:
 - Avoid dumping too many topics in one phase.
 - Focus on skill stacking and reinforcement.
 - Optimize for job-readiness, not academic coverage.
-""")
-
-    try:
-        chain = prompt | llm | parser
-        result = chain.invoke({
-            "skill_gaps": state["skill_gaps"],
-            "analysis": state["analysis"]
-        })
-        logger.info("Curriculum planner completed successfully")
-        return {"curriculum": result, "progress": 60, "current_step": "Curriculum planning complete"}
-    except Exception as e:
-        logger.error(f"Error in curriculum planner: {str(e)}", exc_info=True)
-        return {"curriculum": f"Error creating curriculum: {str(e)}"}
+""", """
+Skill Gap Report:
+{skill_gaps}
 
+Role & Industry Analysis:
+{analysis}
+""")
 
-def validator(state: MapeyState) -> dict:
-    """Validate and synthesize final roadmap."""
-    logger.info("Running validator to generate final roadmap")
-    state["progress"] = 85
-    state["current_step"] = "Generating final comprehensive roadmap"
-    
-    prompt = PromptTemplate.from_template("""
+VALIDATOR_PROMPT = _stage_prompt("""
 You are a senior career architect and learning program designer.
 
-Your task is to synthesize all information into a
-realistic, high-impact, execution-ready career roadmap.
-
-Inputs:
-
-Curriculum Plan:
-{curriculum}
-
-Resume & Knowledge Context (from RAG):
-{rag_context}
-
-Learning Resources:
-{resources}
+Your task is to synthesize the curriculum plan, resume context and
+learning resources given in the inputs below into a realistic,
+high-impact, execution-ready career roadmap.
 
 Create a FINAL ROADMAP with the following structure:
 
@@ -380,43 +520,882 @@ Rules:
 - Be realistic and practical.
 - Prioritize depth over covering too many topics.
 - Optimize for hiring success, not academic completeness.
+""", """
+Curriculum Plan:
+{curriculum}
+
+Resume & Knowledge Context (from RAG):
+{rag_context}
+
+Learning Resources:
+{resources}
+""")
+
+
+_JSON_ONLY = "Respond with a single JSON object and nothing else, using exactly this shape:"
+
+SKILL_GAP_JSON_PROMPT = _stage_prompt(f"""
+You are an expert technical recruiter and career coach.
+
+Your job is to perform a deep skill-gap analysis by comparing
+the inputs below:
+1) The user's resume
+2) The target job description
+3) The target role expectations
+
+{_JSON_ONLY}
+{{{{
+  "strengths": ["skill clearly demonstrated with evidence"],
+  "partial_matches": [{{{{"skill": "...", "priority": "high|medium|low", "note": "what depth is missing"}}}}],
+  "missing_skills": [{{{{"skill": "...", "priority": "high|medium|low", "note": "why it matters for hiring"}}}}],
+  "interview_risks": ["topic likely to fail interviews"],
+  "learning_targets": ["specific topic, tool or project type to work on"],
+  "jd_match_percent": 0,
+  "role_match_percent": 0
+}}}}
+
+Rank priorities by hiring impact, learning difficulty and dependency order.
+Keep every string short. Be honest, specific, and practical.
+""", """
+Target Role:
+{topic}
+
+Resume:
+{resume}
+
+Job Description:
+{jd}
+""")
+
+CURRICULUM_PLANNER_JSON_PROMPT = _stage_prompt(f"""
+You are a senior learning designer and technical mentor.
+
+Your task is to convert the skill gap analysis and role analysis
+given in the inputs below into a practical, dependency-aware
+learning curriculum.
+
+{_JSON_ONLY}
+{{{{
+  "phases": [
+    {{{{
+      "name": "...",
+      "purpose": "why this phase exists",
+      "weeks": 0,
+      "prerequisites": ["..."],
+      "skills": ["skills and concepts, ordered by dependency"],
+      "tools": ["..."],
+      "practice": ["exercise or mini-project"],
+      "milestone_project": "...",
+      "completion_criteria": ["what proves readiness to move forward"]
+    }}}}
+  ],
+  "timeline_strategy": "how phases connect and where specialization begins",
+  "fast_track": ["what can be skipped if the user is strong"]
+}}}}
+
+Rules:
+- Avoid dumping too many topics in one phase.
+- Focus on skill stacking and reinforcement.
+- Optimize for job-readiness, not academic coverage.
+- Keep every string short.
+""", """
+Skill Gap Report:
+{skill_gaps}
+
+Role & Industry Analysis:
+{analysis}
+""")
+
+# Stages with a structured output mode -> (JSON prompt, output schema)
+STRUCTURED_STAGES = {
+    "skill_gap_agent": (SKILL_GAP_JSON_PROMPT, SkillGapReport),
+    "curriculum_planner": (CURRICULUM_PLANNER_JSON_PROMPT, CurriculumPlan),
+}
+RESUME_CONDENSER_PROMPT = _stage_prompt("""
+You are an expert technical recruiter.
+
+Condense the resume excerpt given in the inputs below into a compact
+skills and experience digest. It is one part of a longer resume; other
+parts are condensed separately and the digests are combined.
+
+Use short bullet points under these headings, omitting empty ones:
+
+Skills:
+- Skill or tool, with the evidence level (used in production / projects / mentioned)
+
+Experience:
+- Role, organisation, duration: key achievements and technologies
+
+Projects:
+- Project: what was built and with which technologies
+
+Education & Certifications:
+- Degree, course or certification
+
+Rules:
+- Keep only facts stated in the excerpt; never invent anything.
+- Prefer concrete technologies, numbers and outcomes over descriptions.
+- Drop contact details, objectives and filler.
+""", """
+Resume Excerpt (part {part}):
+{resume}
 """)
 
+# LLM-backed node name -> its prose prompt (see :func:`_prompt_for` for the JSON ones)
+STAGE_PROMPTS = {
+    "resume_condenser": RESUME_CONDENSER_PROMPT,
+    "topic_analyzer": TOPIC_ANALYZER_PROMPT,
+    "skill_gap_agent": SKILL_GAP_PROMPT,
+    "curriculum_planner": CURRICULUM_PLANNER_PROMPT,
+    "validator": VALIDATOR_PROMPT,
+}
+
+# LLM-backed node name -> state field its output is written to
+STAGE_OUTPUTS = {
+    "resume_condenser": "resume_digest",
+    "topic_analyzer": "analysis",
+    "skill_gap_agent": "skill_gaps",
+    "curriculum_planner": "curriculum",
+    "validator": "roadmap",
+}
+
+# Prompt fields per LLM-backed node, highest priority first. When a prompt does
+# not fit the context window, fields are truncated from the end of the list.
+PROMPT_FIELD_PRIORITIES = {
+    "resume_condenser": ["part", "resume"],
+    "topic_analyzer": ["topic"],
+    "skill_gap_agent": ["topic", "resume", "jd"],
+    "curriculum_planner": ["skill_gaps", "analysis"],
+    "validator": ["curriculum", "resources", "rag_context"],
+}
+
+
+def _fit_inputs(node: str, config: StageLLMConfig, prompt: PromptTemplate, inputs: dict) -> dict:
+    """Trim a node's prompt inputs to its model context window."""
+    return fit_prompt_inputs(
+        node, prompt, inputs, PROMPT_FIELD_PRIORITIES[node], config.num_ctx, config.num_predict
+    )
+
+
+def _cache_key(config: StageLLMConfig, prompt: PromptTemplate, inputs: dict) -> str:
+    """Cache key for a rendered prompt under a stage's LLM parameters."""
+    return make_cache_key(
+        prompt.format(**inputs), config.model, config.temperature, config.num_ctx, config.num_predict
+    )
+
+
+def _is_structured(node: str) -> bool:
+    return settings.STRUCTURED_OUTPUTS and node in STRUCTURED_STAGES
+
+
+def _prompt_for(node: str, prompt: PromptTemplate) -> PromptTemplate:
+    """The stage's JSON prompt in structured output mode, otherwise ``prompt``."""
+    return STRUCTURED_STAGES[node][0] if _is_structured(node) else prompt
+
+
+def _stage_output(node: str, result: str) -> dict:
+    """
+    State update for a stage's answer.
+
+    In structured output mode the JSON answer is validated against the
+    stage's schema; the state field gets a markdown rendering for display and
+    ``structured`` keeps the JSON for downstream prompts and the API. Answers
+    that fail validation (malformed JSON, unknown keys, missing or empty
+    required fields) are kept as the raw text.
+    """
+    field = STAGE_OUTPUTS[node]
+    if not _is_structured(node):
+        return {field: result}
+    schema = STRUCTURED_STAGES[node][1]
+    try:
+        data = schema.model_validate_json(result)
+    except ValidationError as e:
+        logger.warning(f"{node} returned invalid structured output, keeping it as text ({e.error_count()} validation errors)")
+        return {field: result}
+    return {field: data.to_markdown(), "structured": {field: data.model_dump(exclude_defaults=True)}}
+
+
+def _compact(state: MapeyState, field: str) -> str:
+    """A stage output for downstream prompts: compact JSON when structured, otherwise the text."""
+    data = (state.get("structured") or {}).get(field)
+    if data is not None:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return state[field]
+
+
+def _stage_model(node: str) -> dict:
+    """State update recording the model a stage runs on."""
+    return {"stage_models": {node: stage_llm_config(node).model}}
+
+
+def _log_generation(
+    node: str,
+    config: StageLLMConfig,
+    started_at: float,
+    source: str,
+    sample: Optional[dict] = None,
+) -> None:
+    """
+    Log a stage's model, latency and (for generations) Ollama's token counts,
+    time to first token and tokens/sec, and add them to the per-node metrics.
+    """
+    metrics = generation_metrics(time.perf_counter() - started_at, sample)
+    record_generation(node, source, metrics)
+    record_span(
+        f"llm {node}",
+        metrics["wall_seconds"],
+        **{"llm.model": config.model, "llm.source": source},
+        **{f"llm.{name}": value for name, value in metrics.items() if name != "wall_seconds"}
+    )
+    rate = f", {metrics['output_tokens_per_second']} tokens/s" if "output_tokens_per_second" in metrics else ""
+    logger.info(
+        f"{node} answered by {config.model} in {metrics['wall_seconds']:.2f}s ({source}{rate})",
+        extra={
+            "node": node,
+            "model": config.model,
+            "temperature": config.temperature,
+            "num_ctx": config.num_ctx,
+            "num_predict": config.num_predict,
+            "source": source,
+            **metrics,
+        }
+    )
+
+
+def _discard(chunk: dict) -> None:
+    """Stream writer that drops tokens."""
+
+
+def _run_chain(
+    node: str,
+    prompt: PromptTemplate,
+    inputs: dict,
+    deadline: Optional[float] = None,
+    stream_tokens: bool = True,
+) -> str:
+    """
+    Run a stage's prompt through its LLM synchronously, streaming tokens like :func:`_arun_chain`.
+    
+    Generations share :func:`_arun_chain`'s LLM admission slots and
+    coalescing of identical in-flight calls, waiting at most until the stage
+    budget runs out. A generation still running at the deadline, or a model
+    that stops sending tokens until the HTTP read times out, raises
+    :class:`StageDeadlineExceeded` and closes the Ollama request, so the
+    stage is reported as incomplete like on the async path.
+    """
+    started_at = time.perf_counter()
+    writer = get_stream_writer() if stream_tokens else _discard
+    field = STAGE_OUTPUTS[node]
+    config = stage_llm_config(node)
+    token_format = config.format or "text"
+    inputs = _fit_inputs(node, config, prompt, inputs)
+    cache = get_llm_cache()
+    key = _cache_key(config, prompt, inputs)
+    if cache and (cached := cache.get(key)) is not None:
+        logger.info(f"LLM cache hit for {node}")
+        writer({"node": node, "field": field, "format": token_format, "token": cached})
+        _log_generation(node, config, started_at, "cache")
+        return cached
+    
+    ends_at = time.time() + _stage_budget(node, deadline)
+    
+    samples = []
+    
+    def stream_from(backend: OllamaBackend) -> str:
+        parts = []
+        sample = start_sample()
+        samples.append(sample)
+        sent_at = time.perf_counter()
+        # Streams the LLM itself rather than a prompt | llm | parser chain:
+        # closing a chain's stream reads the rest of the response first
+        stream = _llm_for(config, backend).stream(prompt.format(**inputs))
+        try:
+            for token in stream:
+                if not parts:
+                    sample["ttft_seconds"] = round(time.perf_counter() - sent_at, 4)
+                parts.append(token)
+                writer({"node": node, "field": field, "format": token_format, "token": token})
+                if time.time() > ends_at:
+                    raise StageDeadlineExceeded(node)
+        except StageDeadlineExceeded:
+            raise
+        except httpx.ReadTimeout as e:
+            # The client's read timeout is the stage timeout, so a model that
+            # stalls (before the first token or mid-answer) has used up the budget
+            raise StageDeadlineExceeded(node) from e
+        except Exception as e:
+            if parts:
+                raise PartialResponseError(f"{node} stream from {backend.url} was interrupted") from e
+            raise
+        finally:
+            # Closing the generator closes the HTTP response, which stops Ollama generating
+            stream.close()
+        return "".join(parts)
+    
+    def generate() -> str:
+        with llm_admission.slot_blocking(timeout=max(0.0, ends_at - time.time())):
+            result = get_generation_pool().call(stream_from)
+        if cache:
+            cache.set(key, result, model=config.model)
+        return result
+    
+    try:
+        result, shared = llm_singleflight.do_blocking(key, generate, timeout=max(0.0, ends_at - time.time()))
+    except StageDeadlineExceeded:
+        raise
+    except TimeoutError as e:
+        # Waited for an admission slot or a shared call past the stage budget
+        raise StageDeadlineExceeded(node) from e
+    if shared:
+        logger.info(f"Coalesced {node} call with an identical in-flight request")
+        writer({"node": node, "field": field, "format": token_format, "token": result})
+    _log_generation(node, config, started_at, "shared" if shared else "ollama", None if shared else samples[-1])
+    return result
+
+
+async def _arun_chain(
+    node: str,
+    prompt: PromptTemplate,
+    inputs: dict,
+    deadline: Optional[float] = None,
+    stream_tokens: bool = True,
+) -> str:
+    """
+    Run a ``prompt | llm | parser`` chain on the event loop.
+    
+    Tokens are forwarded to LangGraph's ``custom`` stream as they arrive,
+    tagged with the node name, the state field they build and their
+    ``format`` (``"json"`` for raw structured output, else ``"text"``), so callers
+    using ``roadmap_graph.astream(..., stream_mode="custom")`` can render
+    each stage progressively. Without a streaming consumer the writer is a no-op.
+    ``stream_tokens=False`` skips forwarding, for calls whose output is only
+    an intermediate result (such as concurrent resume chunk summaries).
+    
+    The stage's model and generation parameters come from
+    :func:`stage_llm_config`. Inputs are first trimmed to fit its context
+    window (see :data:`PROMPT_FIELD_PRIORITIES`).
+    
+    Identical prompts under the same model parameters are answered from the
+    persistent LLM response cache, and concurrent identical calls are
+    coalesced into one Ollama request. Cached and shared results are
+    streamed as a single token.
+    
+    Generations wait for an LLM admission slot, then go to the least-loaded
+    healthy generation backend and move to another backend if one fails
+    before producing any tokens.
+    
+    The call is cancelled, closing its Ollama HTTP request, once the stage
+    budget derived from ``deadline`` runs out.
+    
+    Each call's wall time, time to first token and Ollama's token counts and
+    timings are logged and recorded per node (see :mod:`app.services.llm_metrics`).
+    """
+    started_at = time.perf_counter()
+    writer = get_stream_writer() if stream_tokens else _discard
+    field = STAGE_OUTPUTS[node]
+    config = stage_llm_config(node)
+    token_format = config.format or "text"
+    inputs = _fit_inputs(node, config, prompt, inputs)
+    cache = get_llm_cache()
+    key = _cache_key(config, prompt, inputs)
+    # SQLite reads and writes run off the event loop
+    if cache and (cached := await asyncio.to_thread(cache.get, key)) is not None:
+        logger.info(f"LLM cache hit for {node}")
+        writer({"node": node, "field": field, "format": token_format, "token": cached})
+        _log_generation(node, config, started_at, "cache")
+        return cached
+    
+    samples = []
+    
+    async def stream_from(backend: OllamaBackend) -> str:
+        chain = prompt | _llm_for(config, backend) | parser
+        parts = []
+        sample = start_sample()
+        samples.append(sample)
+        sent_at = time.perf_counter()
+        try:
+            async for token in chain.astream(inputs):
+                if not parts:
+                    sample["ttft_seconds"] = round(time.perf_counter() - sent_at, 4)
+                parts.append(token)
+                writer({"node": node, "field": field, "format": token_format, "token": token})
+        except Exception as e:
+            if parts:
+                raise PartialResponseError(f"{node} stream from {backend.url} was interrupted") from e
+            raise
+        return "".join(parts)
+    
+    async def generate() -> str:
+        async with llm_admission.slot():
+            result = await get_generation_pool().acall(stream_from)
+        if cache:
+            await asyncio.to_thread(cache.set, key, result, model=config.model)
+        return result
+    
+    async with _stage_deadline(node, deadline):
+        result, shared = await llm_singleflight.do(key, generate)
+    if shared:
+        logger.info(f"Coalesced {node} call with an identical in-flight request")
+        writer({"node": node, "field": field, "format": token_format, "token": result})
+    _log_generation(node, config, started_at, "shared" if shared else "ollama", None if shared else samples[-1])
+    return result
+
+
+def _resource_queries(topic: str) -> List[str]:
+    """Web queries, one per catalog kind in :data:`RESOURCE_KINDS` order."""
+    return [
+        f"Best courses for {topic}",
+        f"Projects for {topic}",
+        f"Interview prep for {topic}"
+    ]
+
+
+def topic_analyzer(state: MapeyState) -> dict:
+    """Analyze the target role and provide expert insights."""
+    logger.info(f"Running topic analyzer for: {state['topic']}")
+    try:
+        result = _run_chain("topic_analyzer", TOPIC_ANALYZER_PROMPT, {"topic": state["topic"]}, _request_deadline(state))
+        logger.info("Topic analyzer completed successfully")
+        return {"analysis": result, "progress": 30, "current_step": "Topic analysis complete", **_stage_model("topic_analyzer")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("topic_analyzer")
+    except Exception as e:
+        logger.error(f"Error in topic analyzer: {str(e)}", exc_info=True)
+        raise
+
+
+async def atopic_analyzer(state: MapeyState) -> dict:
+    """Async variant of :func:`topic_analyzer`."""
+    logger.info(f"Running topic analyzer for: {state['topic']}")
+    try:
+        result = await _arun_chain("topic_analyzer", TOPIC_ANALYZER_PROMPT, {"topic": state["topic"]}, _request_deadline(state))
+        logger.info("Topic analyzer completed successfully")
+        return {"analysis": result, "progress": 30, "current_step": "Topic analysis complete", **_stage_model("topic_analyzer")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("topic_analyzer")
+    except Exception as e:
+        logger.error(f"Error in topic analyzer: {str(e)}", exc_info=True)
+        raise
+
+
+def _condense_parts(resume: str) -> Optional[List[dict]]:
+    """Prompt inputs per resume chunk, or ``None`` if the resume is short enough to use as is."""
+    tokens = count_tokens(resume)
+    if tokens <= settings.RESUME_CONDENSE_THRESHOLD_TOKENS:
+        return None
+    chunks = chunk_text(resume, size=settings.RESUME_CONDENSE_CHUNK_WORDS)
+    logger.info(f"Condensing resume of ~{tokens} tokens in {len(chunks)} chunks")
+    return [{"part": f"{i} of {len(chunks)}", "resume": chunk} for i, chunk in enumerate(chunks, 1)]
+
+
+def _condensed(resume: str, summaries: List[str]) -> dict:
+    """Reduce the chunk summaries into the resume digest."""
+    digest = "\n\n".join(summary.strip() for summary in summaries if summary.strip())
+    logger.info(f"Resume condensed from ~{count_tokens(resume)} to ~{count_tokens(digest)} tokens")
+    return {"resume_digest": digest, "progress": 10, "current_step": "Resume condensed", **_stage_model("resume_condenser")}
+
+
+def resume_condenser(state: MapeyState) -> dict:
+    """
+    Condense a long resume into a skills/experience digest for the skill gap stage.
+
+    Resumes over ``RESUME_CONDENSE_THRESHOLD_TOKENS`` are split with
+    :func:`chunk_text` and the chunks are summarised in parallel (map); the
+    summaries are concatenated in order (reduce). Shorter resumes pass
+    through untouched. The digest is cached by resume hash through the stage
+    output store.
+    """
+    parts = _condense_parts(state["resume"])
+    if parts is None:
+        return {"resume_digest": ""}
+    deadline = _request_deadline(state)
+    try:
+        # Worker threads need the graph's context (config, stream writer)
+        with ThreadPoolExecutor(max_workers=min(len(parts), settings.LLM_MAX_CONCURRENCY)) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    _run_chain, "resume_condenser", RESUME_CONDENSER_PROMPT, inputs, deadline, False
+                )
+                for inputs in parts
+            ]
+            summaries = [future.result() for future in futures]
+        return _condensed(state["resume"], summaries)
+    except StageDeadlineExceeded:
+        return _stage_timed_out("resume_condenser")
+    except Exception as e:
+        logger.error(f"Error in resume condenser: {str(e)}", exc_info=True)
+        raise
+
+
+async def aresume_condenser(state: MapeyState) -> dict:
+    """Async variant of :func:`resume_condenser`."""
+    parts = _condense_parts(state["resume"])
+    if parts is None:
+        return {"resume_digest": ""}
+    deadline = _request_deadline(state)
+    try:
+        summaries = await asyncio.gather(*(
+            _arun_chain("resume_condenser", RESUME_CONDENSER_PROMPT, inputs, deadline, stream_tokens=False)
+            for inputs in parts
+        ))
+        return _condensed(state["resume"], summaries)
+    except StageDeadlineExceeded:
+        return _stage_timed_out("resume_condenser")
+    except Exception as e:
+        logger.error(f"Error in resume condenser: {str(e)}", exc_info=True)
+        raise
+
+
+def _skill_gap_inputs(state: MapeyState) -> dict:
+    return {
+        "topic": state["topic"],
+        "resume": state.get("resume_digest") or state["resume"],
+        "jd": state.get("jd", "Not provided")
+    }
+
+
+def skill_gap_agent(state: MapeyState) -> dict:
+    """Perform skill gap analysis between resume and job requirements."""
+    logger.info("Running skill gap agent")
+    try:
+        prompt = _prompt_for("skill_gap_agent", SKILL_GAP_PROMPT)
+        result = _run_chain("skill_gap_agent", prompt, _skill_gap_inputs(state), _request_deadline(state))
+        logger.info("Skill gap agent completed successfully")
+        return {**_stage_output("skill_gap_agent", result), "progress": 45, "current_step": "Skill gap analysis complete", **_stage_model("skill_gap_agent")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("skill_gap_agent")
+    except Exception as e:
+        logger.error(f"Error in skill gap agent: {str(e)}", exc_info=True)
+        raise
+
+
+async def askill_gap_agent(state: MapeyState) -> dict:
+    """Async variant of :func:`skill_gap_agent`."""
+    logger.info("Running skill gap agent")
+    try:
+        prompt = _prompt_for("skill_gap_agent", SKILL_GAP_PROMPT)
+        result = await _arun_chain("skill_gap_agent", prompt, _skill_gap_inputs(state), _request_deadline(state))
+        logger.info("Skill gap agent completed successfully")
+        return {**_stage_output("skill_gap_agent", result), "progress": 45, "current_step": "Skill gap analysis complete", **_stage_model("skill_gap_agent")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("skill_gap_agent")
+    except Exception as e:
+        logger.error(f"Error in skill gap agent: {str(e)}", exc_info=True)
+        raise
+
+
+def _rag_result(chunks: List[str]) -> dict:
+    context = "\n".join(chunks) if chunks else "No relevant context found in knowledge base."
+    logger.info(f"RAG retriever found {len(chunks)} relevant chunks")
+    return {"rag_context": context, "progress": 15, "current_step": "Context retrieval complete"}
+
+
+def rag_retriever(state: MapeyState) -> dict:
+    """Retrieve relevant context from vector store."""
+    logger.info("Running RAG retriever")
+    try:
+        vector_store = get_vector_store()
+        query = f"Learning resources for {state['topic']} skills"
+        return _rag_result(vector_store.search(query, k=5))
+    except Exception as e:
+        logger.error(f"Error in RAG retriever: {str(e)}", exc_info=True)
+        return {"rag_context": "Error retrieving context from knowledge base."}
+
+
+async def arag_retriever(state: MapeyState) -> dict:
+    """Async variant of :func:`rag_retriever`."""
+    logger.info("Running RAG retriever")
+    try:
+        vector_store = get_vector_store()
+        query = f"Learning resources for {state['topic']} skills"
+        async with _stage_deadline("rag_retriever", _request_deadline(state)):
+            chunks = await vector_store.asearch(query, k=5)
+        return _rag_result(chunks)
+    except StageDeadlineExceeded:
+        return _stage_timed_out("rag_retriever")
+    except Exception as e:
+        logger.error(f"Error in RAG retriever: {str(e)}", exc_info=True)
+        return {"rag_context": "Error retrieving context from knowledge base."}
+
+
+def _catalog_matches(topic: str) -> List[List[dict]]:
+    """Local catalog matches for the topic, one list per resource kind."""
+    return [_catalog_results(topic, kind) for kind in RESOURCE_KINDS]
+
+
+def _web_queries(queries: List[str], catalog: List[List[dict]]) -> List[int]:
+    """Indexes of the queries to search the web for: all of them, or in
+    primary catalog mode only those the catalog has no match for."""
+    if settings.RESOURCE_CATALOG_MODE == "primary":
+        return [i for i, matches in enumerate(catalog) if not matches]
+    return list(range(len(queries)))
+
+
+def _curated(queries: List[str], catalog: List[List[dict]], web: dict) -> dict:
+    resources = "\n".join(
+        _resource_section(query, web.get(i), catalog[i]) for i, query in enumerate(queries)
+    )
+    logger.info("Resource curator completed")
+    return {"resources": resources, "progress": 20, "current_step": "Resource curation complete"}
+
+
+def resource_curator(state: MapeyState) -> dict:
+    """
+    Curate learning resources. Web queries run concurrently through the cached
+    web search; the local catalog answers first or fills in for failed searches,
+    depending on ``RESOURCE_CATALOG_MODE``.
+    """
+    logger.info("Running resource curator")
+    queries = _resource_queries(state["topic"])
+    catalog = _catalog_matches(state["topic"])
+    search = get_web_search()
+    pending = _web_queries(queries, catalog)
+    if search is None:
+        logger.warning("Web search not configured")
+        pending = []
+    web = dict(zip(pending, search.search_many([queries[i] for i in pending]))) if pending else {}
+    return _curated(queries, catalog, web)
+
+
+async def aresource_curator(state: MapeyState) -> dict:
+    """Async variant of :func:`resource_curator`."""
+    logger.info("Running resource curator")
+    queries = _resource_queries(state["topic"])
+    catalog = _catalog_matches(state["topic"])
+    search = get_web_search()
+    pending = _web_queries(queries, catalog)
+    if search is None:
+        logger.warning("Web search not configured")
+        pending = []
+    web = {}
+    if pending:
+        try:
+            async with _stage_deadline("resource_curator", _request_deadline(state)):
+                web = dict(zip(pending, await search.asearch_many([queries[i] for i in pending])))
+        except StageDeadlineExceeded:
+            if not any(catalog):
+                return _stage_timed_out("resource_curator")
+            logger.warning("Web search ran out of time, using the local resource catalog")
+            web = {i: TimeoutError("search timed out") for i in pending}
+    return _curated(queries, catalog, web)
+
+
+def _curriculum_inputs(state: MapeyState) -> dict:
+    return {
+        "skill_gaps": _compact(state, "skill_gaps"),
+        "analysis": state["analysis"]
+    }
+
+
+def curriculum_planner(state: MapeyState) -> dict:
+    """Create a structured learning curriculum."""
+    logger.info("Running curriculum planner")
+    try:
+        prompt = _prompt_for("curriculum_planner", CURRICULUM_PLANNER_PROMPT)
+        result = _run_chain("curriculum_planner", prompt, _curriculum_inputs(state), _request_deadline(state))
+        logger.info("Curriculum planner completed successfully")
+        return {**_stage_output("curriculum_planner", result), "progress": 75, "current_step": "Curriculum planning complete", **_stage_model("curriculum_planner")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("curriculum_planner")
+    except Exception as e:
+        logger.error(f"Error in curriculum planner: {str(e)}", exc_info=True)
+        raise
+
+
+async def acurriculum_planner(state: MapeyState) -> dict:
+    """Async variant of :func:`curriculum_planner`."""
+    logger.info("Running curriculum planner")
     try:
-        chain = prompt | llm | parser
-        roadmap = chain.invoke({
-            "curriculum": state["curriculum"],
-            "rag_context": state.get("rag_context", "Not provided"),
-            "resources": state["resources"]
-        })
+        prompt = _prompt_for("curriculum_planner", CURRICULUM_PLANNER_PROMPT)
+        result = await _arun_chain("curriculum_planner", prompt, _curriculum_inputs(state), _request_deadline(state))
+        logger.info("Curriculum planner completed successfully")
+        return {**_stage_output("curriculum_planner", result), "progress": 75, "current_step": "Curriculum planning complete", **_stage_model("curriculum_planner")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("curriculum_planner")
+    except Exception as e:
+        logger.error(f"Error in curriculum planner: {str(e)}", exc_info=True)
+        raise
+
+
+def _validator_inputs(state: MapeyState) -> dict:
+    return {
+        "curriculum": _compact(state, "curriculum"),
+        "rag_context": state.get("rag_context", "Not provided"),
+        "resources": state["resources"]
+    }
+
+
+def validator(state: MapeyState) -> dict:
+    """Validate and synthesize final roadmap."""
+    logger.info("Running validator to generate final roadmap")
+    try:
+        roadmap = _run_chain("validator", VALIDATOR_PROMPT, _validator_inputs(state), _request_deadline(state))
         logger.info("Validator completed successfully, roadmap generated")
-        return {"roadmap": roadmap, "progress": 100, "current_step": "Roadmap generation complete!"}
+        return {"roadmap": roadmap, "progress": 100, "current_step": "Roadmap generation complete!", **_stage_model("validator")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("validator")
     except Exception as e:
         logger.error(f"Error in validator: {str(e)}", exc_info=True)
-        return {"roadmap": f"Error generating roadmap: {str(e)}"}
+        raise
 
 
-def create_roadmap_graph() -> StateGraph:
-    """Create and configure the LangGraph workflow."""
+async def avalidator(state: MapeyState) -> dict:
+    """Async variant of :func:`validator`."""
+    logger.info("Running validator to generate final roadmap")
+    try:
+        roadmap = await _arun_chain("validator", VALIDATOR_PROMPT, _validator_inputs(state), _request_deadline(state))
+        logger.info("Validator completed successfully, roadmap generated")
+        return {"roadmap": roadmap, "progress": 100, "current_step": "Roadmap generation complete!", **_stage_model("validator")}
+    except StageDeadlineExceeded:
+        return _stage_timed_out("validator")
+    except Exception as e:
+        logger.error(f"Error in validator: {str(e)}", exc_info=True)
+        raise
+
+
+# Node name -> (sync implementation, async implementation)
+NODES = {
+    "resume_condenser": (resume_condenser, aresume_condenser),
+    "topic_analyzer": (topic_analyzer, atopic_analyzer),
+    "skill_gap_agent": (skill_gap_agent, askill_gap_agent),
+    "curriculum_planner": (curriculum_planner, acurriculum_planner),
+    "rag_retriever": (rag_retriever, arag_retriever),
+    "resource_curator": (resource_curator, aresource_curator),
+    "validator": (validator, avalidator),
+}
+
+# Nodes that depend only on the request inputs (topic, resume, jd)
+INDEPENDENT_NODES = ("resume_condenser", "topic_analyzer", "rag_retriever", "resource_curator")
+
+# Node name -> the state it reads. A node's stored output is reused while the
+# content hash of these inputs (and of :func:`_node_fingerprint`) is unchanged.
+NODE_INPUTS = {
+    "resume_condenser": lambda state: {"resume": state["resume"]},
+    "topic_analyzer": lambda state: {"topic": state["topic"]},
+    "skill_gap_agent": _skill_gap_inputs,
+    "curriculum_planner": _curriculum_inputs,
+    "rag_retriever": lambda state: {"topic": state["topic"], "resume": state["resume"]},
+    "resource_curator": lambda state: {"topic": state["topic"]},
+    "validator": _validator_inputs,
+}
+
+
+def _node_fingerprint(node: str) -> Optional[dict]:
+    """Settings that shape a node's output besides its inputs."""
+    if node == "resume_condenser":
+        return {
+            "llm": stage_llm_config(node)._asdict(),
+            "prompt": RESUME_CONDENSER_PROMPT.template,
+            "threshold_tokens": settings.RESUME_CONDENSE_THRESHOLD_TOKENS,
+            "chunk_words": settings.RESUME_CONDENSE_CHUNK_WORDS,
+        }
+    if node in STAGE_PROMPTS:
+        return {"llm": stage_llm_config(node)._asdict(), "prompt": _prompt_for(node, STAGE_PROMPTS[node]).template}
+    if node == "rag_retriever":
+        return {"embed_model": settings.EMBED_MODEL_NAME}
+    if node == "resource_curator":
+        catalog = get_resource_catalog()
+        return {
+            "web_search": bool(settings.TAVILY_API_KEY),
+            "catalog_mode": settings.RESOURCE_CATALOG_MODE,
+            "catalog": catalog.source_hash if catalog else None,
+        }
+    return None
+
+
+def _is_reusable(node: str, update: dict) -> bool:
+    """Only completed stages are stored; timeouts, fallbacks and failed searches recompute next time."""
+    if "progress" not in update:
+        return False
+    return not (node == "resource_curator" and "Error searching" in update["resources"])
+
+
+def _reuse(node: str, stored: str) -> dict:
+    """State update replaying a node's stored output."""
+    update = json.loads(stored)
+    logger.info(f"Reusing stored output of {node}, its inputs are unchanged")
+    # The resume digest is intermediate and never streamed
+    if node in STAGE_OUTPUTS and node != "resume_condenser":
+        field = STAGE_OUTPUTS[node]
+        # Stored outputs are already rendered, even for structured (JSON) stages
+        get_stream_writer()({"node": node, "field": field, "format": "text", "token": update.get(field, "")})
+    return {**update, "current_step": f"{node.replace('_', ' ').capitalize()} reused", "reused_stages": [node]}
+
+
+def _memoized(node: str, func, afunc):
+    """
+    Wrap a node so its state update is stored under a hash of its inputs and
+    reused on later runs with the same inputs (see :mod:`app.services.stage_memo`).
+    """
+    def run(state: MapeyState) -> dict:
+        with trace_span(f"node {node}", node=node) as span:
+            memo = get_stage_memo()
+            if memo is None:
+                return func(state)
+            key = stage_input_hash(node, NODE_INPUTS[node](state), _node_fingerprint(node))
+            if (stored := memo.get(key)) is not None:
+                span.set_attribute("memo.reused", True)
+                return _reuse(node, stored)
+            update = func(state)
+            if _is_reusable(node, update):
+                memo.set(key, json.dumps(update), model=node)
+            return update
+
+    async def arun(state: MapeyState) -> dict:
+        with trace_span(f"node {node}", node=node) as span:
+            memo = get_stage_memo()
+            if memo is None:
+                return await afunc(state)
+            key = stage_input_hash(node, NODE_INPUTS[node](state), _node_fingerprint(node))
+            if (stored := await asyncio.to_thread(memo.get, key)) is not None:
+                span.set_attribute("memo.reused", True)
+                return _reuse(node, stored)
+            update = await afunc(state)
+            if _is_reusable(node, update):
+                await asyncio.to_thread(memo.set, key, json.dumps(update), model=node)
+            return update
+
+    return run, arun
+
+
+def create_roadmap_graph(checkpointer: Optional[BaseCheckpointSaver] = None) -> StateGraph:
+    """
+    Create and configure the LangGraph workflow.
+
+    The graph is a dependency DAG rather than a chain: every node that only
+    needs the request inputs fans out from START and runs concurrently.
+    ``skill_gap_agent`` follows ``resume_condenser``,
+    ``curriculum_planner`` joins on the role analysis and skill gaps, and
+    ``validator`` joins on the curriculum plus the retrieved context and
+    curated resources.
+
+    LLM stages raise on failure rather than writing the error into the
+    roadmap. With a ``checkpointer`` the stages that already finished are
+    persisted, so the run can be resumed from the failed node.
+
+    Every node reuses its stored output from an earlier run when its inputs
+    are unchanged (see :func:`_memoized`), so regenerating with only some
+    inputs changed recomputes just the affected part of the graph.
+    """
     graph = StateGraph(MapeyState)
     
-    graph.add_node("topic_analyzer", topic_analyzer)
-    graph.add_node("skill_gap_agent", skill_gap_agent)
-    graph.add_node("curriculum_planner", curriculum_planner)
-    graph.add_node("rag_retriever", rag_retriever)
-    graph.add_node("resource_curator", resource_curator)
-    graph.add_node("validator", validator)
+    for name, (func, afunc) in NODES.items():
+        run, arun = _memoized(name, func, afunc)
+        graph.add_node(name, RunnableLambda(run, afunc=arun, name=name))
+    
+    # Independent stages fan out from the request inputs
+    for node in INDEPENDENT_NODES:
+        graph.add_edge(START, node)
     
-    graph.set_entry_point("topic_analyzer")
+    graph.add_edge("resume_condenser", "skill_gap_agent")
     
-    graph.add_edge("topic_analyzer", "skill_gap_agent")
-    graph.add_edge("skill_gap_agent", "curriculum_planner")
-    graph.add_edge("curriculum_planner", "rag_retriever")
-    graph.add_edge("rag_retriever", "resource_curator")
-    graph.add_edge("resource_curator", "validator")
+    # Join nodes wait for all of their upstream dependencies
+    graph.add_edge(["topic_analyzer", "skill_gap_agent"], "curriculum_planner")
+    graph.add_edge(["curriculum_planner", "rag_retriever", "resource_curator"], "validator")
     graph.add_edge("validator", END)
     
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
 
 
 # Create the compiled graph
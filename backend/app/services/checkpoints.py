@@ -0,0 +1,167 @@
+"""
+Durable LangGraph checkpointing for roadmap runs.
+
+Each generation is executed under a run ID (the LangGraph ``thread_id``) on a
+graph compiled with an SQLite checkpointer. Completed supersteps, and the
+writes of nodes that finished before a failure, are persisted, so a run that
+died part-way can be resumed without repeating finished LLM stages.
+
+Checkpoints of runs that completed every stage are deleted straight away.
+Failed or partial runs are kept for ``CHECKPOINT_TTL_SECONDS`` after their
+last checkpoint and then removed by :func:`prune_runs`.
+"""
+import asyncio
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+import aiosqlite
+from langgraph.checkpoint.base.id import UUID as CheckpointID
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.agents import create_roadmap_graph
+from app.services.file_processor import chunk_text
+from app.services.vector_store import get_vector_store
+
+logger = get_logger(__name__)
+
+_saver: Optional[AsyncSqliteSaver] = None
+_durable_graph = None
+_init_lock = asyncio.Lock()
+
+
+def new_run_id() -> str:
+    """Generate a new run ID for a roadmap generation."""
+    return uuid.uuid4().hex
+
+
+def run_config(run_id: str, deadline: Optional[float] = None) -> dict:
+    """
+    LangGraph config that binds a graph invocation to a run's checkpoints.
+    
+    ``deadline`` replaces the deadline stored in the run's state, which is
+    needed when resuming a run whose original deadline has passed.
+    """
+    configurable = {"thread_id": run_id}
+    if deadline is not None:
+        configurable["deadline"] = deadline
+    return {"configurable": configurable}
+
+
+async def get_durable_graph():
+    """Get or create the roadmap graph compiled with the SQLite checkpointer."""
+    global _saver, _durable_graph
+    if _durable_graph is not None:
+        return _durable_graph
+
+    async with _init_lock:
+        if _durable_graph is None:
+            db_path = Path(settings.CHECKPOINT_DB_PATH)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = await aiosqlite.connect(str(db_path))
+            _saver = AsyncSqliteSaver(conn)
+            await _saver.setup()
+            _durable_graph = create_roadmap_graph(checkpointer=_saver)
+            logger.info(f"Roadmap checkpointer ready at {db_path}")
+    return _durable_graph
+
+
+async def get_run_state(run_id: str):
+    """Return the latest checkpointed state snapshot for a run, or ``None`` if unknown."""
+    graph = await get_durable_graph()
+    snapshot = await graph.aget_state(run_config(run_id))
+    if not snapshot.values:
+        return None
+    return snapshot
+
+
+async def restore_run_inputs(snapshot) -> None:
+    """
+    Restore inputs a resumed run reads from outside its checkpointed state.
+
+    The RAG retriever searches the process-wide vector store, which only has
+    the run's resume chunks if they were added in this process (or persisted)
+    before the interruption. If retrieval has not completed yet, the chunks
+    are added again from the checkpointed resume.
+    """
+    if "rag_retriever" not in snapshot.next:
+        return
+    chunks = chunk_text(snapshot.values["resume"])
+    await get_vector_store().aadd_texts(chunks)
+    logger.info(f"Re-added {len(chunks)} resume chunks to vector store for the resumed run")
+
+
+async def delete_run(run_id: str) -> None:
+    """Drop the checkpoints of a run once it no longer needs to be resumable."""
+    if _saver is None:
+        return
+    try:
+        await _saver.adelete_thread(run_id)
+    except Exception as e:
+        logger.warning(f"Failed to delete checkpoints for run {run_id}: {str(e)}")
+
+
+async def finish_run(run_id: str, state: dict) -> None:
+    """
+    Delete a finished run's checkpoints if every stage completed.
+
+    Partial runs (``incomplete_stages`` set) are kept so they can still be
+    inspected or resumed until :func:`prune_runs` expires them.
+    """
+    if state.get("incomplete_stages"):
+        logger.info(f"Keeping checkpoints of partial run", extra={"incomplete_stages": state["incomplete_stages"]})
+        return
+    await delete_run(run_id)
+
+
+# Offset between the UUID epoch (1582-10-15) and the Unix epoch, in 100 ns ticks
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+def _checkpoint_time(checkpoint_id: str) -> Optional[float]:
+    """Creation time (epoch seconds) encoded in a LangGraph checkpoint ID (a UUIDv6)."""
+    try:
+        ticks = CheckpointID(checkpoint_id).time
+    except ValueError:
+        return None
+    return (ticks - _UUID_EPOCH_OFFSET) / 1e7
+
+
+async def prune_runs(ttl_seconds: Optional[int] = None) -> int:
+    """
+    Delete runs whose latest checkpoint is older than ``ttl_seconds``.
+
+    Args:
+        ttl_seconds: Maximum age of a run's last checkpoint (defaults to ``CHECKPOINT_TTL_SECONDS``; 0 keeps runs forever)
+
+    Returns:
+        Number of runs deleted
+    """
+    ttl = settings.CHECKPOINT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    if ttl <= 0:
+        return 0
+    await get_durable_graph()
+    cutoff = time.time() - ttl
+    async with _saver.lock:
+        # UUIDv6 IDs sort by creation time, so MAX() is each run's latest checkpoint
+        async with _saver.conn.execute(
+            "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+        ) as cursor:
+            rows = await cursor.fetchall()
+    expired = [run_id for run_id, checkpoint_id in rows if (_checkpoint_time(checkpoint_id) or cutoff) < cutoff]
+    for run_id in expired:
+        await delete_run(run_id)
+    if expired:
+        logger.info(f"Pruned checkpoints of {len(expired)} runs older than {ttl}s")
+    return len(expired)
+
+
+async def close_checkpointer() -> None:
+    """Close the checkpoint database connection."""
+    global _saver, _durable_graph
+    if _saver is not None:
+        await _saver.conn.close()
+        logger.info("Roadmap checkpointer closed")
+    _saver = None
+    _durable_graph = None
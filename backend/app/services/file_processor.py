@@ -5,6 +5,7 @@ from typing import BinaryIO
 from pypdf import PdfReader
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.tracing import trace_span
 import io
 
 logger = get_logger(__name__)
@@ -21,28 +22,29 @@ def read_resume_file(file_content: bytes, filename: str) -> str:
     Returns:
         Extracted text content
     """
-    try:
-        if filename.lower().endswith(".pdf"):
-            file_obj = io.BytesIO(file_content)
-            reader = PdfReader(file_obj)
-            text = "\n".join(
-                page.extract_text() or "" 
-                for page in reader.pages
-            )
-            logger.info(f"Successfully extracted text from PDF: {filename}, {len(text)} characters")
+    with trace_span("read_resume_file", **{"file.name": filename, "file.bytes": len(file_content)}) as span:
+        try:
+            if filename.lower().endswith(".pdf"):
+                file_obj = io.BytesIO(file_content)
+                reader = PdfReader(file_obj)
+                span.set_attribute("pdf.pages", len(reader.pages))
+                text = "\n".join(
+                    page.extract_text() or "" 
+                    for page in reader.pages
+                )
+                logger.info(f"Successfully extracted text from PDF: {filename}, {len(text)} characters")
+            elif filename.lower().endswith(".txt"):
+                text = file_content.decode("utf-8", errors="ignore")
+                logger.info(f"Successfully read text file: {filename}, {len(text)} characters")
+            else:
+                # Try to decode as text for other formats
+                text = file_content.decode("utf-8", errors="ignore")
+                logger.warning(f"Unknown file type for {filename}, attempting text decode")
+            span.set_attribute("text.characters", len(text))
             return text
-        elif filename.lower().endswith(".txt"):
-            text = file_content.decode("utf-8", errors="ignore")
-            logger.info(f"Successfully read text file: {filename}, {len(text)} characters")
-            return text
-        else:
-            # Try to decode as text for other formats
-            text = file_content.decode("utf-8", errors="ignore")
-            logger.warning(f"Unknown file type for {filename}, attempting text decode")
-            return text
-    except Exception as e:
-        logger.error(f"Error reading file {filename}: {str(e)}", exc_info=True)
-        raise ValueError(f"Failed to process file {filename}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error reading file {filename}: {str(e)}", exc_info=True)
+            raise ValueError(f"Failed to process file {filename}: {str(e)}")
 
 
 def chunk_text(text: str, size: int = 500) -> list[str]:
@@ -0,0 +1,179 @@
+"""
+Durable job queue with leases and visibility timeouts.
+
+Workers lease a job for a visibility timeout and must extend the lease while
+they work on it; a job whose lease expires (its worker crashed or hung)
+becomes visible again and is handed to another worker. A job leaves the queue
+only when its worker acknowledges it.
+
+:class:`JobQueue` is the interface workers depend on. :class:`SQLiteJobQueue`
+implements it on a SQLite file shared by the API and worker processes on one
+host; a Redis-backed implementation (e.g. a sorted set scored by visibility
+time) can be swapped in by providing the same methods.
+"""
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Lease:
+    """A job leased by a worker until ``expires_at``."""
+    job_id: str
+    worker_id: str
+    expires_at: float
+    attempt: int
+
+
+class JobQueue(ABC):
+    """Interface for a durable queue of job IDs with leased delivery."""
+
+    @abstractmethod
+    def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        """Add a job, visible to workers after ``delay`` seconds."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, visibility_timeout: float) -> Optional[Lease]:
+        """Lease the oldest visible job, or return ``None`` if there is none."""
+
+    @abstractmethod
+    def extend(self, lease: Lease, visibility_timeout: float) -> bool:
+        """Extend a lease. Returns ``False`` if the lease was lost to another worker."""
+
+    @abstractmethod
+    def ack(self, lease: Lease) -> None:
+        """Remove a finished job from the queue."""
+
+    @abstractmethod
+    def release(self, lease: Lease, delay: float = 0.0, count_attempt: bool = True) -> None:
+        """
+        Give a job back to the queue, visible again after ``delay`` seconds.
+        With ``count_attempt=False`` the lease does not use up one of the job's attempts.
+        """
+
+    @abstractmethod
+    def get_stats(self) -> dict:
+        """Get queue depth statistics."""
+
+
+class SQLiteJobQueue(JobQueue):
+    """:class:`JobQueue` stored in SQLite, safe to share between processes."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file shared by all API and worker processes
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; leases use explicit BEGIN IMMEDIATE transactions
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_queue (
+                job_id TEXT PRIMARY KEY,
+                visible_at REAL NOT NULL,
+                leased_by TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_job_queue_visible ON job_queue(visible_at, enqueued_at)")
+
+    def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO job_queue (job_id, visible_at, enqueued_at) VALUES (?, ?, ?)",
+                (job_id, now + delay, now)
+            )
+
+    def lease(self, worker_id: str, visibility_timeout: float) -> Optional[Lease]:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so two processes
+            # can never select and claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id, attempts FROM job_queue WHERE visible_at <= ? ORDER BY enqueued_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id, attempts = row
+                expires_at = now + visibility_timeout
+                self._conn.execute(
+                    "UPDATE job_queue SET visible_at = ?, leased_by = ?, attempts = ? WHERE job_id = ?",
+                    (expires_at, worker_id, attempts + 1, job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Lease(job_id=job_id, worker_id=worker_id, expires_at=expires_at, attempt=attempts + 1)
+
+    def extend(self, lease: Lease, visibility_timeout: float) -> bool:
+        expires_at = time.time() + visibility_timeout
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE job_queue SET visible_at = ? WHERE job_id = ? AND leased_by = ? AND attempts = ?",
+                (expires_at, lease.job_id, lease.worker_id, lease.attempt)
+            )
+        if cursor.rowcount == 0:
+            return False
+        lease.expires_at = expires_at
+        return True
+
+    def ack(self, lease: Lease) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM job_queue WHERE job_id = ? AND leased_by = ? AND attempts = ?",
+                (lease.job_id, lease.worker_id, lease.attempt)
+            )
+
+    def release(self, lease: Lease, delay: float = 0.0, count_attempt: bool = True) -> None:
+        attempts = lease.attempt if count_attempt else lease.attempt - 1
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_queue SET visible_at = ?, leased_by = NULL, attempts = ? "
+                "WHERE job_id = ? AND leased_by = ? AND attempts = ?",
+                (time.time() + delay, attempts, lease.job_id, lease.worker_id, lease.attempt)
+            )
+
+    def get_stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            total, visible = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(visible_at <= ?), 0) FROM job_queue", (now,)
+            ).fetchone()
+            leased = self._conn.execute(
+                "SELECT COUNT(*) FROM job_queue WHERE leased_by IS NOT NULL AND visible_at > ?", (now,)
+            ).fetchone()[0]
+        return {"total": total, "visible": visible, "leased": leased, "delayed": total - visible - leased}
+
+
+# Global queue instance - lazy initialization
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get or create the global job queue."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = SQLiteJobQueue(settings.JOBS_DB_PATH)
+        logger.info(f"Job queue ready at {settings.JOBS_DB_PATH}")
+    return _job_queue
@@ -0,0 +1,370 @@
+"""
+Asynchronous roadmap generation jobs.
+
+Jobs are persisted in SQLite and their IDs are pushed onto the durable job
+queue, from which workers (in the API process and/or standalone worker
+processes) lease and execute them. The job ID doubles as the LangGraph run
+ID, so a job whose worker died is picked up by another worker once its lease
+expires and continues from its last checkpoint instead of starting over.
+When a job finishes, an optional webhook receives the job as JSON.
+"""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+import httpx
+from app.core.config import settings
+from app.core.logging import bind_log_context, get_logger
+from app.core.metrics import GENERATIONS_IN_FLIGHT
+from app.core.tracing import trace_span
+from app.core.webhooks import resolve_webhook_host, webhook_client
+from app.models.schemas import JobResponse, RoadmapResponse
+from app.services.admission import AdmissionRejected
+from app.services.agents import MapeyState
+from app.services.checkpoints import new_run_id, run_config, get_durable_graph, get_run_state, finish_run, prune_runs, restore_run_inputs
+from app.services.file_processor import chunk_text
+from app.services.job_queue import JobQueue, Lease, get_job_queue
+from app.services.llm_metrics import track_request_metrics
+from app.services.vector_store import get_vector_store
+
+logger = get_logger(__name__)
+
+_CHECKPOINT_PRUNE_INTERVAL_SECONDS = 3600
+
+
+class JobStore:
+    """SQLite-backed store for job requests, status and results."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file (``":memory:"`` for a process-local store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                owner TEXT,
+                status TEXT NOT NULL,
+                request TEXT NOT NULL,
+                webhook_url TEXT,
+                webhook_status TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        self._conn.commit()
+        logger.info(f"Job store ready at {path}")
+
+    def create(self, request: dict, owner: Optional[str] = None, webhook_url: Optional[str] = None) -> dict:
+        """Persist a new queued job and return it."""
+        job_id = new_run_id()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, owner, status, request, webhook_url, webhook_status, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, owner, json.dumps(request), webhook_url, "pending" if webhook_url else None, now, now)
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job as a dict, or ``None`` if it does not exist."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def update(self, job_id: str, **fields) -> None:
+        """Update job columns and bump ``updated_at``."""
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+
+def job_response(job: dict) -> JobResponse:
+    """Convert a stored job into its API representation."""
+    return JobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        attempts=job["attempts"],
+        result=job["result"],
+        error=job["error"],
+        webhook_status=job["webhook_status"]
+    )
+
+
+async def execute_job(job_id: str, request: dict) -> dict:
+    """
+    Run the roadmap graph for a job and return the final state.
+
+    If the job already has checkpoints (it was interrupted), the run is
+    resumed from them with a fresh deadline instead of starting over.
+    """
+    snapshot = await get_run_state(job_id)
+    graph = await get_durable_graph()
+    deadline = time.time() + settings.GENERATION_DEADLINE_SECONDS
+    if snapshot is not None:
+        logger.info(f"Resuming job from checkpoint", extra={"job_id": job_id, "pending_nodes": list(snapshot.next)})
+        result = snapshot.values
+        if snapshot.next:
+            await restore_run_inputs(snapshot)
+            result = await graph.ainvoke(None, config=run_config(job_id, deadline=deadline))
+    else:
+        chunks = chunk_text(request["resume"])
+        await get_vector_store().aadd_texts(chunks)
+        logger.info(f"Added {len(chunks)} resume chunks to vector store", extra={"job_id": job_id})
+
+        initial_state: MapeyState = {
+            "topic": request["topic"],
+            "resume": request["resume"],
+            "resume_digest": "",
+            "jd": request.get("jd") or "",
+            "analysis": "",
+            "skill_gaps": "",
+            "curriculum": "",
+            "rag_context": "",
+            "resources": "",
+            "roadmap": "",
+            "deadline": deadline,
+            "incomplete_stages": [],
+            "reused_stages": [],
+            "stage_models": {},
+            "structured": {}
+        }
+        result = await graph.ainvoke(initial_state, config=run_config(job_id))
+    await finish_run(job_id, result)
+    return result
+
+
+async def notify_webhook(job: dict) -> str:
+    """POST a finished job to its webhook, retrying with backoff. Returns the delivery status."""
+    payload = job_response(job).model_dump()
+    url = httpx.URL(job["webhook_url"])
+    try:
+        # Checked at delivery time too, since the host's DNS records may have changed;
+        # the client then connects to the checked address without resolving again
+        address = await resolve_webhook_host(url.host, url.port or (443 if url.scheme == "https" else 80))
+    except ValueError as e:
+        logger.warning(f"Webhook for job {job['id']} not delivered: {str(e)}")
+        return "failed"
+    async with webhook_client(address, settings.JOB_WEBHOOK_TIMEOUT_SECONDS) as client:
+        for attempt in range(settings.JOB_WEBHOOK_RETRIES + 1):
+            try:
+                response = await client.post(job["webhook_url"], json=payload)
+                response.raise_for_status()
+                logger.info(f"Webhook delivered for job {job['id']}")
+                return "delivered"
+            except httpx.HTTPError as e:
+                logger.warning(
+                    f"Webhook delivery for job {job['id']} failed (attempt {attempt + 1}/{settings.JOB_WEBHOOK_RETRIES + 1}): {str(e)}"
+                )
+                if attempt < settings.JOB_WEBHOOK_RETRIES:
+                    await asyncio.sleep(2 ** attempt)
+    return "failed"
+
+
+class JobWorker:
+    """
+    Leases jobs from the job queue and runs them with bounded concurrency.
+    
+    Each concurrency slot polls the queue, extends its lease while the job
+    runs and acknowledges it once the job is finished. Used both inside the
+    API process (``JOB_WORKERS``) and by standalone ``python -m mapey worker``
+    processes, which can be scaled independently of the web tier. The worker
+    also prunes checkpoints of failed or partial runs past their TTL.
+    """
+
+    def __init__(self, store: JobStore, queue: JobQueue, concurrency: int, worker_id: Optional[str] = None):
+        """
+        Args:
+            store: Job store holding requests, status and results
+            queue: Queue the job IDs are leased from
+            concurrency: Jobs run at the same time by this worker
+            worker_id: Identity recorded on leases (defaults to host and PID)
+        """
+        self.store = store
+        self.queue = queue
+        self.concurrency = concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.visibility_timeout = settings.JOB_VISIBILITY_TIMEOUT_SECONDS
+        self.active = 0
+        self.completed = 0
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start polling the queue."""
+        self._tasks = [asyncio.create_task(self._poll(f"{self.worker_id}-{i}")) for i in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._prune_checkpoints()))
+        logger.info(f"Job worker {self.worker_id} started with concurrency {self.concurrency}")
+
+    async def stop(self) -> None:
+        """Stop polling. Jobs in progress are released so another worker resumes them."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    def get_stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "completed": self.completed,
+        }
+
+    async def _poll(self, slot_id: str) -> None:
+        while True:
+            try:
+                lease = await asyncio.to_thread(self.queue.lease, slot_id, self.visibility_timeout)
+            except Exception as e:
+                logger.error(f"Failed to lease a job: {str(e)}", exc_info=True)
+                lease = None
+            if lease is None:
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+                continue
+            self.active += 1
+            try:
+                await self._process(lease)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {slot_id} crashed on job {lease.job_id}: {str(e)}", exc_info=True)
+            finally:
+                self.active -= 1
+
+    async def _prune_checkpoints(self) -> None:
+        """Periodically delete checkpoints of runs older than ``CHECKPOINT_TTL_SECONDS``."""
+        if settings.CHECKPOINT_TTL_SECONDS <= 0:
+            return
+        interval = min(settings.CHECKPOINT_TTL_SECONDS, _CHECKPOINT_PRUNE_INTERVAL_SECONDS)
+        while True:
+            try:
+                await prune_runs()
+            except Exception as e:
+                logger.error(f"Failed to prune checkpoints: {str(e)}", exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def _process(self, lease: Lease) -> None:
+        """Run a leased job, extending the lease until it finishes."""
+        job_task = asyncio.create_task(self._run(lease))
+        try:
+            while True:
+                done, _ = await asyncio.wait({job_task}, timeout=self.visibility_timeout / 3)
+                if done:
+                    break
+                if not await asyncio.to_thread(self.queue.extend, lease, self.visibility_timeout):
+                    # The lease expired and another worker took the job over
+                    logger.warning(f"Lost lease on job {lease.job_id}, abandoning it")
+                    job_task.cancel()
+                    await asyncio.gather(job_task, return_exceptions=True)
+                    return
+            job_task.result()
+        except asyncio.CancelledError:
+            job_task.cancel()
+            await asyncio.gather(job_task, return_exceptions=True)
+            await asyncio.to_thread(self.queue.release, lease)
+            raise
+
+    async def _run(self, lease: Lease) -> None:
+        job_id = lease.job_id
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None:
+            await asyncio.to_thread(self.queue.ack, lease)
+            return
+        
+        if job["status"] not in ("completed", "failed"):
+            if lease.attempt > settings.JOB_MAX_ATTEMPTS:
+                logger.error(f"Job gave up after {settings.JOB_MAX_ATTEMPTS} attempts", extra={"job_id": job_id})
+                await asyncio.to_thread(
+                    self.store.update, job_id, status="failed", error=f"Job did not finish after {settings.JOB_MAX_ATTEMPTS} attempts"
+                )
+            elif not await self._execute(job, lease):
+                return
+            self.completed += 1
+        
+        # Deliver the webhook before acknowledging, so a crash in between re-delivers it
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job["webhook_url"] and job["webhook_status"] == "pending":
+            webhook_status = await notify_webhook(job)
+            await asyncio.to_thread(self.store.update, job_id, webhook_status=webhook_status)
+        await asyncio.to_thread(self.queue.ack, lease)
+
+    async def _execute(self, job: dict, lease: Lease) -> bool:
+        """Run the job's generation and record the outcome. Returns ``False`` if it was deferred."""
+        job_id = job["id"]
+        await asyncio.to_thread(self.store.update, job_id, status="running", attempts=lease.attempt)
+        bind_log_context(job_id=job_id)
+        llm_totals = track_request_metrics()
+        logger.info(f"Running job", extra={"attempt": lease.attempt, "worker_id": lease.worker_id})
+        try:
+            with GENERATIONS_IN_FLIGHT.track_inprogress(kind="job"), \
+                    trace_span("job", kind="consumer", job_id=job_id, attempt=lease.attempt) as span:
+                if span.trace_id:
+                    bind_log_context(trace_id=span.trace_id)
+                result = await execute_job(job_id, job["request"])
+        except AdmissionRejected as e:
+            # Back off while the LLM is saturated instead of failing the job
+            logger.warning(f"Job {job_id} deferred by admission control, retrying in {e.retry_after}s")
+            # A deferral is not a failed attempt, so it must not use up the retry budget
+            await asyncio.to_thread(self.store.update, job_id, status="queued", attempts=lease.attempt - 1)
+            await asyncio.to_thread(self.queue.release, lease, delay=e.retry_after, count_attempt=False)
+            return False
+        except Exception as e:
+            logger.error(f"Job failed: {str(e)}", extra={"job_id": job_id}, exc_info=True)
+            await asyncio.to_thread(self.store.update, job_id, status="failed", error=str(e))
+        else:
+            response = RoadmapResponse.from_state(result, job_id)
+            await asyncio.to_thread(self.store.update, job_id, status="completed", result=response.model_dump(), error=None)
+            logger.info(f"Job completed", extra={"llm_metrics": llm_totals})
+        return True
+
+
+# Global instances - lazy initialization
+_job_store: Optional[JobStore] = None
+_job_worker: Optional[JobWorker] = None
+
+
+def get_job_store() -> JobStore:
+    """Get or create the global job store."""
+    global _job_store
+    if _job_store is None:
+        _job_store = JobStore(settings.JOBS_DB_PATH)
+    return _job_store
+
+
+def get_job_worker() -> JobWorker:
+    """Get or create the job worker embedded in the API process."""
+    global _job_worker
+    if _job_worker is None:
+        _job_worker = JobWorker(get_job_store(), get_job_queue(), settings.JOB_WORKERS)
+    return _job_worker
@@ -0,0 +1,202 @@
+"""
+Persistent prompt-response cache for LLM calls.
+
+Responses are stored in SQLite keyed by a hash of the fully rendered prompt
+and the generation parameters that affect the output (model, temperature,
+num_ctx, num_predict). Entries expire after a TTL and the table is bounded with LRU
+eviction on last access time.
+
+Hits do not write to the database: their access times are buffered and
+written in one batch every ``ACCESS_FLUSH_SIZE`` hits or
+``ACCESS_FLUSH_SECONDS``, and always before an eviction. The entry count is
+tracked on each write rather than counted, and recounted from the table
+every ``SIZE_RECOUNT_WRITES`` writes to pick up other processes sharing the file.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Buffered access times are written once this many hits are pending...
+ACCESS_FLUSH_SIZE = 64
+# ...or on the first hit this many seconds after the previous write
+ACCESS_FLUSH_SECONDS = 5.0
+# Writes between recounts of the table size
+SIZE_RECOUNT_WRITES = 256
+
+
+def make_cache_key(
+    prompt: str,
+    model: str,
+    temperature: Optional[float],
+    num_ctx: Optional[int],
+    num_predict: Optional[int] = None,
+) -> str:
+    """Build a stable cache key for a prompt and its generation parameters."""
+    raw = "\x1f".join([model, repr(temperature), repr(num_ctx), repr(num_predict), prompt])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with TTL expiry and LRU eviction."""
+
+    def __init__(self, path: str, max_entries: int = 1000, ttl_seconds: int = 7 * 24 * 3600):
+        """
+        Args:
+            path: SQLite database file (``":memory:"`` for a process-local cache)
+            max_entries: Maximum number of cached responses before LRU eviction
+            ttl_seconds: Seconds a response stays valid after it was stored
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}
+        self._last_flush = time.time()
+        self._writes = 0
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        logger.info(f"LLM response cache ready at {path} with {self._size} entries")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or ``None`` on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._pending_access.pop(key, None)
+                self._size -= 1
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._pending_access[key] = now
+            if len(self._pending_access) >= ACCESS_FLUSH_SIZE or now - self._last_flush >= ACCESS_FLUSH_SECONDS:
+                self._write_access_times()
+                self._conn.commit()
+            self.hits += 1
+            return response
+
+    def _write_access_times(self) -> None:
+        """Write buffered access times (without committing); the caller holds the lock."""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+        self._last_flush = time.time()
+
+    def set(self, key: str, response: str, model: str = "") -> None:
+        """Store a response, evicting the least recently used entries if over capacity."""
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop(key, None)
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_cache (key, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            ).rowcount
+            if inserted:
+                self._size += 1
+            else:
+                self._conn.execute(
+                    "UPDATE llm_cache SET model = ?, response = ?, created_at = ?, last_access = ? WHERE key = ?",
+                    (model, response, now, now, key)
+                )
+            self._writes += 1
+            if self._writes % SIZE_RECOUNT_WRITES == 0:
+                # Other processes may share the file
+                self._size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                # Evict in real access order
+                self._write_access_times()
+                evicted = self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                ).rowcount
+                self._size -= evicted
+                self.evictions += evicted
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all cached responses and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._pending_access.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+        logger.info("LLM response cache cleared")
+
+    def get_stats(self) -> dict:
+        """Get statistics about the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Global cache instance - lazy initialization
+_llm_cache_instance: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get or create the global LLM response cache, or ``None`` if caching is disabled."""
+    global _llm_cache_instance
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache_instance is None:
+        with _llm_cache_lock:
+            if _llm_cache_instance is None:
+                _llm_cache_instance = LLMResponseCache(
+                    path=settings.LLM_CACHE_PATH,
+                    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                )
+    return _llm_cache_instance
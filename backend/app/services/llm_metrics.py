@@ -0,0 +1,209 @@
+"""
+Per-node LLM performance metrics.
+
+Ollama reports how long it spent on each generation with the final streamed
+chunk: ``prompt_eval_count``/``prompt_eval_duration`` (prompt processing),
+``eval_count``/``eval_duration`` (token generation) and ``load_duration``
+(model load), durations in nanoseconds. :class:`OllamaMetricsHandler` picks
+these up from the LLM's end-of-run callback, since the chains end in a string
+parser that drops them, and :func:`_arun_chain` adds time-to-first-token and
+wall time.
+
+Each call is logged with its metrics (carrying the request's log context),
+summed per node into the metrics of the current request (see
+:func:`track_request_metrics`), and added to rolling per-node histograms.
+"""
+import bisect
+import threading
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional, Sequence
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from app.core.config import settings
+from app.core.metrics import (
+    LLM_EVAL_SECONDS, LLM_OUTPUT_TOKENS, LLM_PROMPT_TOKENS, LLM_STAGE_DURATION, LLM_TIME_TO_FIRST_TOKEN
+)
+
+# Histogram bucket upper bounds per metric
+SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+TOKENS_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192)
+
+HISTOGRAM_BUCKETS = {
+    "wall_seconds": SECONDS_BUCKETS,
+    "ttft_seconds": SECONDS_BUCKETS,
+    "prompt_tokens": TOKENS_BUCKETS,
+    "output_tokens": TOKENS_BUCKETS,
+    "prompt_tokens_per_second": TOKENS_PER_SECOND_BUCKETS,
+    "output_tokens_per_second": TOKENS_PER_SECOND_BUCKETS,
+}
+
+# Sample of the generation running in the current context, filled in by the callback handler
+_current_sample: ContextVar[Optional[dict]] = ContextVar("llm_generation_sample", default=None)
+
+# Per-node totals of the request being handled in the current context
+_request_metrics: ContextVar[Optional[dict]] = ContextVar("request_llm_metrics", default=None)
+
+
+def start_sample() -> dict:
+    """Start collecting Ollama's metrics for a generation made in the current context."""
+    sample: dict = {}
+    _current_sample.set(sample)
+    return sample
+
+
+class OllamaMetricsHandler(BaseCallbackHandler):
+    """Copies Ollama's timing and token counts into the current generation sample."""
+
+    # Run in the caller's context (not a thread pool) so the sample is visible
+    run_inline = True
+
+    def on_llm_end(self, response: LLMResult, **kwargs) -> None:
+        sample = _current_sample.get()
+        if sample is None or not response.generations or not response.generations[0]:
+            return
+        info = response.generations[0][0].generation_info or {}
+        for key, field in (("prompt_eval_count", "prompt_tokens"), ("eval_count", "output_tokens")):
+            if info.get(key) is not None:
+                sample[field] = info[key]
+        for key, field in (
+            ("prompt_eval_duration", "prompt_eval_seconds"),
+            ("eval_duration", "eval_seconds"),
+            ("load_duration", "load_seconds"),
+        ):
+            if info.get(key) is not None:
+                sample[field] = round(info[key] / 1e9, 4)
+
+
+ollama_metrics_handler = OllamaMetricsHandler()
+
+
+def generation_metrics(wall_seconds: float, sample: Optional[dict] = None) -> dict:
+    """Metrics of one call: wall time plus, for generations, Ollama's numbers and derived tokens/sec."""
+    metrics = {"wall_seconds": round(wall_seconds, 4), **(sample or {})}
+    for tokens, seconds, rate in (
+        ("prompt_tokens", "prompt_eval_seconds", "prompt_tokens_per_second"),
+        ("output_tokens", "eval_seconds", "output_tokens_per_second"),
+    ):
+        if metrics.get(tokens) and metrics.get(seconds):
+            metrics[rate] = round(metrics[tokens] / metrics[seconds], 2)
+    return metrics
+
+
+class RollingHistogram:
+    """Histogram and percentiles over the last ``window`` observations."""
+
+    def __init__(self, buckets: Sequence[float], window: int = 500):
+        self.buckets = tuple(buckets)
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.total = 0
+
+    def observe(self, value: float) -> None:
+        self._samples.append(value)
+        self.total += 1
+
+    def get_stats(self) -> dict:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "total": self.total}
+        counts = [0] * (len(self.buckets) + 1)
+        for value in samples:
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {
+            "count": len(samples),
+            "total": self.total,
+            "mean": round(sum(samples) / len(samples), 4),
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": samples[-1],
+            "buckets": [[bound, n] for bound, n in zip([*self.buckets, "+Inf"], counts)],
+        }
+
+
+class LLMMetrics:
+    """Rolling per-node histograms of LLM call metrics."""
+
+    def __init__(self, window: int = 500):
+        """
+        Args:
+            window: Observations per histogram that percentiles and buckets are computed over
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[str, RollingHistogram]] = {}
+        self._sources: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def observe(self, node: str, source: str, metrics: dict) -> None:
+        """Record one call of a node. Only generations ("ollama") have token metrics."""
+        with self._lock:
+            self._sources[node][source] += 1
+            histograms = self._histograms.setdefault(node, {})
+            for name, value in metrics.items():
+                if name not in HISTOGRAM_BUCKETS:
+                    continue
+                if name not in histograms:
+                    histograms[name] = RollingHistogram(HISTOGRAM_BUCKETS[name], self.window)
+                histograms[name].observe(value)
+
+    def get_stats(self) -> dict:
+        """Get per-node call counts by source and histogram statistics."""
+        with self._lock:
+            return {
+                node: {
+                    "calls": dict(self._sources[node]),
+                    **{name: h.get_stats() for name, h in sorted(histograms.items())},
+                }
+                for node, histograms in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._sources.clear()
+
+
+llm_metrics = LLMMetrics(window=settings.LLM_METRICS_WINDOW)
+
+
+def track_request_metrics() -> Dict[str, dict]:
+    """
+    Start collecting per-node LLM totals for the request handled in the current
+    context. Graph nodes run in copies of this context and add to the returned dict.
+    """
+    totals: Dict[str, dict] = {}
+    _request_metrics.set(totals)
+    return totals
+
+
+def record_generation(node: str, source: str, metrics: dict) -> None:
+    """Add a call's metrics to the node's histograms, the Prometheus metrics and the current request's totals."""
+    llm_metrics.observe(node, source, metrics)
+    LLM_STAGE_DURATION.observe(metrics["wall_seconds"], node=node, source=source)
+    if "ttft_seconds" in metrics:
+        LLM_TIME_TO_FIRST_TOKEN.observe(metrics["ttft_seconds"], node=node)
+    if "prompt_tokens" in metrics:
+        LLM_PROMPT_TOKENS.inc(metrics["prompt_tokens"], node=node)
+    if "output_tokens" in metrics:
+        LLM_OUTPUT_TOKENS.inc(metrics["output_tokens"], node=node)
+    if "eval_seconds" in metrics:
+        LLM_EVAL_SECONDS.inc(metrics["eval_seconds"], node=node)
+    totals = _request_metrics.get()
+    if totals is None:
+        return
+    node_totals = totals.setdefault(node, {"calls": 0})
+    node_totals["calls"] += 1
+    # Time to first token of the node's first generation; everything else is summed
+    if "ttft_seconds" in metrics:
+        node_totals.setdefault("ttft_seconds", metrics["ttft_seconds"])
+    for name in ("wall_seconds", "prompt_tokens", "prompt_eval_seconds", "output_tokens", "eval_seconds"):
+        if name in metrics:
+            node_totals[name] = round(node_totals.get(name, 0) + metrics[name], 4)
+    if node_totals.get("output_tokens") and node_totals.get("eval_seconds"):
+        node_totals["output_tokens_per_second"] = round(node_totals["output_tokens"] / node_totals["eval_seconds"], 2)
+
@@ -0,0 +1,227 @@
+"""
+Pools of Ollama backends with health tracking and failover.
+
+Generation and embedding traffic use separate pools, each configured with a
+list of Ollama base URLs. Calls are routed to the healthy backend with the
+fewest outstanding requests. A backend that fails repeatedly is taken out of
+rotation for a cooldown period, after which it gets another chance, and a
+call that fails on one backend is retried on the next untried one.
+"""
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional, TypeVar
+import httpx
+from ollama import AsyncClient, Client, ResponseError
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class NoHealthyBackendError(RuntimeError):
+    """Raised when every backend of a pool has been tried or is unavailable."""
+
+
+class PartialResponseError(RuntimeError):
+    """
+    A backend failed after part of a streamed response was delivered.
+
+    The backend is still marked as failed, but the call is not retried
+    elsewhere because the caller has already consumed output from it.
+    """
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Whether an error means the backend itself is unavailable or broken."""
+    if isinstance(error, PartialResponseError) and error.__cause__ is not None:
+        return is_backend_failure(error.__cause__)
+    if isinstance(error, ResponseError):
+        return error.status_code >= 500
+    # ollama raises ConnectionError when the server cannot be reached
+    return isinstance(error, (httpx.TransportError, ConnectionError))
+
+
+class OllamaBackend:
+    """A single Ollama server and its health/load counters."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self._client: Optional[Client] = None
+        self._async_client: Optional[AsyncClient] = None
+
+    @property
+    def client(self) -> Client:
+        """Synchronous ollama client (one connection pool per backend)."""
+        if self._client is None:
+            self._client = Client(host=self.url)
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncClient:
+        """Async ollama client (one connection pool per backend)."""
+        if self._async_client is None:
+            self._async_client = AsyncClient(host=self.url)
+        return self._async_client
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def get_stats(self, now: float) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.is_healthy(now),
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class OllamaPool:
+    """Least-outstanding-requests load balancer over a list of Ollama backends."""
+
+    def __init__(self, name: str, urls: List[str], failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        """
+        Args:
+            name: Pool name used in logs and stats
+            urls: Ollama base URLs
+            failure_threshold: Consecutive failures before a backend is taken out of rotation
+            cooldown_seconds: How long an unhealthy backend is skipped
+        """
+        if not urls:
+            raise ValueError(f"Ollama pool '{name}' needs at least one backend URL")
+        self.name = name
+        self.backends = [OllamaBackend(url) for url in urls]
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+
+    def _acquire(self, exclude: set) -> OllamaBackend:
+        """Pick the least-loaded healthy backend not in ``exclude`` and count it as busy."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [b for b in self.backends if b.url not in exclude]
+            if not candidates:
+                raise NoHealthyBackendError(f"All Ollama backends in pool '{self.name}' failed")
+            healthy = [b for b in candidates if b.is_healthy(now)]
+            if healthy:
+                backend = min(healthy, key=lambda b: (b.outstanding, b.requests))
+            else:
+                # Nothing healthy: probe the backend whose cooldown ends first
+                backend = min(candidates, key=lambda b: b.unhealthy_until)
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def _release(self, backend: OllamaBackend, error: Optional[BaseException]) -> None:
+        """Return a backend to the pool, updating its health from the call outcome."""
+        with self._lock:
+            backend.outstanding -= 1
+            if error is None:
+                backend.consecutive_failures = 0
+                backend.unhealthy_until = 0.0
+                return
+            if not is_backend_failure(error):
+                return
+            backend.failures += 1
+            backend.consecutive_failures += 1
+            if backend.consecutive_failures >= self.failure_threshold:
+                backend.unhealthy_until = time.monotonic() + self.cooldown_seconds
+                logger.warning(
+                    f"Ollama backend {backend.url} marked unhealthy for {self.cooldown_seconds}s "
+                    f"after {backend.consecutive_failures} failures: {str(error)}"
+                )
+
+    def _should_retry(self, error: Exception, tried: set) -> bool:
+        if isinstance(error, PartialResponseError) or not is_backend_failure(error):
+            return False
+        return len(tried) < len(self.backends)
+
+    def call(self, fn: Callable[[OllamaBackend], T]) -> T:
+        """Run ``fn(backend)``, failing over to other backends on backend errors."""
+        tried: set = set()
+        while True:
+            backend = self._acquire(tried)
+            tried.add(backend.url)
+            try:
+                result = fn(backend)
+            except BaseException as e:
+                self._release(backend, e)
+                if isinstance(e, Exception) and self._should_retry(e, tried):
+                    logger.warning(f"Ollama backend {backend.url} failed ({str(e)}), retrying on another backend")
+                    continue
+                raise
+            self._release(backend, None)
+            return result
+
+    async def acall(self, fn: Callable[[OllamaBackend], Awaitable[T]]) -> T:
+        """Async variant of :meth:`call`."""
+        tried: set = set()
+        while True:
+            backend = self._acquire(tried)
+            tried.add(backend.url)
+            try:
+                result = await fn(backend)
+            except BaseException as e:
+                self._release(backend, e)
+                if isinstance(e, Exception) and self._should_retry(e, tried):
+                    logger.warning(f"Ollama backend {backend.url} failed ({str(e)}), retrying on another backend")
+                    continue
+                raise
+            self._release(backend, None)
+            return result
+
+    def get_stats(self) -> dict:
+        """Get per-backend health and load statistics."""
+        now = time.monotonic()
+        with self._lock:
+            backends = [b.get_stats(now) for b in self.backends]
+        return {
+            "pool": self.name,
+            "healthy_backends": sum(1 for b in backends if b["healthy"]),
+            "backends": backends,
+        }
+
+
+_generation_pool: Optional[OllamaPool] = None
+_embedding_pool: Optional[OllamaPool] = None
+_pools_lock = threading.Lock()
+
+
+def get_generation_pool() -> OllamaPool:
+    """Get or create the pool used for LLM generation."""
+    global _generation_pool
+    if _generation_pool is None:
+        with _pools_lock:
+            if _generation_pool is None:
+                urls = settings.OLLAMA_GENERATION_URLS or [settings.OLLAMA_BASE_URL]
+                _generation_pool = OllamaPool(
+                    "generation", urls,
+                    failure_threshold=settings.OLLAMA_BACKEND_FAILURE_THRESHOLD,
+                    cooldown_seconds=settings.OLLAMA_BACKEND_COOLDOWN_SECONDS,
+                )
+                logger.info(f"Ollama generation pool: {', '.join(b.url for b in _generation_pool.backends)}")
+    return _generation_pool
+
+
+def get_embedding_pool() -> OllamaPool:
+    """Get or create the pool used for embeddings (defaults to the generation backends)."""
+    global _embedding_pool
+    if _embedding_pool is None:
+        with _pools_lock:
+            if _embedding_pool is None:
+                urls = settings.OLLAMA_EMBEDDING_URLS or settings.OLLAMA_GENERATION_URLS or [settings.OLLAMA_BASE_URL]
+                _embedding_pool = OllamaPool(
+                    "embedding", urls,
+                    failure_threshold=settings.OLLAMA_BACKEND_FAILURE_THRESHOLD,
+                    cooldown_seconds=settings.OLLAMA_BACKEND_COOLDOWN_SECONDS,
+                )
+                logger.info(f"Ollama embedding pool: {', '.join(b.url for b in _embedding_pool.backends)}")
+    return _embedding_pool
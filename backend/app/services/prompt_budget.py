@@ -0,0 +1,119 @@
+"""
+Token-budgeted prompt assembly.
+
+Fits the variable fields of a prompt into the model context window
+(``num_ctx``) minus room reserved for the model's answer. When the fields do
+not fit, the lowest-priority fields are truncated first (keeping their head
+and tail) and every budget decision is logged.
+"""
+import math
+from typing import Dict, List, Optional
+from langchain_core.prompts import PromptTemplate
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Minimum tokens a field keeps before lower-priority fields are exhausted
+MIN_FIELD_TOKENS = 64
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate the token count of ``text``.
+
+    Uses a characters-per-token ratio (``PROMPT_CHARS_PER_TOKEN``) rather than
+    the model tokenizer, which is not available locally; the default of 4 is
+    a conservative estimate for English text with Llama-family tokenizers.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / settings.PROMPT_CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Shorten ``text`` to about ``max_tokens`` tokens, keeping its head and tail."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(0, int(max_tokens * settings.PROMPT_CHARS_PER_TOKEN))
+    marker = "\n[... truncated to fit the context window ...]\n"
+    if max_chars <= len(marker):
+        return text[:max_chars]
+    keep = max_chars - len(marker)
+    head = keep * 2 // 3
+    tail = keep - head
+    return text[:head] + marker + (text[-tail:] if tail else "")
+
+
+def prompt_token_budget(num_ctx: int, num_predict: Optional[int] = None) -> int:
+    """
+    Tokens available for the prompt once the answer's share of the context is reserved.
+
+    The answer gets ``num_predict`` tokens when set, otherwise
+    ``PROMPT_RESERVED_OUTPUT_TOKENS``, capped at half of the context.
+    """
+    reserved = min(num_predict or settings.PROMPT_RESERVED_OUTPUT_TOKENS, num_ctx // 2)
+    return num_ctx - reserved
+
+
+def fit_prompt_inputs(
+    node: str,
+    prompt: PromptTemplate,
+    inputs: Dict[str, str],
+    priorities: List[str],
+    num_ctx: int,
+    num_predict: Optional[int] = None,
+) -> Dict[str, str]:
+    """
+    Truncate prompt fields so the rendered prompt fits the context window.
+
+    Args:
+        node: Graph node building the prompt (for logging)
+        prompt: Template the inputs will be rendered into
+        inputs: Template variables
+        priorities: Variable names ordered from highest to lowest priority;
+            variables not listed are never truncated
+        num_ctx: Model context window in tokens
+        num_predict: Maximum answer length in tokens, if limited
+
+    Returns:
+        Inputs with low-priority fields shortened as needed
+    """
+    fixed = prompt.format(**{name: "" for name in prompt.input_variables})
+    available = prompt_token_budget(num_ctx, num_predict) - count_tokens(fixed)
+    sizes = {name: count_tokens(str(inputs.get(name, ""))) for name in prompt.input_variables}
+    total = sum(sizes.values())
+    if total <= available:
+        return inputs
+
+    over = total - available
+    allowed = dict(sizes)
+    lowest_first = [name for name in reversed(priorities) if name in allowed]
+    # First pass cuts fields down to a floor; second pass removes the floors if still over
+    for floor in (MIN_FIELD_TOKENS, 0):
+        for name in lowest_first:
+            if over <= 0:
+                break
+            cut = min(over, max(0, allowed[name] - floor))
+            allowed[name] -= cut
+            over -= cut
+
+    fitted = dict(inputs)
+    decisions = {}
+    for name in lowest_first:
+        if allowed[name] < sizes[name]:
+            fitted[name] = truncate_to_tokens(str(inputs[name]), allowed[name])
+            decisions[name] = f"{sizes[name]}->{allowed[name]}"
+
+    logger.info(
+        f"Prompt for {node} exceeds its token budget, truncated {', '.join(decisions)}",
+        extra={
+            "node": node,
+            "num_ctx": num_ctx,
+            "available_tokens": available,
+            "requested_tokens": total,
+            "budget_decisions": decisions,
+            "still_over_tokens": max(0, over),
+        }
+    )
+    return fitted
@@ -0,0 +1,225 @@
+"""
+Local catalog of learning resources with lexical search.
+
+Courses, projects and interview material are loaded from a JSON data file
+into an in-memory inverted index ranked with BM25. Each posting stores the
+term's precomputed BM25 weight for the document, so a query is a handful of
+dictionary lookups and additions, which is fast enough to run on every
+request, offline and without any API key.
+
+The built index is saved next to the other caches and reused while the data
+file is unchanged (it records the file's content hash). Rebuild it with
+``python -m mapey catalog`` after editing the data file.
+"""
+import hashlib
+import heapq
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the index layout or the tokenizer changes
+INDEX_VERSION = 1
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "resource_catalog.json"
+
+RESOURCE_KINDS = ("course", "project", "interview")
+
+# Field weights: a term in the title or tags counts this many times
+TITLE_WEIGHT = 2
+TAG_WEIGHT = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in into is it of on or the to with your you".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; a trailing plural 's' is dropped."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _document_terms(doc: dict) -> List[str]:
+    return (
+        tokenize(doc["title"]) * TITLE_WEIGHT
+        + tokenize(" ".join(doc.get("tags", []))) * TAG_WEIGHT
+        + tokenize(doc.get("description", ""))
+    )
+
+
+def load_catalog_entries(path: str) -> Tuple[List[dict], str]:
+    """
+    Read and validate a catalog data file.
+
+    Returns:
+        The resources and the content hash of the file
+    """
+    raw = Path(path).read_bytes()
+    entries = json.loads(raw)["resources"]
+    for i, entry in enumerate(entries):
+        missing = [f for f in ("title", "url", "kind") if not entry.get(f)]
+        if missing:
+            raise ValueError(f"Catalog entry {i} is missing {', '.join(missing)}")
+        if entry["kind"] not in RESOURCE_KINDS:
+            raise ValueError(f"Catalog entry {i} has unknown kind '{entry['kind']}'")
+    return entries, hashlib.sha256(raw).hexdigest()
+
+
+class ResourceCatalog:
+    """In-memory inverted index over catalog resources, ranked with BM25."""
+
+    def __init__(self, documents: List[dict], postings: Dict[str, List[List[float]]], source_hash: str = ""):
+        """
+        Args:
+            documents: Catalog resources, indexed by position
+            postings: Term -> ``[doc_index, bm25_weight]`` pairs
+            source_hash: Content hash of the data file the index was built from
+        """
+        self.documents = documents
+        self.postings = postings
+        self.source_hash = source_hash
+
+    @classmethod
+    def build(cls, documents: List[dict], source_hash: str = "", k1: float = 1.2, b: float = 0.75) -> "ResourceCatalog":
+        """Index documents, precomputing each term's BM25 weight per document."""
+        term_counts = [Counter(_document_terms(doc)) for doc in documents]
+        lengths = [sum(counts.values()) for counts in term_counts]
+        avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+        doc_freq = Counter(term for counts in term_counts for term in counts)
+
+        n = len(documents)
+        postings: Dict[str, List[List[float]]] = defaultdict(list)
+        for i, counts in enumerate(term_counts):
+            norm = k1 * (1 - b + b * lengths[i] / avg_length)
+            for term, tf in counts.items():
+                idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                postings[term].append([i, round(idf * tf * (k1 + 1) / (tf + norm), 6)])
+        return cls(documents, dict(postings), source_hash)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ResourceCatalog":
+        """Build the index from a catalog data file."""
+        documents, source_hash = load_catalog_entries(path)
+        return cls.build(documents, source_hash)
+
+    @classmethod
+    def load(cls, path: str) -> "ResourceCatalog":
+        """Load a saved index."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Index version {data.get('version')} is not {INDEX_VERSION}")
+        return cls(data["documents"], data["postings"], data["source_hash"])
+
+    def save(self, path: str) -> None:
+        """Save the index as JSON."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "source_hash": self.source_hash,
+                    "documents": self.documents,
+                    "postings": self.postings,
+                },
+                f,
+                ensure_ascii=False,
+                separators=(",", ":")
+            )
+
+    def search(self, query: str, k: int = 5, kind: Optional[str] = None) -> List[dict]:
+        """
+        Rank resources against a query.
+
+        Args:
+            query: Free-text query, e.g. the target role
+            k: Maximum number of results
+            kind: Only return resources of this kind ("course", "project" or "interview")
+
+        Returns:
+            Matching resources, best first, each with its ``score``
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            for doc, weight in self.postings.get(term, ()):
+                scores[doc] += weight
+        if kind is not None:
+            scores = {doc: score for doc, score in scores.items() if self.documents[doc]["kind"] == kind}
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [{**self.documents[doc], "score": round(score, 4)} for doc, score in best]
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def get_stats(self) -> dict:
+        """Get statistics about the index."""
+        return {
+            "resources": len(self.documents),
+            "terms": len(self.postings),
+            "by_kind": dict(Counter(doc["kind"] for doc in self.documents)),
+            "source_hash": self.source_hash,
+        }
+
+
+def catalog_source_path() -> str:
+    """Configured catalog data file, or the one bundled with the app."""
+    return settings.RESOURCE_CATALOG_PATH or str(DEFAULT_CATALOG_PATH)
+
+
+def rebuild_index(source: Optional[str] = None, output: Optional[str] = None) -> ResourceCatalog:
+    """Build the index from the data file and save it."""
+    catalog = ResourceCatalog.from_file(source or catalog_source_path())
+    catalog.save(output or settings.RESOURCE_CATALOG_INDEX_PATH)
+    return catalog
+
+
+def _load_or_build(source: str, index_path: str) -> ResourceCatalog:
+    """Load the saved index if it matches the data file, otherwise rebuild it."""
+    _, source_hash = load_catalog_entries(source)
+    if Path(index_path).exists():
+        try:
+            catalog = ResourceCatalog.load(index_path)
+            if catalog.source_hash == source_hash:
+                return catalog
+            logger.info("Resource catalog changed since the index was built, rebuilding")
+        except Exception as e:
+            logger.warning(f"Could not load resource catalog index: {str(e)}, rebuilding")
+    catalog = ResourceCatalog.from_file(source)
+    try:
+        catalog.save(index_path)
+    except OSError as e:
+        logger.warning(f"Could not save resource catalog index: {str(e)}")
+    return catalog
+
+
+# Global instance - lazy initialization
+_resource_catalog_instance: Optional[ResourceCatalog] = None
+
+
+def get_resource_catalog() -> Optional[ResourceCatalog]:
+    """Get or load the global resource catalog, or ``None`` if it is disabled or unreadable."""
+    global _resource_catalog_instance
+    if settings.RESOURCE_CATALOG_MODE == "off":
+        return None
+    if _resource_catalog_instance is None:
+        try:
+            _resource_catalog_instance = _load_or_build(catalog_source_path(), settings.RESOURCE_CATALOG_INDEX_PATH)
+        except Exception as e:
+            logger.error(f"Resource catalog unavailable: {str(e)}")
+            return None
+        logger.info(f"Resource catalog ready ({len(_resource_catalog_instance)} resources)")
+    return _resource_catalog_instance
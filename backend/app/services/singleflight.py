@@ -0,0 +1,140 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight computation
+instead of each starting their own. Used to collapse identical LLM stage
+calls when many users request the same role at the same time.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    Async callers use :meth:`do` and synchronous callers in worker threads
+    :meth:`do_blocking`; either kind can join a computation led by the other.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executions = 0
+        self.collapsed = 0
+        # Thread-safe futures, so callers on any event loop or thread can join
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join_or_lead(self, key: str) -> Tuple[Future, bool]:
+        """The in-flight future for ``key`` and whether the caller must run it (leads)."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.collapsed += 1
+                logger.debug(f"{self.name}: joined in-flight call {key[:12]}")
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once for all concurrent callers with the same ``key``.
+
+        Args:
+            key: Identity of the computation
+            fn: Coroutine factory executed by the first caller (the leader)
+
+        Returns:
+            Tuple of the result and whether it was shared from another caller's execution
+        """
+        while True:
+            future, leader = self._join_or_lead(key)
+            if leader:
+                break
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its client disconnected). Unless we
+                # were cancelled ourselves, retry and possibly become the new leader.
+                if asyncio.current_task().cancelling() or not future.cancelled():
+                    raise
+                self.collapsed -= 1
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._finish(key)
+
+    def do_blocking(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Blocking variant of :meth:`do` for synchronous callers.
+
+        Args:
+            key: Identity of the computation
+            fn: Function executed by the first caller (the leader)
+            timeout: Seconds to wait for another caller's execution
+
+        Raises:
+            TimeoutError: If a shared execution did not finish within ``timeout`` seconds
+        """
+        ends_at = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            future, leader = self._join_or_lead(key)
+            if leader:
+                break
+            try:
+                remaining = max(0.0, ends_at - time.monotonic()) if ends_at is not None else None
+                return future.result(timeout=remaining), True
+            except CancelledError:
+                # The leader was cancelled; retry and possibly become the new leader
+                self.collapsed -= 1
+
+        try:
+            result = fn()
+        except TimeoutError:
+            # The leader's deadline (e.g. StageDeadlineExceeded) is its own, not its
+            # followers': like a cancelled async leader, let them retry under theirs
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._finish(key)
+
+    def get_stats(self) -> dict:
+        """Get coalescing statistics."""
+        calls = self.executions + self.collapsed
+        return {
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._inflight),
+            "collapse_ratio": round(self.collapsed / calls, 4) if calls else 0.0,
+        }
@@ -0,0 +1,55 @@
+"""
+Memoized stage outputs for incremental regeneration.
+
+Each graph node's state update is stored under a content hash of the inputs
+it reads (plus anything else that shapes its output, such as the stage's
+model parameters and prompt). When a generation is repeated with some inputs
+changed, e.g. the same resume and topic with a tweaked job description, nodes
+whose input hash is unchanged reuse their stored update and only the
+invalidated part of the DAG recomputes: downstream nodes see identical
+upstream outputs and are reused as well, or recompute if an upstream changed.
+
+Updates are kept in the same SQLite store as the LLM response cache (TTL
+expiry, LRU eviction), in a separate database file.
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Optional
+from app.core.config import settings
+from app.services.llm_cache import LLMResponseCache
+
+# Bump to invalidate all stored stage outputs after changing what nodes produce
+STAGE_MEMO_VERSION = 1
+
+
+def stage_input_hash(node: str, inputs: dict, fingerprint: Any = None) -> str:
+    """Content hash of a node's inputs and the parameters that shape its output."""
+    raw = json.dumps(
+        {"version": STAGE_MEMO_VERSION, "node": node, "inputs": inputs, "fingerprint": fingerprint},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Global store instance - lazy initialization
+_stage_memo_instance: Optional[LLMResponseCache] = None
+_stage_memo_lock = threading.Lock()
+
+
+def get_stage_memo() -> Optional[LLMResponseCache]:
+    """Get or create the global stage output store, or ``None`` if reuse is disabled."""
+    global _stage_memo_instance
+    if not settings.STAGE_MEMO_ENABLED:
+        return None
+    if _stage_memo_instance is None:
+        with _stage_memo_lock:
+            if _stage_memo_instance is None:
+                _stage_memo_instance = LLMResponseCache(
+                    path=settings.STAGE_MEMO_PATH,
+                    max_entries=settings.STAGE_MEMO_MAX_ENTRIES,
+                    ttl_seconds=settings.STAGE_MEMO_TTL_SECONDS,
+                )
+    return _stage_memo_instance
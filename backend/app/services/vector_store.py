@@ -1,14 +1,20 @@
 """
 Vector store service using FAISS for RAG operations with Ollama embeddings.
 """
+import asyncio
 import faiss
 import numpy as np
+import threading
+import time
 from typing import List, Optional
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import EMBEDDING_DURATION
+from app.core.tracing import trace_span
 import pickle
 from pathlib import Path
-from ollama import Client
+from app.services.admission import embedding_admission
+from app.services.ollama_pool import OllamaPool, get_embedding_pool
 
 logger = get_logger(__name__)
 
@@ -19,7 +25,11 @@ class VectorStore:
     def __init__(self):
         self.index: Optional[faiss.Index] = None
         self.texts: List[str] = []
-        self.ollama_client: Optional[Client] = None
+        self.embedding_pool: OllamaPool = get_embedding_pool()
+        self.ready = False
+        # FAISS indexes are not safe for concurrent add/search; async callers use worker threads
+        self._index_lock = threading.RLock()
+        self._init_lock = asyncio.Lock()
         self._initialize_model()
         
         # Load persisted index if available
@@ -27,20 +37,17 @@ class VectorStore:
             self._load_index()
     
     def _initialize_model(self, retry_count: int = 0, max_retries: int = 3):
-        """Initialize the Ollama client for embeddings with retry logic."""
+        """Check that the embedding backends are reachable, with retry logic."""
         import time
         
         try:
-            ollama_url = settings.OLLAMA_BASE_URL
-            logger.info(f"Connecting to Ollama at: {ollama_url} (attempt {retry_count + 1}/{max_retries + 1})")
-            self.ollama_client = Client(host=ollama_url)
+            ollama_urls = ", ".join(b.url for b in self.embedding_pool.backends)
+            logger.info(f"Connecting to Ollama at: {ollama_urls} (attempt {retry_count + 1}/{max_retries + 1})")
             
             # Test connection by getting embeddings for a simple test
-            test_embedding = self.ollama_client.embeddings(
-                model=settings.EMBED_MODEL_NAME,
-                prompt="test"
-            )
-            logger.info(f"Successfully initialized VectorStore with Ollama embeddings model: {settings.EMBED_MODEL_NAME} (dim: {len(test_embedding['embedding'])})")
+            test_embedding = self._embed("test")
+            self.ready = True
+            logger.info(f"Successfully initialized VectorStore with Ollama embeddings model: {settings.EMBED_MODEL_NAME} (dim: {len(test_embedding)})")
         except Exception as e:
             logger.warning(f"Failed to initialize Ollama client (attempt {retry_count + 1}/{max_retries + 1}): {str(e)}")
             
@@ -54,13 +61,64 @@ class VectorStore:
                 logger.error(f"Failed to initialize Ollama client after {max_retries + 1} attempts", exc_info=True)
                 logger.warning("Vector store will not be available. Make sure Ollama is running.")
                 # Don't raise - allow service to start without vector store
-                self.ollama_client = None
+                self.ready = False
+    
+    async def _ainitialize_model(self, max_retries: int = 3) -> None:
+        """Async variant of :meth:`_initialize_model` that backs off without blocking the event loop."""
+        for attempt in range(max_retries + 1):
+            try:
+                logger.info(f"Connecting to Ollama (attempt {attempt + 1}/{max_retries + 1})")
+                test_embedding = await asyncio.to_thread(self._embed, "test")
+                self.ready = True
+                logger.info(f"Successfully initialized VectorStore with Ollama embeddings model: {settings.EMBED_MODEL_NAME} (dim: {len(test_embedding)})")
+                return
+            except Exception as e:
+                logger.warning(f"Failed to initialize Ollama client (attempt {attempt + 1}/{max_retries + 1}): {str(e)}")
+                if attempt < max_retries:
+                    wait_time = 2 ** attempt
+                    logger.info(f"Retrying in {wait_time} seconds...")
+                    await asyncio.sleep(wait_time)
+        logger.error(f"Failed to initialize Ollama client after {max_retries + 1} attempts")
+        self.ready = False
     
     def _ensure_initialized(self):
-        """Retry initialization if client is missing."""
-        if self.ollama_client is None:
+        """Retry initialization if Ollama was unreachable so far."""
+        if not self.ready:
             logger.info("Ollama client not initialized, attempting to reconnect...")
             self._initialize_model()
+    
+    async def _aensure_initialized(self) -> None:
+        """Async variant of :meth:`_ensure_initialized`; concurrent callers share one reconnect."""
+        if self.ready:
+            return
+        async with self._init_lock:
+            if not self.ready:
+                logger.info("Ollama client not initialized, attempting to reconnect...")
+                await self._ainitialize_model()
+
+    def _embed(self, text: str) -> List[float]:
+        """Embed one text on the least-loaded healthy embedding backend, subject to embedding admission control."""
+        with embedding_admission.slot_blocking():
+            started_at = time.perf_counter()
+            response = self.embedding_pool.call(lambda backend: backend.client.embeddings(
+                model=settings.EMBED_MODEL_NAME,
+                prompt=text,
+                keep_alive=settings.OLLAMA_KEEP_ALIVE
+            ))
+            EMBEDDING_DURATION.observe(time.perf_counter() - started_at)
+        return response['embedding']
+    
+    async def _aembed(self, text: str) -> List[float]:
+        """Async variant of :meth:`_embed`, subject to embedding admission control."""
+        async with embedding_admission.slot():
+            started_at = time.perf_counter()
+            response = await self.embedding_pool.acall(lambda backend: backend.async_client.embeddings(
+                model=settings.EMBED_MODEL_NAME,
+                prompt=text,
+                keep_alive=settings.OLLAMA_KEEP_ALIVE
+            ))
+            EMBEDDING_DURATION.observe(time.perf_counter() - started_at)
+        return response['embedding']
 
     def add_texts(self, texts: List[str]) -> int:
         """
@@ -77,22 +135,61 @@ class VectorStore:
             return 0
         
         self._ensure_initialized()
-        if self.ollama_client is None:
+        if not self.ready:
             raise RuntimeError("Ollama client not initialized. Cannot add texts.")
         
-        try:
-            # Get embeddings from Ollama for each text
-            embeddings = []
-            for text in texts:
-                response = self.ollama_client.embeddings(
-                    model=settings.EMBED_MODEL_NAME,
-                    prompt=text
-                )
-                embeddings.append(response['embedding'])
-            
-            embeds = np.array(embeddings, dtype='float32')
-            dim = embeds.shape[1]
+        with trace_span("vector_store.add_texts", **{"embedding.model": settings.EMBED_MODEL_NAME, "chunks": len(texts)}) as span:
+            try:
+                # Get embeddings from Ollama for each text
+                embeddings = []
+                for text in texts:
+                    embeddings.append(self._embed(text))
+                
+                num_added = self._add_embeddings(texts, embeddings)
+                span.set_attribute("vector_store.size", len(self.texts))
+                return num_added
+            except Exception as e:
+                logger.error(f"Error adding texts to vector store: {str(e)}", exc_info=True)
+                raise
+    
+    async def aadd_texts(self, texts: List[str]) -> int:
+        """
+        Add texts to the vector store using the async Ollama client.
+        
+        Args:
+            texts: List of text strings to embed and store
             
+        Returns:
+            Number of texts added
+        """
+        if not texts:
+            logger.warning("Attempted to add empty text list to vector store")
+            return 0
+        
+        await self._aensure_initialized()
+        if not self.ready:
+            raise RuntimeError("Ollama client not initialized. Cannot add texts.")
+        
+        with trace_span("vector_store.add_texts", **{"embedding.model": settings.EMBED_MODEL_NAME, "chunks": len(texts)}) as span:
+            try:
+                embeddings = []
+                for text in texts:
+                    embeddings.append(await self._aembed(text))
+                
+                # Index update and persistence run off the event loop
+                num_added = await asyncio.to_thread(self._add_embeddings, texts, embeddings)
+                span.set_attribute("vector_store.size", len(self.texts))
+                return num_added
+            except Exception as e:
+                logger.error(f"Error adding texts to vector store: {str(e)}", exc_info=True)
+                raise
+    
+    def _add_embeddings(self, texts: List[str], embeddings: List[List[float]]) -> int:
+        """Add precomputed embeddings for ``texts`` to the FAISS index."""
+        embeds = np.array(embeddings, dtype='float32')
+        dim = embeds.shape[1]
+        
+        with self._index_lock:
             if self.index is None:
                 self.index = faiss.IndexFlatL2(dim)
                 logger.info(f"Created new FAISS index with dimension: {dim}")
@@ -106,11 +203,8 @@ class VectorStore:
             # Persist index if path is configured
             if settings.VECTOR_STORE_INDEX_PATH:
                 self._save_index()
-            
-            return num_added
-        except Exception as e:
-            logger.error(f"Error adding texts to vector store: {str(e)}", exc_info=True)
-            raise
+        
+        return num_added
     
     def search(self, query: str, k: int = 4) -> List[str]:
         """
@@ -128,34 +222,73 @@ class VectorStore:
             return []
         
         self._ensure_initialized()
-        if self.ollama_client is None:
+        if not self.ready:
             logger.error("Ollama client not initialized. Cannot search.")
             return []
         
-        try:
-            # Get query embedding from Ollama
-            response = self.ollama_client.embeddings(
-                model=settings.EMBED_MODEL_NAME,
-                prompt=query
-            )
-            q_emb = np.array([response['embedding']], dtype='float32')
+        with trace_span("vector_store.search", k=k, **{"vector_store.size": len(self.texts)}) as span:
+            try:
+                # Get query embedding from Ollama
+                results = self._search_embedding(query, self._embed(query), k)
+                span.set_attribute("results", len(results))
+                return results
+            except Exception as e:
+                span.record_exception(e)
+                logger.error(f"Error searching vector store: {str(e)}", exc_info=True)
+                return []
+    
+    async def asearch(self, query: str, k: int = 4) -> List[str]:
+        """
+        Search for similar texts using the async Ollama client.
+        
+        Args:
+            query: Search query string
+            k: Number of results to return
             
+        Returns:
+            List of most similar text chunks
+        """
+        if self.index is None or len(self.texts) == 0:
+            logger.warning("Vector store is empty, returning empty results")
+            return []
+        
+        await self._aensure_initialized()
+        if not self.ready:
+            logger.error("Ollama client not initialized. Cannot search.")
+            return []
+        
+        with trace_span("vector_store.search", k=k, **{"vector_store.size": len(self.texts)}) as span:
+            try:
+                embedding = await self._aembed(query)
+                results = await asyncio.to_thread(self._search_embedding, query, embedding, k)
+                span.set_attribute("results", len(results))
+                return results
+            except Exception as e:
+                span.record_exception(e)
+                logger.error(f"Error searching vector store: {str(e)}", exc_info=True)
+                return []
+    
+    def _search_embedding(self, query: str, embedding: List[float], k: int) -> List[str]:
+        """Return the ``k`` texts nearest to a query embedding."""
+        q_emb = np.array([embedding], dtype='float32')
+        
+        with self._index_lock:
+            if self.index is None:
+                return []
             # Ensure k doesn't exceed available texts
             k = min(k, len(self.texts))
             
             D, I = self.index.search(q_emb, k)
             results = [self.texts[i] for i in I[0]]
-            
-            logger.debug(f"Search query: '{query[:50]}...', returned {len(results)} results")
-            return results
-        except Exception as e:
-            logger.error(f"Error searching vector store: {str(e)}", exc_info=True)
-            return []
+        
+        logger.debug(f"Search query: '{query[:50]}...', returned {len(results)} results")
+        return results
     
     def clear(self) -> None:
         """Clear all stored texts and reset the index."""
-        self.index = None
-        self.texts = []
+        with self._index_lock:
+            self.index = None
+            self.texts = []
         logger.info("Vector store cleared")
         
         # Remove persisted index file if it exists
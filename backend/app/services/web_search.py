@@ -0,0 +1,363 @@
+"""
+Cached web search for learning resources.
+
+Searches go through a :class:`SearchProvider`; :class:`TavilySearchProvider`
+calls the Tavily REST API over shared HTTP clients (one connection pool for
+sync and one for async callers), and its base URL can point at a local
+stand-in server for tests and benchmarks.
+
+Results are kept in a persistent SQLite cache keyed by the normalised query.
+Fresh entries are returned directly. Stale entries (older than the TTL but
+within the stale window) are returned immediately while a background refresh
+fetches new results (stale-while-revalidate). Older entries count as misses.
+"""
+import asyncio
+import contextvars
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Set, Tuple, Union
+import httpx
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.tracing import trace_span
+from app.services.singleflight import SingleFlight
+
+logger = get_logger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Cache identity of a query: case and whitespace are ignored."""
+    return " ".join(query.lower().split())
+
+
+class SearchProvider(ABC):
+    """Interface for web search backends. Results are dicts with ``title`` and ``url``."""
+
+    name: str = "search"
+
+    @abstractmethod
+    def search(self, query: str, max_results: int) -> List[dict]:
+        """Search synchronously."""
+
+    @abstractmethod
+    async def asearch(self, query: str, max_results: int) -> List[dict]:
+        """Search without blocking the event loop."""
+
+    async def aclose(self) -> None:
+        """Release connections held by the provider."""
+
+
+class TavilySearchProvider(SearchProvider):
+    """Tavily search API over shared, pooled HTTP clients."""
+
+    name = "tavily"
+
+    def __init__(self, api_key: str, base_url: str = "https://api.tavily.com", timeout: float = 10.0):
+        """
+        Args:
+            api_key: Tavily API key
+            base_url: API root; point it at a stand-in server for offline runs
+            timeout: Seconds before a search request is abandoned
+        """
+        self.base_url = base_url.rstrip("/")
+        self._headers = {"Authorization": f"Bearer {api_key}"}
+        self._timeout = timeout
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(base_url=self.base_url, headers=self._headers, timeout=self._timeout)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, headers=self._headers, timeout=self._timeout)
+        return self._async_client
+
+    @staticmethod
+    def _results(response: httpx.Response) -> List[dict]:
+        response.raise_for_status()
+        return [
+            {"title": r.get("title", ""), "url": r["url"]}
+            for r in response.json().get("results", [])
+            if r.get("url")
+        ]
+
+    def search(self, query: str, max_results: int) -> List[dict]:
+        return self._results(self.client.post("/search", json={"query": query, "max_results": max_results}))
+
+    async def asearch(self, query: str, max_results: int) -> List[dict]:
+        response = await self.async_client.post("/search", json={"query": query, "max_results": max_results})
+        return self._results(response)
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class SearchCache:
+    """SQLite-backed search result cache with a freshness TTL and a stale window."""
+
+    def __init__(self, path: str, ttl_seconds: int, stale_seconds: int, max_entries: int = 5000):
+        """
+        Args:
+            path: SQLite database file (``":memory:"`` for a process-local cache)
+            ttl_seconds: Seconds results are fresh
+            stale_seconds: Further seconds stale results are still served while refreshing
+            max_entries: Maximum number of cached queries before the oldest are evicted
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                query TEXT PRIMARY KEY,
+                results TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_fetched ON search_cache(fetched_at)")
+        self._conn.commit()
+
+    def get(self, query: str) -> Optional[Tuple[List[dict], bool]]:
+        """Return ``(results, is_fresh)``, or ``None`` if the query is not cached or too old."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, fetched_at FROM search_cache WHERE query = ?", (query,)
+            ).fetchone()
+        if row is None:
+            return None
+        results, fetched_at = row
+        age = time.time() - fetched_at
+        if age > self.ttl_seconds + self.stale_seconds:
+            return None
+        return json.loads(results), age <= self.ttl_seconds
+
+    def set(self, query: str, results: List[dict]) -> None:
+        """Store results, evicting the oldest entries if over capacity."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (query, results, fetched_at) VALUES (?, ?, ?)",
+                (query, json.dumps(results), time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE query IN "
+                "(SELECT query FROM search_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+
+class WebSearch:
+    """Cached, concurrent search over a :class:`SearchProvider`."""
+
+    def __init__(self, provider: SearchProvider, cache: SearchCache, max_results: int = 5):
+        """
+        Args:
+            provider: Backend that runs the searches
+            cache: Result cache shared across requests and restarts
+            max_results: Results requested per query
+        """
+        self.provider = provider
+        self.cache = cache
+        self.max_results = max_results
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+        self._singleflight = SingleFlight(f"search-{provider.name}")
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+    def _cached(self, key: str) -> Tuple[Optional[List[dict]], bool]:
+        """Cached results and whether they need a background refresh."""
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        results, fresh = entry
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return results, not fresh
+
+    def _claim_refresh(self, key: str) -> bool:
+        """Make sure only one refresh per query runs at a time."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _fetch(self, query: str, key: str) -> List[dict]:
+        try:
+            results = self.provider.search(query, self.max_results)
+        except Exception:
+            self.errors += 1
+            raise
+        self.cache.set(key, results)
+        return results
+
+    async def _afetch(self, query: str, key: str) -> List[dict]:
+        try:
+            results = await self.provider.asearch(query, self.max_results)
+        except Exception:
+            self.errors += 1
+            raise
+        await asyncio.to_thread(self.cache.set, key, results)
+        return results
+
+    def _refresh(self, query: str, key: str) -> None:
+        try:
+            self._fetch(query, key)
+            self.refreshes += 1
+        except Exception as e:
+            logger.warning(f"Background refresh of search '{query[:50]}' failed: {str(e)}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def _arefresh(self, query: str, key: str) -> None:
+        try:
+            await self._afetch(query, key)
+            self.refreshes += 1
+        except Exception as e:
+            logger.warning(f"Background refresh of search '{query[:50]}' failed: {str(e)}")
+        finally:
+            self._refreshing.discard(key)
+
+    def search(self, query: str) -> List[dict]:
+        """Search synchronously; stale results are refreshed on a background thread."""
+        key = normalize_query(query)
+        with trace_span("web_search", kind="client", **{"search.provider": self.provider.name, "search.query": query[:200]}) as span:
+            results, stale = self._cached(key)
+            span.set_attribute("search.cache", "miss" if results is None else "stale" if stale else "hit")
+            if results is None:
+                results = self._fetch(query, key)
+            elif stale and self._claim_refresh(key):
+                threading.Thread(target=self._refresh, args=(query, key), daemon=True).start()
+            span.set_attribute("search.results", len(results))
+            return results
+
+    async def asearch(self, query: str) -> List[dict]:
+        """
+        Search without blocking the event loop. Concurrent misses for the same
+        query share one request; stale results are refreshed in a background task.
+        """
+        key = normalize_query(query)
+        with trace_span("web_search", kind="client", **{"search.provider": self.provider.name, "search.query": query[:200]}) as span:
+            results, stale = await asyncio.to_thread(self._cached, key)
+            span.set_attribute("search.cache", "miss" if results is None else "stale" if stale else "hit")
+            if results is None:
+                results, _ = await self._singleflight.do(key, lambda: self._afetch(query, key))
+            elif stale and self._claim_refresh(key):
+                task = asyncio.create_task(self._arefresh(query, key))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            span.set_attribute("search.results", len(results))
+            return results
+
+    def search_many(self, queries: List[str]) -> List[Union[List[dict], Exception]]:
+        """Run several searches concurrently. Failed searches yield their exception."""
+        def run(query: str):
+            try:
+                return self.search(query)
+            except Exception as e:
+                return e
+
+        # Each search runs in a copy of the caller's context so its span nests under the caller's
+        with ThreadPoolExecutor(max_workers=max(1, len(queries))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, run, q) for q in queries]
+            return [f.result() for f in futures]
+
+    async def asearch_many(self, queries: List[str]) -> List[Union[List[dict], Exception]]:
+        """Async variant of :meth:`search_many`."""
+        return await asyncio.gather(*(self.asearch(q) for q in queries), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        await asyncio.gather(*self._refresh_tasks, return_exceptions=True)
+        await self.provider.aclose()
+
+    def get_stats(self) -> dict:
+        """Get cache and provider statistics."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "provider": self.provider.name,
+            "entries": len(self.cache),
+            "ttl_seconds": self.cache.ttl_seconds,
+            "stale_seconds": self.cache.stale_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "coalesced": self._singleflight.collapsed,
+        }
+
+
+# Global instance - lazy initialization
+_web_search_instance: Optional[WebSearch] = None
+
+
+def get_web_search() -> Optional[WebSearch]:
+    """Get or create the global web search, or ``None`` if no provider is configured."""
+    global _web_search_instance
+    if not settings.TAVILY_API_KEY:
+        return None
+    if _web_search_instance is None:
+        provider = TavilySearchProvider(
+            api_key=settings.TAVILY_API_KEY,
+            base_url=settings.TAVILY_BASE_URL,
+            timeout=settings.SEARCH_TIMEOUT_SECONDS,
+        )
+        cache = SearchCache(
+            path=settings.SEARCH_CACHE_PATH,
+            ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+            stale_seconds=settings.SEARCH_CACHE_STALE_SECONDS,
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+        )
+        _web_search_instance = WebSearch(provider, cache, max_results=settings.SEARCH_MAX_RESULTS)
+        logger.info(f"Web search ready ({provider.name} at {provider.base_url})")
+    return _web_search_instance
+
+
+async def close_web_search() -> None:
+    """Close the global web search's connections."""
+    global _web_search_instance
+    if _web_search_instance is not None:
+        await _web_search_instance.aclose()
+        _web_search_instance = None
@@ -0,0 +1,58 @@
+"""
+Standalone job worker.
+
+Leases roadmap generation jobs from the shared job queue and runs them, so
+generation capacity can be scaled separately from the API processes.
+
+Usage (from the backend directory):
+    python -m app.worker [--concurrency N] [--worker-id ID]
+"""
+import argparse
+import asyncio
+import signal
+from typing import Optional
+from app.core.config import settings
+from app.core.logging import setup_logging, get_logger
+from app.core.tracing import shutdown_tracing
+from app.services.checkpoints import close_checkpointer
+from app.services.job_queue import get_job_queue
+from app.services.jobs import JobWorker, get_job_store
+
+logger = get_logger(__name__)
+
+
+async def run_worker(concurrency: int, worker_id: Optional[str] = None) -> None:
+    """Run a job worker until SIGINT/SIGTERM, then release in-progress jobs."""
+    worker = JobWorker(get_job_store(), get_job_queue(), concurrency, worker_id)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows event loops do not support signal handlers; Ctrl+C still interrupts
+            pass
+
+    worker.start()
+    try:
+        await stop.wait()
+    finally:
+        await worker.stop()
+        await close_checkpointer()
+        await asyncio.to_thread(shutdown_tracing)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mapey roadmap job worker")
+    parser.add_argument("--concurrency", type=int, default=max(1, settings.JOB_WORKERS),
+                        help="Jobs processed at the same time (default: JOB_WORKERS)")
+    parser.add_argument("--worker-id", default=None, help="Worker identity recorded on leases")
+    args = parser.parse_args()
+
+    setup_logging()
+    logger.info(f"Starting job worker (queue: {settings.JOBS_DB_PATH})")
+    asyncio.run(run_worker(args.concurrency, args.worker_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Benchmark: hot backend components in isolation.
+
+Times resume chunking, PDF text extraction, vector store inserts and searches
+(FAISS index with 1k/100k/1M vectors and a deterministic fake embedder, so no
+Ollama is needed), JSON log formatting and SSE event serialisation. Each case
+is calibrated to run for at least ``--min-time`` seconds per repeat and
+reported as per-operation statistics in JSON, together with the commit and
+platform it ran on.
+
+Save a run with ``--output`` and pass it to ``--compare`` on a later commit
+to list the change per case; the exit status is 1 if any case got slower
+than ``--threshold``.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_components [--only vector_store,sse_event] [--sizes 1000,100000]
+        [--dim 256] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.fake_ollama import fake_embedding
+
+GROUPS = ("chunk_text", "read_resume_file", "vector_store", "json_formatter", "sse_event")
+
+# A benchmark case: (name, parameters, function timed per operation)
+Case = Tuple[str, dict, Callable[[], object]]
+
+RESUME_LINE = (
+    "Software engineer with 3 years of Python experience building REST APIs with FastAPI "
+    "and Django, PostgreSQL, Docker and basic AWS deployments"
+)
+
+
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """A text-only PDF with ``pages`` pages of resume-like lines."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = " ".join(f"0 -15 Td ({RESUME_LINE[:90]} {page}.{line}) Tj" for line in range(lines_per_page))
+        content = f"BT /F1 9 Tf 40 780 Td {lines} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R >> >> >>" % (len(objects))
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+def measure(func: Callable[[], object], min_time: float, repeat: int) -> dict:
+    """Per-operation timings of ``func`` over ``repeat`` runs of at least ``min_time`` seconds each."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    per_op = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(per_op)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": round(min(per_op) * 1e6, 3),
+        "median_us": round(median * 1e6, 3),
+        "mean_us": round(statistics.mean(per_op) * 1e6, 3),
+        "stdev_us": round(statistics.stdev(per_op) * 1e6, 3) if len(per_op) > 1 else 0.0,
+        "ops_per_sec": round(1 / median, 2) if median else None,
+    }
+
+
+def chunk_text_cases() -> Iterator[Case]:
+    from app.services.file_processor import chunk_text
+
+    for words in (500, 50_000):
+        text = " ".join(RESUME_LINE.split() * (words // len(RESUME_LINE.split()) + 1))
+        yield "chunk_text", {"words": words}, lambda text=text: chunk_text(text)
+
+
+def read_resume_file_cases() -> Iterator[Case]:
+    from app.services.file_processor import read_resume_file
+
+    for label, pages in (("small", 1), ("large", 40)):
+        pdf = make_pdf(pages)
+        yield "read_resume_file", {"pdf": label, "pages": pages, "bytes": len(pdf)}, \
+            lambda pdf=pdf: read_resume_file(pdf, "resume.pdf")
+
+
+def vector_store_cases(sizes: List[int], dim: int, batch: int) -> Iterator[Case]:
+    from app.services.vector_store import VectorStore
+
+    class FakeEmbeddingVectorStore(VectorStore):
+        """Vector store whose embeddings are hashed locally instead of requested from Ollama."""
+
+        def _embed(self, text: str) -> List[float]:
+            return fake_embedding(text, dim)
+
+    rng = np.random.default_rng(0)
+    chunks = [f"{RESUME_LINE} (chunk {i})" for i in range(batch)]
+    for size in sizes:
+        store = FakeEmbeddingVectorStore()
+        for start in range(0, size, 100_000):
+            n = min(100_000, size - start)
+            store._add_embeddings(
+                [f"stored chunk {i}" for i in range(start, start + n)],
+                rng.random((n, dim), dtype=np.float32),
+            )
+        params = {"vectors": size, "dim": dim}
+        yield "vector_store.search", {**params, "k": 5}, lambda store=store: store.search(RESUME_LINE, k=5)
+        # Last, since it grows the index
+        yield "vector_store.add_texts", {**params, "chunks": batch}, lambda store=store: store.add_texts(chunks)
+        del store
+        gc.collect()
+
+
+def json_formatter_cases() -> Iterator[Case]:
+    from app.core.logging import JSONFormatter
+
+    formatter = JSONFormatter()
+
+    def record(**extra) -> logging.LogRecord:
+        rec = logging.LogRecord("app.services.agents", logging.INFO, __file__, 1, "Request completed", None, None, "run")
+        rec.__dict__.update(extra)
+        return rec
+
+    plain = record(request_id="req_1700000000000")
+    generation = record(
+        request_id="req_1700000000000",
+        run_id="run_0123456789abcdef",
+        node="curriculum_planner",
+        model="llama3.2:1b",
+        temperature=0.3,
+        num_ctx=4096,
+        source="ollama",
+        wall_seconds=4.213,
+        ttft_seconds=0.412,
+        prompt_tokens=812,
+        output_tokens=640,
+        output_tokens_per_second=168.4,
+        llm_metrics={
+            node: {"calls": 1, "wall_seconds": 3.2, "prompt_tokens": 700, "output_tokens": 500}
+            for node in ("topic_analyzer", "skill_gap_agent", "curriculum_planner", "validator")
+        },
+    )
+    yield "json_formatter.format", {"record": "plain"}, lambda: formatter.format(plain)
+    yield "json_formatter.format", {"record": "generation"}, lambda: formatter.format(generation)
+
+
+def sse_event_cases() -> Iterator[Case]:
+    from app.api.routes.roadmap import sse_event
+    from app.models.schemas import RoadmapResponse
+
+    token = {
+        "progress": 40,
+        "step": "Generating curriculum",
+        "status": "streaming",
+        "node": "curriculum_planner",
+        "field": "curriculum",
+        "token": " PyTorch",
+    }
+    section = "## Week 1\n- " + "\n- ".join([RESUME_LINE] * 40)
+    state = {
+        "topic": "ML Engineer",
+        "analysis": section,
+        "skill_gaps": section,
+        "curriculum": section,
+        "resources": section,
+        "roadmap": section * 2,
+        "rag_context": section,
+        "stage_models": {"validator": "llama3.2:1b"},
+    }
+    yield "sse_event", {"event": "token"}, lambda: sse_event(token)
+    yield "sse_event", {"event": "complete"}, lambda: sse_event({
+        "progress": 100,
+        "step": "Complete",
+        "status": "complete",
+        "result": RoadmapResponse.from_state(state, "run_0123456789abcdef").model_dump(),
+    })
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def case_key(result: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()) if k != "bytes")
+    return f"{result['name']}[{params}]"
+
+
+def compare(results: List[dict], baseline: dict, threshold: float) -> List[dict]:
+    """Median change per case against a saved run; ``regression`` marks slowdowns beyond ``threshold``."""
+    previous: Dict[str, dict] = {case_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in results:
+        key = case_key(result)
+        if key not in previous:
+            continue
+        before, after = previous[key]["median_us"], result["median_us"]
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            "case": key,
+            "baseline_median_us": before,
+            "median_us": after,
+            "change": round(change, 4),
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"Comma-separated groups ({', '.join(GROUPS)})")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Vector store sizes")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension (nomic-embed-text uses 768)")
+    parser.add_argument("--batch", type=int, default=10, help="Chunks per add_texts call")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Also write the results to this file")
+    parser.add_argument("--compare", default=None, help="Results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown counted as a regression")
+    args = parser.parse_args()
+
+    groups = [g for g in args.only.split(",") if g]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+
+    # Offline and deterministic: no index persistence, no trace export, no log output
+    os.environ["VECTOR_STORE_INDEX_PATH"] = ""
+    os.environ["TRACING_EXPORTER"] = "none"
+    logging.disable(logging.CRITICAL)
+
+    factories = {
+        "chunk_text": chunk_text_cases,
+        "read_resume_file": read_resume_file_cases,
+        "vector_store": lambda: vector_store_cases([int(s) for s in args.sizes.split(",")], args.dim, args.batch),
+        "json_formatter": json_formatter_cases,
+        "sse_event": sse_event_cases,
+    }
+    results = []
+    for group in groups:
+        for name, params, func in factories[group]():
+            results.append({"name": name, "params": params, **measure(func, args.min_time, args.repeat)})
+            print(f"{case_key(results[-1])}: {results[-1]['median_us']} us", file=sys.stderr)
+
+    report = {
+        "benchmark": "components",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["comparison"] = compare(results, json.load(f), args.threshold)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if any(row["regression"] for row in report.get("comparison", [])):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: sequential chain vs dependency DAG for the roadmap graph.
+
+Runs both topologies against the simulated Ollama server and a stand-in
+Tavily server and reports wall-clock time per generation.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_graph_dag [--runs N] [--search-latency S]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+
+from benchmarks.fake_ollama import FakeOllamaServer, FakeTavilyServer
+
+SAMPLE_RESUME = (
+    "Software engineer with 3 years of Python experience building REST APIs "
+    "with FastAPI and Django, PostgreSQL, Docker and basic AWS deployments. "
+) * 10
+SAMPLE_JD = "We are hiring an ML Engineer with PyTorch, MLOps and model serving experience."
+
+
+def build_sequential_graph(agents):
+    """Rebuild the original strict-chain topology for comparison."""
+    from langgraph.graph import StateGraph, END
+
+    graph = StateGraph(agents.MapeyState)
+    order = [
+        "topic_analyzer", "skill_gap_agent", "curriculum_planner",
+        "rag_retriever", "resource_curator", "validator",
+    ]
+    for name in order:
+        graph.add_node(name, getattr(agents, name))
+    graph.set_entry_point(order[0])
+    for src, dst in zip(order, order[1:]):
+        graph.add_edge(src, dst)
+    graph.add_edge(order[-1], END)
+    return graph.compile()
+
+
+def initial_state() -> dict:
+    return {
+        "topic": "ML Engineer",
+        "resume": SAMPLE_RESUME,
+        "jd": SAMPLE_JD,
+        "analysis": "",
+        "skill_gaps": "",
+        "curriculum": "",
+        "rag_context": "",
+        "resources": "",
+        "roadmap": "",
+    }
+
+
+def time_graph(graph, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        graph.invoke(initial_state())
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    parser.add_argument("--eval-rate", type=float, default=200.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with FakeOllamaServer(eval_rate=args.eval_rate) as server, FakeTavilyServer(latency=args.search_latency) as search:
+        os.environ["OLLAMA_BASE_URL"] = server.base_url
+        os.environ["TAVILY_BASE_URL"] = search.base_url
+        os.environ["TAVILY_API_KEY"] = "fake"
+        # Every run must reach the simulated model and search for a fair comparison
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        os.environ["STAGE_MEMO_ENABLED"] = "false"
+        os.environ["SEARCH_CACHE_TTL_SECONDS"] = "0"
+        os.environ["SEARCH_CACHE_STALE_SECONDS"] = "0"
+        from app.services import agents
+        from app.services.file_processor import chunk_text
+        from app.services.vector_store import get_vector_store
+
+        get_vector_store().add_texts(chunk_text(SAMPLE_RESUME, size=50))
+
+        sequential = time_graph(build_sequential_graph(agents), args.runs)
+        dag = time_graph(agents.create_roadmap_graph(), args.runs)
+
+    seq_mean = statistics.mean(sequential)
+    dag_mean = statistics.mean(dag)
+    print(json.dumps({
+        "benchmark": "graph_dag",
+        "runs": args.runs,
+        "sequential_mean_s": round(seq_mean, 4),
+        "dag_mean_s": round(dag_mean, 4),
+        "saving_s": round(seq_mean - dag_mean, 4),
+        "speedup": round(seq_mean / dag_mean, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
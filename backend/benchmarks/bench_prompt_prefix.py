@@ -0,0 +1,129 @@
+"""
+Benchmark: prompt-eval time per stage with data-first vs static-prefix prompts.
+
+"Before" renders each stage prompt in the original layout (persona line, then
+the per-request data, then the instructions); "after" uses the current
+templates, where the instructions form a static prefix and the data comes
+last. Several different requests are sent through every stage and the
+prompt-eval time reported by Ollama is averaged per stage.
+
+By default the simulated Ollama server is used with KV-cache prefix reuse
+enabled; pass ``--ollama-url`` to measure a real Ollama instance instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_prompt_prefix [--requests N] [--ollama-url URL --model NAME]
+"""
+import argparse
+import json
+import logging
+import statistics
+
+from langchain_core.prompts import PromptTemplate
+from ollama import Client
+
+from benchmarks.fake_ollama import FakeOllamaServer
+
+TOPICS = ["ML Engineer", "Backend Developer", "Data Analyst", "DevOps Engineer", "Security Engineer", "Android Developer"]
+FILLER = "Hands-on experience with Python, SQL, Docker, CI pipelines and cloud deployments. "
+
+
+def legacy_layout(prompt: PromptTemplate, header: str) -> PromptTemplate:
+    """Rebuild the original layout: persona line, then inputs, then the instructions."""
+    instructions, inputs = prompt.template.split(header)
+    persona, rest = instructions.split("\n\n", 1)
+    return PromptTemplate.from_template(f"{persona}\n\n{inputs.strip()}\n\n{rest}")
+
+
+def request_inputs(i: int) -> dict:
+    topic = TOPICS[i % len(TOPICS)]
+    text = f"[{topic} #{i}] " + FILLER * 12
+    return {
+        "topic": topic,
+        "resume": text,
+        "jd": f"Hiring a {topic} with strong fundamentals.",
+        "skill_gaps": text,
+        "analysis": text,
+        "curriculum": text,
+        "rag_context": text,
+        "resources": text,
+    }
+
+
+def measure(client: Client, model: str, prompts: dict, requests: int, keep_alive: str) -> dict:
+    """Send every request through every stage, returning prompt-eval stats per stage."""
+    durations = {node: [] for node in prompts}
+    counts = {node: [] for node in prompts}
+    for i in range(requests):
+        inputs = request_inputs(i)
+        for node, prompt in prompts.items():
+            response = client.generate(
+                model=model,
+                prompt=prompt.format(**{k: inputs[k] for k in prompt.input_variables}),
+                options={"num_predict": 1},
+                keep_alive=keep_alive,
+            )
+            durations[node].append(response["prompt_eval_duration"] / 1e6)
+            counts[node].append(response["prompt_eval_count"])
+    return {
+        node: {
+            "prompt_eval_ms_mean": round(statistics.mean(durations[node]), 2),
+            "prompt_eval_tokens_mean": round(statistics.mean(counts[node]), 1),
+        }
+        for node in prompts
+    }
+
+
+def run(client: Client, model: str, requests: int, keep_alive: str) -> dict:
+    from app.services import agents
+
+    after = {
+        "topic_analyzer": agents.TOPIC_ANALYZER_PROMPT,
+        "skill_gap_agent": agents.SKILL_GAP_PROMPT,
+        "curriculum_planner": agents.CURRICULUM_PLANNER_PROMPT,
+        "validator": agents.VALIDATOR_PROMPT,
+    }
+    before = {node: legacy_layout(prompt, agents.PROMPT_INPUTS_HEADER) for node, prompt in after.items()}
+
+    before_stats = measure(client, model, before, requests, keep_alive)
+    after_stats = measure(client, model, after, requests, keep_alive)
+    stages = {}
+    for node in after:
+        b = before_stats[node]["prompt_eval_ms_mean"]
+        a = after_stats[node]["prompt_eval_ms_mean"]
+        stages[node] = {
+            "before": before_stats[node],
+            "after": after_stats[node],
+            "prompt_eval_reduction": round(1 - a / b, 3) if b else 0.0,
+        }
+    return stages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=6)
+    parser.add_argument("--ollama-url", default=None, help="Measure a real Ollama server instead of the simulator")
+    parser.add_argument("--model", default="llama3.2:1b")
+    parser.add_argument("--keep-alive", default="30m")
+    parser.add_argument("--slots", type=int, default=4, help="Simulated KV-cache slots")
+    parser.add_argument("--prompt-eval-rate", type=float, default=1000.0, help="Simulated prompt tokens per second")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.ollama_url:
+        stages = run(Client(host=args.ollama_url), args.model, args.requests, args.keep_alive)
+        backend = args.ollama_url
+    else:
+        with FakeOllamaServer(prompt_eval_rate=args.prompt_eval_rate, kv_cache_slots=args.slots) as server:
+            stages = run(Client(host=server.base_url), args.model, args.requests, args.keep_alive)
+        backend = "simulated"
+
+    print(json.dumps({
+        "benchmark": "prompt_prefix",
+        "backend": backend,
+        "requests": args.requests,
+        "stages": stages,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
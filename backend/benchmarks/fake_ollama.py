@@ -0,0 +1,409 @@
+"""
+Simulated Ollama server for offline benchmarks.
+
+Implements the subset of the Ollama HTTP API used by the backend
+(``/api/generate``, ``/api/embeddings``, ``/api/embed``) with a simple
+latency model: prompt evaluation costs time proportional to the prompt
+length and every generated token costs ``1 / eval_rate`` seconds.
+
+With ``kv_cache_slots`` set, the server also mimics Ollama's prompt cache:
+each slot remembers the last prompt it evaluated, and a new prompt only pays
+for the tokens after its longest common prefix with the best-matching slot.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token estimate used by the latency model (~4 chars per token)."""
+    return max(1, len(text) // 4)
+
+
+# Placeholder for the generated filler text in JSON mode payloads
+_FILLER = "\u0000filler"
+
+
+def _json_payload(prompt: str) -> dict:
+    """
+    A JSON mode answer that is valid for the schema the prompt asks for.
+
+    The structured stages' prompts spell out their JSON keys, which tells the
+    curriculum plan and the skill gap report apart; any other prompt gets a
+    generic object.
+    """
+    if '"phases"' in prompt:
+        return {
+            "phases": [{"name": "Foundations", "purpose": _FILLER, "weeks": 4, "skills": ["Core concepts", "Tooling"]}],
+            "timeline_strategy": "Build the foundations first, then specialize",
+        }
+    if '"missing_skills"' in prompt:
+        return {
+            "strengths": ["Python"],
+            "missing_skills": [{"skill": "Kubernetes", "priority": "high", "note": _FILLER}],
+            "learning_targets": ["Deploy a service to Kubernetes"],
+        }
+    return {"notes": _FILLER}
+
+
+def fake_embedding(text: str, dim: int = 64) -> List[float]:
+    """Deterministic pseudo-embedding derived from the text hash."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [((digest[i % len(digest)] + i) % 255) / 255.0 for i in range(dim)]
+
+
+class FakeOllamaServer:
+    """Threaded HTTP server that mimics Ollama's generation and embedding endpoints."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        prompt_eval_rate: float = 4000.0,
+        eval_rate: float = 200.0,
+        response_tokens: int = 40,
+        embed_latency: float = 0.005,
+        embed_dim: int = 64,
+        fail_pattern: Optional[str] = None,
+        kv_cache_slots: int = 0,
+        num_parallel: int = 0,
+    ):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            prompt_eval_rate: Simulated prompt tokens evaluated per second
+            eval_rate: Simulated tokens generated per second
+            response_tokens: Tokens generated when the request sets no num_predict
+            embed_latency: Seconds spent per embedding request
+            embed_dim: Dimension of the returned embeddings
+            fail_pattern: Generation requests whose prompt contains this text get a 500
+            kv_cache_slots: Number of simulated KV-cache slots (0 disables prefix reuse)
+            num_parallel: Generations processed at once, like ``OLLAMA_NUM_PARALLEL``;
+                further requests wait for a slot (0 = unlimited)
+        """
+        self.prompt_eval_rate = prompt_eval_rate
+        self.eval_rate = eval_rate
+        self.response_tokens = response_tokens
+        self.embed_latency = embed_latency
+        self.embed_dim = embed_dim
+        self.fail_pattern = fail_pattern
+        self._kv_slots: List[str] = [""] * kv_cache_slots
+        self._parallel = threading.BoundedSemaphore(num_parallel) if num_parallel > 0 else None
+        self.generate_calls = 0
+        self.cancelled_generations = 0
+        self.embed_calls = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _evaluated_prompt_tokens(self, prompt: str) -> int:
+        """Tokens that must be evaluated for ``prompt`` after KV-cache prefix reuse."""
+        prompt_tokens = _count_tokens(prompt)
+        if not self._kv_slots:
+            return prompt_tokens
+        with self._lock:
+            # Reuse the slot sharing the longest prefix, like Ollama's multi-user cache.
+            # If that would discard part of the slot's cached prompt, the shared prefix
+            # is copied into the least recently used slot instead.
+            best, best_len = len(self._kv_slots) - 1, 0
+            for i, cached in enumerate(self._kv_slots):
+                shared = len(os.path.commonprefix([cached, prompt]))
+                if shared > best_len:
+                    best, best_len = i, shared
+            if best_len < len(self._kv_slots[best]):
+                best = len(self._kv_slots) - 1
+            self._kv_slots.pop(best)
+            self._kv_slots.insert(0, prompt)
+        return max(1, prompt_tokens - best_len // 4)
+
+    def _generate(self, handler: BaseHTTPRequestHandler, body: dict) -> None:
+        with self._lock:
+            self.generate_calls += 1
+
+        prompt = body.get("prompt", "")
+        if self.fail_pattern and self.fail_pattern in prompt:
+            handler.send_response(500)
+            handler.send_header("Content-Type", "application/json")
+            handler.end_headers()
+            handler.wfile.write(json.dumps({"error": "simulated failure"}).encode("utf-8"))
+            return
+
+        if not prompt:
+            # An empty prompt only loads the model
+            data = json.dumps({"model": body.get("model"), "response": "", "done": True, "done_reason": "load"})
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/json")
+            handler.end_headers()
+            handler.wfile.write(data.encode("utf-8"))
+            return
+
+        if self._parallel is None:
+            self._run_generation(handler, body, prompt)
+        else:
+            with self._parallel:
+                self._run_generation(handler, body, prompt)
+
+    def _run_generation(self, handler: BaseHTTPRequestHandler, body: dict, prompt: str) -> None:
+        options = body.get("options") or {}
+        prompt_tokens = self._evaluated_prompt_tokens(prompt)
+        num_tokens = options.get("num_predict") or self.response_tokens
+        if num_tokens < 0:
+            num_tokens = self.response_tokens
+
+        start = time.perf_counter()
+        prompt_eval_seconds = prompt_tokens / self.prompt_eval_rate
+        time.sleep(prompt_eval_seconds)
+
+        stream = body.get("stream", True)
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson" if stream else "application/json")
+        handler.end_headers()
+
+        tokens = [f"tok{i} " for i in range(num_tokens)]
+        if body.get("format") == "json" and num_tokens >= 2:
+            # JSON mode always yields a JSON object; the filler tokens go into one string field
+            prefix, suffix = json.dumps(_json_payload(prompt)).split(json.dumps(_FILLER))
+            tokens[0], tokens[-1] = prefix + '"', '"' + suffix
+
+        words = []
+        eval_start = time.perf_counter()
+        for token in tokens:
+            time.sleep(1.0 / self.eval_rate)
+            words.append(token)
+            if stream:
+                chunk = {"model": body.get("model"), "response": token, "done": False}
+                handler.wfile.write((json.dumps(chunk) + "\n").encode("utf-8"))
+                handler.wfile.flush()
+        eval_seconds = time.perf_counter() - eval_start
+
+        final = {
+            "model": body.get("model"),
+            "response": "" if stream else "".join(words),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.perf_counter() - start) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_eval_seconds * 1e9),
+            "eval_count": num_tokens,
+            "eval_duration": int(eval_seconds * 1e9),
+        }
+        handler.wfile.write((json.dumps(final) + "\n").encode("utf-8"))
+
+    def _embeddings(self, handler: BaseHTTPRequestHandler, body: dict) -> None:
+        with self._lock:
+            self.embed_calls += 1
+        time.sleep(self.embed_latency)
+        if "input" in body:
+            inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            payload = {"model": body.get("model"), "embeddings": [fake_embedding(t, self.embed_dim) for t in inputs]}
+        else:
+            payload = {"embedding": fake_embedding(body.get("prompt", ""), self.embed_dim)}
+        data = json.dumps(payload).encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                data = json.dumps({"models": [], "version": "0.0.0-fake"}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/generate":
+                    try:
+                        server._generate(self, body)
+                    except (BrokenPipeError, ConnectionResetError):
+                        # Client gave up (timeout/cancellation), like Ollama aborting a request
+                        with server._lock:
+                            server.cancelled_generations += 1
+                elif self.path in ("/api/embeddings", "/api/embed"):
+                    try:
+                        server._embeddings(self, body)
+                    except (BrokenPipeError, ConnectionResetError):
+                        pass
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+
+        return Handler
+
+
+class FakeTavilyServer:
+    """
+    Threaded HTTP server that mimics Tavily's ``POST /search`` endpoint.
+
+    Point ``TAVILY_BASE_URL`` at :attr:`base_url` (with any ``TAVILY_API_KEY``)
+    to run web searches offline. Each search sleeps ``latency`` seconds and
+    returns deterministic URLs derived from the query.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.3):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTavilyServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeTavilyServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/search":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                with server._lock:
+                    server.calls += 1
+                time.sleep(server.latency)
+                query = body.get("query", "")
+                slug = hashlib.md5(query.encode("utf-8")).hexdigest()[:8]
+                results = [
+                    {"title": f"{query} #{i}", "url": f"https://example.com/{slug}/{i}", "content": ""}
+                    for i in range(body.get("max_results", 5))
+                ]
+                data = json.dumps({"query": query, "results": results}).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The search was cancelled while it was waiting
+                    pass
+
+        return Handler
+
+
+class FakeOTLPCollector:
+    """
+    Threaded HTTP server that accepts OTLP/HTTP JSON trace exports on
+    ``POST /v1/traces`` and keeps the received spans in :attr:`spans`.
+
+    Point ``TRACING_OTLP_ENDPOINT`` at :attr:`endpoint` (with
+    ``TRACING_EXPORTER=otlp``) to inspect traces without a real collector.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.spans: List[dict] = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/traces"
+
+    def start(self) -> "FakeOTLPCollector":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOTLPCollector":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/v1/traces":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                spans = [
+                    span
+                    for resource in body.get("resourceSpans", [])
+                    for scope in resource.get("scopeSpans", [])
+                    for span in scope.get("spans", [])
+                ]
+                with server._lock:
+                    server.requests += 1
+                    server.spans.extend(spans)
+                data = b"{}"
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
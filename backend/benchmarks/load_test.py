@@ -0,0 +1,348 @@
+"""
+Benchmark: end-to-end load test of the roadmap generation API.
+
+Starts the real FastAPI app under uvicorn, pointed at the simulated Ollama
+server and a stand-in Tavily server, and drives it with concurrent clients
+sending a weighted mix of ``/generate`` (PDF upload), ``/generate-from-text``
+and ``/generate-from-text-stream`` requests. Reports throughput, latency
+percentiles, SSE time to first byte and to first event (the first token or
+graph node update, not the setup events), and error rates, overall and per
+endpoint, as JSON. Nothing needs a GPU or network access.
+
+Every request uses a distinct topic and the LLM cache and stage memo are
+disabled, so each one runs the full graph. App settings can be overridden
+with ``--set`` (e.g. ``--set LLM_MAX_CONCURRENCY=8``) to try capacity
+configurations, and ``--num-parallel`` limits the simulated Ollama to that
+many concurrent generations like ``OLLAMA_NUM_PARALLEL``. Clients wait for
+``Retry-After`` before their next request when the server rejects one as
+too busy. With ``--url`` an already running server is load-tested instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test [--concurrency N] [--requests N | --duration S]
+        [--mix generate=1,generate-from-text=2,generate-from-text-stream=1]
+        [--eval-rate R] [--num-parallel N] [--set KEY=VALUE ...] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import jwt
+
+from benchmarks.bench_components import make_pdf
+from benchmarks.bench_graph_dag import SAMPLE_JD, SAMPLE_RESUME
+from benchmarks.fake_ollama import FakeOllamaServer, FakeTavilyServer
+
+API = "/api/v1/roadmap"
+ENDPOINTS = ("generate", "generate-from-text", "generate-from-text-stream")
+ROLES = ("ML Engineer", "Data Engineer", "Backend Developer", "DevOps Engineer", "Data Scientist", "Frontend Developer")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """``name=weight`` pairs, e.g. ``generate=1,generate-from-text-stream=3``."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return mix
+
+
+def distribution(values: List[float]) -> Optional[dict]:
+    """Mean, percentiles and max of a sample in seconds."""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 4)
+
+    return {
+        "mean": round(statistics.mean(ordered), 4),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class LoadGenerator:
+    """Sends the request mix from ``concurrency`` concurrent clients and records every outcome."""
+
+    def __init__(self, base_url: str, token: str, mix: Dict[str, float], concurrency: int, timeout: float, seed: int = 0):
+        self.base_url = base_url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.results: List[dict] = []
+        self._rng = random.Random(seed)
+        self._sent = 0
+        self._pdf = make_pdf(1)
+
+    @staticmethod
+    def _outcome(response: httpx.Response) -> dict:
+        outcome = {"status": response.status_code}
+        if "Retry-After" in response.headers:
+            outcome["retry_after"] = float(response.headers["Retry-After"])
+        return outcome
+
+    async def _generate(self, client: httpx.AsyncClient, topic: str) -> dict:
+        response = await client.post(
+            f"{API}/generate",
+            data={"topic": topic, "jd": SAMPLE_JD},
+            files={"resume_file": ("resume.pdf", self._pdf, "application/pdf")},
+        )
+        return self._outcome(response)
+
+    async def _generate_from_text(self, client: httpx.AsyncClient, topic: str) -> dict:
+        response = await client.post(
+            f"{API}/generate-from-text",
+            json={"topic": topic, "resume": SAMPLE_RESUME, "jd": SAMPLE_JD},
+        )
+        return self._outcome(response)
+
+    async def _generate_from_text_stream(self, client: httpx.AsyncClient, topic: str, started_at: float) -> dict:
+        outcome: dict = {"status": None}
+        async with client.stream(
+            "POST",
+            f"{API}/generate-from-text-stream",
+            json={"topic": topic, "resume": SAMPLE_RESUME, "jd": SAMPLE_JD},
+        ) as response:
+            outcome["status"] = response.status_code
+            if response.status_code != 200:
+                await response.aread()
+                if "Retry-After" in response.headers:
+                    outcome["retry_after"] = float(response.headers["Retry-After"])
+                return outcome
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                outcome.setdefault("ttfb", time.perf_counter() - started_at)
+                event = json.loads(line[5:])
+                # The setup events are sent before any work starts; the first
+                # token or graph node update is what the user actually waits for
+                if "node" in event or event.get("status") in ("complete", "partial"):
+                    outcome.setdefault("ttfe", time.perf_counter() - started_at)
+                if event.get("status") in ("complete", "partial", "error"):
+                    outcome["final"] = event["status"]
+                    if event["status"] == "error":
+                        outcome["error"] = f"stream error: {event.get('error', '')[:80]}"
+                        if "retry_after" in event:
+                            outcome["retry_after"] = float(event["retry_after"])
+        if "final" not in outcome and "error" not in outcome:
+            outcome["error"] = "stream ended without a result"
+        return outcome
+
+    async def _send(self, client: httpx.AsyncClient, name: str, number: int) -> dict:
+        topic = f"{ROLES[number % len(ROLES)]} {number}"
+        started_at = time.perf_counter()
+        try:
+            if name == "generate":
+                outcome = await self._generate(client, topic)
+            elif name == "generate-from-text":
+                outcome = await self._generate_from_text(client, topic)
+            else:
+                outcome = await self._generate_from_text_stream(client, topic, started_at)
+        except httpx.HTTPError as e:
+            outcome = {"status": None, "error": f"{type(e).__name__}"}
+        outcome["latency"] = time.perf_counter() - started_at
+        if "error" not in outcome and outcome["status"] != 200:
+            outcome["error"] = f"HTTP {outcome['status']}"
+        return {"endpoint": name, **outcome}
+
+    async def _worker(self, client: httpx.AsyncClient, total: Optional[int], deadline: Optional[float]) -> None:
+        while True:
+            if total is not None and self._sent >= total:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            self._sent += 1
+            number = self._sent
+            name = self._rng.choices(self.names, self.weights)[0]
+            result = await self._send(client, name, number)
+            self.results.append(result)
+            # Back off like a well-behaved client when the server is saturated
+            if "retry_after" in result:
+                await asyncio.sleep(result["retry_after"])
+
+    async def run(self, total: Optional[int] = None, duration: Optional[float] = None, warmup: int = 0) -> float:
+        """Send ``total`` requests (or keep sending for ``duration`` seconds); returns the measured wall time."""
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, headers=self.headers, timeout=self.timeout, limits=limits) as client:
+            for i in range(warmup):
+                await self._send(client, self.names[i % len(self.names)], -(i + 1))
+            deadline = time.perf_counter() + duration if duration else None
+            started_at = time.perf_counter()
+            await asyncio.gather(*(self._worker(client, total, deadline) for _ in range(self.concurrency)))
+            return time.perf_counter() - started_at
+
+
+def summarize(results: List[dict], wall_seconds: float) -> dict:
+    """Throughput, latency and error statistics overall and per endpoint."""
+    def stats(group: List[dict]) -> dict:
+        ok = [r for r in group if "error" not in r]
+        summary = {
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "error_rate": round((len(group) - len(ok)) / len(group), 4) if group else 0.0,
+            "throughput_rps": round(len(ok) / wall_seconds, 3) if wall_seconds else 0.0,
+            "latency_s": distribution([r["latency"] for r in ok]),
+        }
+        first_bytes = [r["ttfb"] for r in group if "ttfb" in r]
+        if first_bytes:
+            summary["time_to_first_byte_s"] = distribution(first_bytes)
+        first_events = [r["ttfe"] for r in group if "ttfe" in r]
+        if first_events:
+            summary["time_to_first_event_s"] = distribution(first_events)
+        return summary
+
+    errors: Dict[str, int] = {}
+    for r in results:
+        if "error" in r:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    return {
+        **stats(results),
+        "endpoints": {
+            name: stats([r for r in results if r["endpoint"] == name])
+            for name in ENDPOINTS
+            if any(r["endpoint"] == name for r in results)
+        },
+        "error_breakdown": errors,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port: int, env: Dict[str, str], workdir: str, workers: int) -> subprocess.Popen:
+    """Run the API under uvicorn with ``env`` and wait until it serves requests."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR), **env},
+        # Keep the app's logs out of the JSON report on stdout
+        stdout=sys.stderr,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("API server did not start within 120 seconds")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=40, help="Requests to send (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="Send requests for this many seconds instead")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(",".join(ENDPOINTS)),
+                        help="Endpoint weights, e.g. generate=1,generate-from-text=2,generate-from-text-stream=1")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests sent first")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the request mix")
+    parser.add_argument("--url", default=None, help="Load-test this running server instead of a local simulated one")
+    parser.add_argument("--secret", default="change-me", help="BACKEND_JWT_SECRET of the server given with --url")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--eval-rate", type=float, default=200.0, help="Simulated tokens generated per second")
+    parser.add_argument("--response-tokens", type=int, default=40, help="Simulated tokens per generation")
+    parser.add_argument("--num-parallel", type=int, default=0, help="Simulated concurrent generations (0 = unlimited)")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Simulated web search latency in seconds")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="App setting for the server")
+    parser.add_argument("--output", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    overrides = dict(item.split("=", 1) for item in args.set)
+    report: dict = {
+        "benchmark": "load_test",
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+    }
+    with ExitStack() as stack:
+        if args.url:
+            base_url, secret = args.url.rstrip("/"), args.secret
+        else:
+            ollama = stack.enter_context(FakeOllamaServer(
+                eval_rate=args.eval_rate, response_tokens=args.response_tokens, num_parallel=args.num_parallel
+            ))
+            search = stack.enter_context(FakeTavilyServer(latency=args.search_latency))
+            workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix="mapey-bench-"))
+            secret = "load-test-secret"
+            port = free_port()
+            env = {
+                "OLLAMA_BASE_URL": ollama.base_url,
+                "TAVILY_BASE_URL": search.base_url,
+                "TAVILY_API_KEY": "fake",
+                "BACKEND_JWT_SECRET": secret,
+                # Every request runs the whole graph against the simulators
+                "LLM_CACHE_ENABLED": "false",
+                "STAGE_MEMO_ENABLED": "false",
+                "SEARCH_CACHE_TTL_SECONDS": "0",
+                "SEARCH_CACHE_STALE_SECONDS": "0",
+                "JOB_WORKERS": "0",
+                "VECTOR_STORE_INDEX_PATH": "",
+                "TRACING_EXPORTER": "none",
+                "LOG_LEVEL": "WARNING",
+                **overrides,
+            }
+            server = start_app(port, env, workdir, args.workers)
+            stack.callback(server.wait, 30)
+            stack.callback(server.terminate)
+            base_url = f"http://127.0.0.1:{port}"
+            simulator = {
+                "eval_rate": args.eval_rate,
+                "response_tokens": args.response_tokens,
+                "num_parallel": args.num_parallel,
+                "search_latency_s": args.search_latency,
+                "settings": overrides,
+            }
+
+        token = jwt.encode({"sub": "load-test", "exp": int(time.time()) + 24 * 3600}, secret, algorithm="HS256")
+        generator = LoadGenerator(base_url, token, args.mix, args.concurrency, args.timeout, args.seed)
+        wall_seconds = asyncio.run(generator.run(
+            total=None if args.duration else args.requests, duration=args.duration, warmup=args.warmup
+        ))
+        report["target"] = base_url
+        report["duration_s"] = round(wall_seconds, 3)
+        report.update(summarize(generator.results, wall_seconds))
+        if not args.url:
+            report["simulator"] = {**simulator, "ollama_generate_calls": ollama.generate_calls, "search_calls": search.calls}
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
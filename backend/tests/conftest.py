@@ -0,0 +1,18 @@
+"""
+Shared test setup.
+
+Tests run from the backend directory (``python -m pytest``) against local
+SQLite files and in-process stand-in servers; nothing needs Ollama, Tavily
+or network access.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep tests independent of a developer's .env and of on-disk caches
+os.environ.setdefault("TRACING_EXPORTER", "none")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("STAGE_MEMO_ENABLED", "false")
+os.environ.setdefault("JOB_WORKERS", "0")
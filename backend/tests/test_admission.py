@@ -0,0 +1,137 @@
+"""Tests for LLM/embedding admission control (app.services.admission)."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+def test_waiting_count_is_safe_while_threads_queue():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=100)
+    stop = threading.Event()
+    errors = []
+
+    def worker():
+        while not stop.is_set():
+            with controller.slot_blocking():
+                time.sleep(0.0005)
+
+    def reader():
+        try:
+            while not stop.is_set():
+                controller.get_stats()
+                try:
+                    controller.check()
+                except AdmissionRejected:
+                    pass
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)] + [threading.Thread(target=reader)]
+    for thread in threads:
+        thread.start()
+    time.sleep(1.0)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert errors == []
+    assert controller.get_stats()["active"] == 0
+
+
+def test_calls_beyond_the_queue_limit_are_rejected():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=1)
+    holding, queued, done = threading.Event(), threading.Event(), threading.Event()
+
+    def holder():
+        with controller.slot_blocking():
+            holding.set()
+            done.wait(timeout=10)
+
+    def waiter():
+        with controller.slot_blocking(timeout=10):
+            queued.set()
+
+    threads = [threading.Thread(target=holder), threading.Thread(target=waiter)]
+    threads[0].start()
+    holding.wait(timeout=10)
+    threads[1].start()
+    while controller.waiting < 1:
+        time.sleep(0.001)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        with controller.slot_blocking():
+            pass
+    assert rejected.value.retry_after >= 1
+    assert controller.get_stats()["rejected"] == 1
+
+    done.set()
+    for thread in threads:
+        thread.join(timeout=10)
+    # The queued call got the slot once it was released
+    assert queued.is_set()
+    assert controller.get_stats()["active"] == 0
+    assert controller.get_stats()["admitted"] == 2
+
+
+def test_blocking_wait_times_out_and_leaves_the_queue():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=5)
+    with controller.slot_blocking():
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            with controller.slot_blocking(timeout=0.05):
+                pass
+        assert time.monotonic() - started < 1
+        assert controller.waiting == 0
+    assert controller.get_stats()["active"] == 0
+
+    # The abandoned waiter does not hold on to the freed slot
+    with controller.slot_blocking(timeout=0.05):
+        assert controller.active == 1
+
+
+def test_cancelled_async_waiter_abandons_its_place():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=5)
+    order = []
+
+    async def use(name: str, hold: float):
+        async with controller.slot():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        first = asyncio.create_task(use("first", 0.05))
+        await asyncio.sleep(0.01)
+        abandoned = asyncio.create_task(use("abandoned", 0))
+        last = asyncio.create_task(use("last", 0))
+        await asyncio.sleep(0.01)
+        assert controller.waiting == 2
+        abandoned.cancel()
+        await asyncio.gather(first, last, abandoned, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert order == ["first", "last"]
+    assert controller.get_stats()["active"] == 0
+    assert controller.waiting == 0
+
+
+def test_slots_are_handed_over_in_arrival_order():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=10)
+    order = []
+
+    async def use(i: int):
+        async with controller.slot():
+            order.append(i)
+            await asyncio.sleep(0.001)
+
+    async def scenario():
+        tasks = []
+        for i in range(5):
+            tasks.append(asyncio.create_task(use(i)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == [0, 1, 2, 3, 4]
@@ -0,0 +1,107 @@
+"""Tests for checkpoint retention and resuming of roadmap runs (app.services.checkpoints)."""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import UUID as CheckpointID
+
+from app.core.config import settings
+from app.services import checkpoints
+
+
+def checkpoint_id_at(timestamp: float) -> str:
+    """A UUIDv6 checkpoint ID created at ``timestamp``, like LangGraph's own IDs."""
+    ticks = int(timestamp * 1e7) + checkpoints._UUID_EPOCH_OFFSET
+    value = (ticks >> 12) << 80 | (ticks & 0x0FFF) << 64 | int.from_bytes(os.urandom(8), "big")
+    return str(CheckpointID(int=value, version=6))
+
+
+async def save_checkpoint(run_id: str, timestamp: float) -> None:
+    checkpoint = empty_checkpoint()
+    checkpoint["id"] = checkpoint_id_at(timestamp)
+    config = {"configurable": {"thread_id": run_id, "checkpoint_ns": ""}}
+    await checkpoints._saver.aput(config, checkpoint, {"source": "input", "step": -1}, {})
+
+
+async def run_ids() -> set:
+    async with checkpoints._saver.conn.execute("SELECT DISTINCT thread_id FROM checkpoints") as cursor:
+        return {row[0] for row in await cursor.fetchall()}
+
+
+@pytest.fixture
+def checkpoint_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(checkpoints, "_saver", None)
+    monkeypatch.setattr(checkpoints, "_durable_graph", None)
+    monkeypatch.setattr(checkpoints, "_init_lock", asyncio.Lock())
+    yield
+
+
+def test_checkpoint_time_decodes_langgraph_ids():
+    now = time.time()
+    assert checkpoints._checkpoint_time(checkpoint_id_at(now)) == pytest.approx(now, abs=0.01)
+    assert checkpoints._checkpoint_time("not-a-uuid") is None
+
+
+def test_prune_runs_removes_only_expired_runs(checkpoint_db):
+    async def scenario():
+        await checkpoints.get_durable_graph()
+        now = time.time()
+        await save_checkpoint("stale", now - 7200)
+        await save_checkpoint("recent", now - 7200)
+        await save_checkpoint("recent", now - 60)
+        await save_checkpoint("fresh", now)
+        pruned = await checkpoints.prune_runs(ttl_seconds=3600)
+        remaining = await run_ids()
+        await checkpoints.close_checkpointer()
+        return pruned, remaining
+
+    pruned, remaining = asyncio.run(scenario())
+    assert pruned == 1
+    # A run's age is that of its latest checkpoint
+    assert remaining == {"recent", "fresh"}
+
+
+def test_prune_runs_disabled_with_zero_ttl(checkpoint_db):
+    async def scenario():
+        await checkpoints.get_durable_graph()
+        await save_checkpoint("old", time.time() - 10 * 24 * 3600)
+        pruned = await checkpoints.prune_runs(ttl_seconds=0)
+        remaining = await run_ids()
+        await checkpoints.close_checkpointer()
+        return pruned, remaining
+
+    assert asyncio.run(scenario()) == (0, {"old"})
+
+
+class RecordingVectorStore:
+    def __init__(self):
+        self.added = []
+
+    async def aadd_texts(self, texts):
+        self.added.extend(texts)
+        return len(texts)
+
+
+def test_resume_re_adds_chunks_while_retrieval_is_pending(monkeypatch):
+    store = RecordingVectorStore()
+    monkeypatch.setattr(checkpoints, "get_vector_store", lambda: store)
+    resume = "Python developer with five years of Django and PostgreSQL experience."
+    snapshot = SimpleNamespace(next=("rag_retriever", "skill_gap_agent"), values={"resume": resume})
+
+    asyncio.run(checkpoints.restore_run_inputs(snapshot))
+
+    assert store.added == checkpoints.chunk_text(resume)
+
+
+def test_resume_skips_chunks_once_retrieval_completed(monkeypatch):
+    store = RecordingVectorStore()
+    monkeypatch.setattr(checkpoints, "get_vector_store", lambda: store)
+    snapshot = SimpleNamespace(next=("curriculum_planner",), values={"resume": "Python developer"})
+
+    asyncio.run(checkpoints.restore_run_inputs(snapshot))
+
+    assert store.added == []
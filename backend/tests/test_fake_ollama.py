@@ -0,0 +1,36 @@
+"""Tests that the stand-in Ollama server answers like the real one where the backend depends on it."""
+import pytest
+from ollama import Client
+
+from app.services.agents import STRUCTURED_STAGES
+from benchmarks.fake_ollama import FakeOllamaServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FakeOllamaServer(eval_rate=5000, response_tokens=12).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("node", sorted(STRUCTURED_STAGES))
+@pytest.mark.parametrize("stream", [False, True])
+def test_json_mode_answers_match_stage_schema(server, node, stream):
+    prompt_template, schema = STRUCTURED_STAGES[node]
+    prompt = prompt_template.format(**{name: "Python developer" for name in prompt_template.input_variables})
+    client = Client(host=server.base_url)
+
+    if stream:
+        answer = "".join(
+            chunk["response"] for chunk in client.generate(model="test-model", prompt=prompt, format="json", stream=True)
+        )
+    else:
+        answer = client.generate(model="test-model", prompt=prompt, format="json", stream=False)["response"]
+
+    assert schema.model_validate_json(answer).to_markdown()
+
+
+def test_json_mode_without_known_schema_is_still_json(server):
+    answer = Client(host=server.base_url).generate(model="test-model", prompt="Say hi", format="json", stream=False)
+    assert answer["response"].startswith('{"notes": "')
+    assert answer["eval_count"] == 12
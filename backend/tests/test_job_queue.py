@@ -0,0 +1,111 @@
+"""Tests for the leased job queue (app.services.job_queue)."""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import job_queue
+from app.services.job_queue import SQLiteJobQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable ``time.time`` for the queue module."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(job_queue, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_jobs_are_leased_oldest_first_and_only_once(queue, clock):
+    queue.enqueue("first")
+    clock[0] += 1
+    queue.enqueue("second")
+
+    lease = queue.lease("worker-a", visibility_timeout=30)
+    assert (lease.job_id, lease.worker_id, lease.attempt) == ("first", "worker-a", 1)
+    assert queue.lease("worker-b", visibility_timeout=30).job_id == "second"
+    assert queue.lease("worker-c", visibility_timeout=30) is None
+    assert queue.get_stats() == {"total": 2, "visible": 0, "leased": 2, "delayed": 0}
+
+
+def test_delayed_jobs_become_visible_later(queue, clock):
+    queue.enqueue("job", delay=10)
+    assert queue.lease("worker", visibility_timeout=30) is None
+    assert queue.get_stats()["delayed"] == 1
+
+    clock[0] += 10
+    assert queue.lease("worker", visibility_timeout=30).job_id == "job"
+
+
+def test_expired_lease_is_handed_to_another_worker(queue, clock):
+    queue.enqueue("job")
+    stalled = queue.lease("worker-a", visibility_timeout=30)
+
+    clock[0] += 31
+    takeover = queue.lease("worker-b", visibility_timeout=30)
+
+    assert takeover.job_id == "job"
+    assert takeover.attempt == 2
+    # The stalled worker lost the job: it can neither extend nor acknowledge it
+    assert queue.extend(stalled, visibility_timeout=30) is False
+    queue.ack(stalled)
+    assert queue.get_stats()["total"] == 1
+    queue.ack(takeover)
+    assert queue.get_stats()["total"] == 0
+
+
+def test_extending_a_lease_keeps_the_job_hidden(queue, clock):
+    queue.enqueue("job")
+    lease = queue.lease("worker-a", visibility_timeout=30)
+
+    clock[0] += 20
+    assert queue.extend(lease, visibility_timeout=30) is True
+    assert lease.expires_at == clock[0] + 30
+
+    clock[0] += 20
+    assert queue.lease("worker-b", visibility_timeout=30) is None
+    clock[0] += 11
+    assert queue.lease("worker-b", visibility_timeout=30).attempt == 2
+
+
+def test_released_jobs_are_retried_after_the_delay(queue, clock):
+    queue.enqueue("job")
+    lease = queue.lease("worker", visibility_timeout=30)
+
+    queue.release(lease, delay=5)
+    assert queue.lease("worker", visibility_timeout=30) is None
+    clock[0] += 5
+    retry = queue.lease("worker", visibility_timeout=30)
+    assert retry.attempt == 2
+
+
+def test_release_without_counting_the_attempt(queue, clock):
+    queue.enqueue("job")
+    lease = queue.lease("worker", visibility_timeout=30)
+
+    # e.g. deferred by admission control
+    queue.release(lease, count_attempt=False)
+
+    assert queue.lease("worker", visibility_timeout=30).attempt == 1
+
+
+def test_enqueue_is_idempotent(queue):
+    queue.enqueue("job")
+    queue.enqueue("job")
+    assert queue.get_stats()["total"] == 1
+
+
+def test_queue_is_shared_between_connections(tmp_path, clock):
+    path = str(tmp_path / "jobs.sqlite3")
+    api, worker = SQLiteJobQueue(path), SQLiteJobQueue(path)
+    api.enqueue("job")
+
+    lease = worker.lease("worker", visibility_timeout=30)
+    assert lease.job_id == "job"
+    assert api.lease("other", visibility_timeout=30) is None
+    worker.ack(lease)
+    assert api.get_stats()["total"] == 0
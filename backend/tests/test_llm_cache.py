@@ -0,0 +1,120 @@
+"""Tests for the persistent LLM response cache (app.services.llm_cache)."""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_cache
+from app.services.llm_cache import LLMResponseCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable ``time.time`` for the cache module."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_cache_key_covers_generation_parameters():
+    key = make_cache_key("prompt", "llama3.2", 0.7, 4096, 512)
+    assert key == make_cache_key("prompt", "llama3.2", 0.7, 4096, 512)
+    assert key != make_cache_key("prompt", "llama3.2", 0.2, 4096, 512)
+    assert key != make_cache_key("prompt", "llama3.2", 0.7, 8192, 512)
+    assert key != make_cache_key("prompt", "llama3.2", 0.7, 4096, None)
+    assert key != make_cache_key("prompt", "qwen2.5", 0.7, 4096, 512)
+
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache = LLMResponseCache(":memory:", max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.set(key, f"response {key}")
+        clock[0] += 1
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == "response a"
+    clock[0] += 1
+
+    cache.set("d", "response d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["response a", "response c", "response d"]
+    stats = cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 1
+
+
+def test_overwriting_an_entry_does_not_grow_the_cache(clock):
+    cache = LLMResponseCache(":memory:", max_entries=2)
+    cache.set("a", "first")
+    cache.set("a", "second")
+    cache.set("b", "other")
+
+    assert cache.get("a") == "second"
+    assert cache.get_stats()["entries"] == 2
+    assert cache.get_stats()["evictions"] == 0
+
+
+def test_expired_entries_are_misses(clock):
+    cache = LLMResponseCache(":memory:", ttl_seconds=60)
+    cache.set("a", "response")
+
+    clock[0] += 59
+    assert cache.get("a") == "response"
+    clock[0] += 2
+    assert cache.get("a") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["entries"]) == (1, 1, 1, 0)
+
+
+def test_size_is_recounted_for_entries_written_by_other_processes(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(llm_cache, "SIZE_RECOUNT_WRITES", 4)
+    path = str(tmp_path / "llm_cache.sqlite3")
+    cache = LLMResponseCache(path, max_entries=5)
+    other = LLMResponseCache(path, max_entries=5)
+    for key in ("x", "y", "z"):
+        other.set(key, "from another process")
+        clock[0] += 1
+
+    for key in ("a", "b", "c"):
+        cache.set(key, "local")
+        clock[0] += 1
+    assert cache.get_stats()["entries"] == 3
+
+    # The fourth write recounts the shared table and evicts down to the limit
+    cache.set("d", "local")
+    assert cache.get_stats()["entries"] == 5
+    assert cache.get_stats()["evictions"] == 2
+    assert cache.get("x") is None and cache.get("y") is None
+    assert cache.get("z") == "from another process"
+
+
+def test_global_cache_is_created_once_under_concurrency(tmp_path, monkeypatch):
+    created = []
+    barrier = threading.Barrier(8)
+
+    class SlowCache(LLMResponseCache):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setattr(llm_cache, "LLMResponseCache", SlowCache)
+    monkeypatch.setattr(llm_cache, "_llm_cache_instance", None)
+    caches = []
+
+    def get():
+        barrier.wait()
+        caches.append(llm_cache.get_llm_cache())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(created) == 1
+    assert all(cache is created[0] for cache in caches)
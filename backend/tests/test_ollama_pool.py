@@ -0,0 +1,124 @@
+"""Tests for Ollama backend routing, failover and cooldown (app.services.ollama_pool)."""
+import asyncio
+import threading
+import time
+
+import pytest
+from ollama import ResponseError
+
+from app.services.ollama_pool import OllamaPool
+from benchmarks.fake_ollama import FakeOllamaServer
+
+PROMPT = "Summarise the candidate profile"
+
+
+@pytest.fixture
+def servers():
+    """Three stand-in Ollama servers; the second fails every generation with a 500."""
+    started = [
+        FakeOllamaServer(eval_rate=2000, response_tokens=5).start(),
+        FakeOllamaServer(eval_rate=2000, response_tokens=5, fail_pattern="candidate").start(),
+        FakeOllamaServer(eval_rate=2000, response_tokens=5).start(),
+    ]
+    yield started
+    for server in started:
+        server.stop()
+
+
+def generate(backend) -> str:
+    return backend.client.generate(model="test-model", prompt=PROMPT, stream=False)["response"]
+
+
+async def agenerate(backend) -> str:
+    return (await backend.async_client.generate(model="test-model", prompt=PROMPT, stream=False))["response"]
+
+
+def stats_for(pool: OllamaPool, server: FakeOllamaServer) -> dict:
+    return next(b for b in pool.get_stats()["backends"] if b["url"] == server.base_url)
+
+
+def test_failed_calls_are_rerouted_and_backend_put_in_cooldown(servers):
+    healthy_a, failing, healthy_b = servers
+    pool = OllamaPool("test", [s.base_url for s in servers], failure_threshold=2, cooldown_seconds=60)
+
+    results = [pool.call(generate) for _ in range(10)]
+
+    assert all(results)
+    # The failing backend was tried until it crossed the threshold, then skipped
+    assert failing.generate_calls == 2
+    assert stats_for(pool, failing)["healthy"] is False
+    assert stats_for(pool, failing)["consecutive_failures"] == 2
+    assert healthy_a.generate_calls + healthy_b.generate_calls == 10
+    assert pool.get_stats()["healthy_backends"] == 2
+
+
+def test_backend_gets_another_chance_after_cooldown(servers):
+    _, failing, _ = servers
+    pool = OllamaPool("test", [s.base_url for s in servers], failure_threshold=1, cooldown_seconds=0.2)
+
+    for _ in range(3):
+        pool.call(generate)
+    assert failing.generate_calls == 1
+    assert stats_for(pool, failing)["healthy"] is False
+
+    time.sleep(0.3)
+    failing.fail_pattern = None
+    for _ in range(6):
+        pool.call(generate)
+
+    assert failing.generate_calls > 1
+    assert stats_for(pool, failing)["healthy"] is True
+    assert stats_for(pool, failing)["consecutive_failures"] == 0
+
+
+def test_unreachable_backend_fails_over(servers):
+    healthy, _, _ = servers
+    down = FakeOllamaServer().start()
+    down.stop()
+    pool = OllamaPool("test", [down.base_url, healthy.base_url], failure_threshold=1, cooldown_seconds=60)
+
+    assert [pool.call(generate) for _ in range(3)]
+    assert stats_for(pool, down)["healthy"] is False
+    assert stats_for(pool, down)["failures"] == 1
+    assert healthy.generate_calls == 3
+
+
+def test_error_raised_once_every_backend_failed():
+    failing = [FakeOllamaServer(fail_pattern="candidate").start() for _ in range(2)]
+    try:
+        pool = OllamaPool("test", [s.base_url for s in failing], failure_threshold=5)
+        with pytest.raises(ResponseError):
+            pool.call(generate)
+        assert [s.generate_calls for s in failing] == [1, 1]
+    finally:
+        for server in failing:
+            server.stop()
+
+
+def test_concurrent_calls_go_to_least_loaded_backends():
+    slow = [FakeOllamaServer(eval_rate=20, response_tokens=5).start() for _ in range(3)]
+    try:
+        pool = OllamaPool("test", [s.base_url for s in slow])
+        threads = [threading.Thread(target=pool.call, args=(generate,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert [s.generate_calls for s in slow] == [1, 1, 1]
+    finally:
+        for server in slow:
+            server.stop()
+
+
+def test_async_calls_fail_over(servers):
+    healthy_a, failing, healthy_b = servers
+    pool = OllamaPool("test", [s.base_url for s in servers], failure_threshold=1, cooldown_seconds=60)
+
+    async def run():
+        return await asyncio.gather(*(pool.acall(agenerate) for _ in range(6)))
+
+    assert all(asyncio.run(run()))
+    # Calls already routed to the failing backend were retried elsewhere
+    assert failing.generate_calls >= 1
+    assert healthy_a.generate_calls + healthy_b.generate_calls == 6
+    assert stats_for(pool, failing)["healthy"] is False
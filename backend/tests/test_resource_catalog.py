@@ -0,0 +1,87 @@
+"""Tests for BM25 ranking of the local resource catalog (app.services.resource_catalog)."""
+from app.services.resource_catalog import DEFAULT_CATALOG_PATH, ResourceCatalog, tokenize
+
+DOCUMENTS = [
+    {
+        "title": "Kubernetes for Developers",
+        "url": "https://example.com/k8s-course",
+        "kind": "course",
+        "tags": ["kubernetes", "containers"],
+        "description": "Deploy and operate applications on clusters.",
+    },
+    {
+        "title": "Build a Django REST API",
+        "url": "https://example.com/django-project",
+        "kind": "project",
+        "tags": ["python", "django"],
+        "description": "A backend project with authentication and Postgres.",
+    },
+    {
+        "title": "Backend Interview Questions",
+        "url": "https://example.com/backend-interview",
+        "kind": "interview",
+        "tags": ["system design"],
+        "description": "Covers caching, queues, Kubernetes and Python questions.",
+    },
+    {
+        "title": "Python Fundamentals",
+        "url": "https://example.com/python-course",
+        "kind": "course",
+        "tags": ["python"],
+        "description": "Syntax, data structures and testing.",
+    },
+]
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("The Containers and APIs of C++ / C#") == ["container", "api", "c++", "c#"]
+    assert tokenize("Class access") == ["class", "access"]
+
+
+def test_title_and_tag_matches_outrank_description_matches():
+    catalog = ResourceCatalog.build(DOCUMENTS)
+
+    results = catalog.search("kubernetes", k=5)
+
+    assert [r["url"] for r in results] == ["https://example.com/k8s-course", "https://example.com/backend-interview"]
+    assert results[0]["score"] > results[1]["score"] > 0
+
+
+def test_rare_terms_weigh_more_than_common_ones():
+    catalog = ResourceCatalog.build(DOCUMENTS)
+
+    # "python" appears in three documents, "django" in one
+    best = catalog.search("python django", k=1)[0]
+
+    assert best["url"] == "https://example.com/django-project"
+
+
+def test_search_filters_by_kind_and_limits_results():
+    catalog = ResourceCatalog.build(DOCUMENTS)
+
+    courses = catalog.search("python kubernetes", k=5, kind="course")
+    assert {r["kind"] for r in courses} == {"course"}
+    assert len(courses) == 2
+    assert len(catalog.search("python kubernetes", k=1)) == 1
+    assert catalog.search("haskell") == []
+
+
+def test_saved_index_ranks_like_the_built_one(tmp_path):
+    catalog = ResourceCatalog.build(DOCUMENTS, source_hash="abc")
+    path = str(tmp_path / "index.json")
+    catalog.save(path)
+
+    loaded = ResourceCatalog.load(path)
+
+    assert loaded.source_hash == "abc"
+    for query in ("python", "kubernetes containers", "backend interview"):
+        assert loaded.search(query) == catalog.search(query)
+
+
+def test_bundled_catalog_finds_resources_for_each_kind():
+    catalog = ResourceCatalog.from_file(str(DEFAULT_CATALOG_PATH))
+
+    for kind in ("course", "project", "interview"):
+        results = catalog.search("Python backend developer", kind=kind)
+        assert results, kind
+        assert results == sorted(results, key=lambda r: r["score"], reverse=True)
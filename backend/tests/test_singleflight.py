@@ -0,0 +1,131 @@
+"""Tests for single-flight call coalescing (app.services.singleflight)."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def run_in_threads(*targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)  # Start order decides the leader
+    for thread in threads:
+        thread.join(timeout=10)
+
+
+def test_concurrent_blocking_callers_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    run_in_threads(*[lambda: results.append(flight.do_blocking("k", work)) for _ in range(3)])
+
+    assert len(calls) == 1
+    assert sorted(results) == [("answer", False), ("answer", True), ("answer", True)]
+    assert flight.get_stats()["in_flight"] == 0
+
+
+def test_leader_deadline_does_not_fail_followers_with_more_time():
+    flight = SingleFlight("test")
+    outcomes = {}
+
+    def work(deadline: float) -> str:
+        # A generation that takes 0.3s, abandoned once the caller's deadline passes
+        finishes_at = time.monotonic() + 0.3
+        while time.monotonic() < finishes_at:
+            if time.monotonic() > deadline:
+                raise TimeoutError("caller out of time")
+            time.sleep(0.01)
+        return "answer"
+
+    def caller(name: str, budget: float):
+        deadline = time.monotonic() + budget
+        try:
+            outcomes[name] = flight.do_blocking("k", lambda: work(deadline), timeout=budget)
+        except TimeoutError:
+            outcomes[name] = "timed out"
+
+    run_in_threads(lambda: caller("short", 0.1), lambda: caller("long", 5.0))
+
+    assert outcomes["short"] == "timed out"
+    assert outcomes["long"] == ("answer", False)
+
+
+def test_async_follower_retries_after_blocking_leader_times_out():
+    flight = SingleFlight("test")
+    leader_error = []
+
+    def leader():
+        def work():
+            time.sleep(0.1)
+            raise TimeoutError("leader out of time")
+        try:
+            flight.do_blocking("k", work)
+        except TimeoutError as e:
+            leader_error.append(e)
+
+    async def follower():
+        await asyncio.sleep(0.05)
+
+        async def work():
+            return "answer"
+        return await flight.do("k", work)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    result = asyncio.run(follower())
+    thread.join()
+
+    assert leader_error
+    assert result == ("answer", False)
+
+
+def test_leader_errors_propagate_to_followers():
+    flight = SingleFlight("test")
+    errors = []
+
+    def work():
+        time.sleep(0.2)
+        raise ValueError("broken")
+
+    def caller():
+        try:
+            flight.do_blocking("k", work)
+        except ValueError as e:
+            errors.append(str(e))
+
+    run_in_threads(caller, caller)
+
+    assert errors == ["broken", "broken"]
+    assert flight.get_stats()["executions"] == 1
+
+
+def test_cancelled_async_leader_hands_over_to_follower():
+    flight = SingleFlight("test")
+
+    async def main():
+        async def slow():
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "answer"
+
+        leader = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do("k", fast))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ("answer", False)
@@ -0,0 +1,46 @@
+"""Tests for the FAISS vector store's embedding path (app.services.vector_store)."""
+import threading
+
+import pytest
+
+from app.services import vector_store
+from app.services.admission import AdmissionController
+from app.services.ollama_pool import OllamaPool
+from benchmarks.fake_ollama import FakeOllamaServer
+
+
+@pytest.fixture
+def store(monkeypatch):
+    server = FakeOllamaServer(embed_latency=0.05, embed_dim=16).start()
+    monkeypatch.setattr(vector_store, "get_embedding_pool", lambda: OllamaPool("embedding", [server.base_url]))
+    monkeypatch.setattr(vector_store.settings, "VECTOR_STORE_INDEX_PATH", "")
+    yield vector_store.VectorStore()
+    server.stop()
+
+
+def test_blocking_embeddings_take_embedding_admission_slots(store, monkeypatch):
+    admission = AdmissionController("embedding", max_concurrent=1, max_queue=10)
+    monkeypatch.setattr(vector_store, "embedding_admission", admission)
+    peak = []
+    original_call = store.embedding_pool.call
+
+    def observed_call(fn):
+        peak.append(admission.active)
+        return original_call(fn)
+
+    monkeypatch.setattr(store.embedding_pool, "call", observed_call)
+    threads = [threading.Thread(target=store._embed, args=(f"text {i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert admission.admitted == 4
+    assert max(peak) == 1
+    assert admission.active == 0
+
+
+def test_add_texts_and_search(store):
+    assert store.ready
+    assert store.add_texts(["Python and Django", "Kubernetes operators"]) == 2
+    assert store.search("Python and Django", k=1) == ["Python and Django"]
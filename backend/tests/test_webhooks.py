@@ -0,0 +1,134 @@
+"""Tests for the job webhook target checks (app.core.webhooks)."""
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.core import webhooks
+from app.services import jobs
+
+
+class Receiver:
+    """Local HTTP server recording the requests it receives."""
+
+    def __init__(self):
+        self.requests = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                receiver.requests.append({"host": self.headers["Host"], "path": self.path})
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def receiver():
+    server = Receiver()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def fake_dns(monkeypatch):
+    """Answers lookups of ``*.test`` hosts from a list of addresses, one per lookup."""
+    answers = []
+    lookups = []
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if isinstance(host, bytes):
+            host = host.decode()
+        if not str(host).endswith(".test"):
+            return real_getaddrinfo(host, port, *args, **kwargs)
+        lookups.append(host)
+        address = answers[min(len(lookups), len(answers)) - 1]
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, int(port or 80)))]
+
+    # The event loop and the HTTP client both resolve through socket.getaddrinfo
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return answers, lookups
+
+
+@pytest.fixture
+def fast_delivery(monkeypatch):
+    monkeypatch.setattr(jobs.settings, "JOB_WEBHOOK_RETRIES", 0)
+    monkeypatch.setattr(jobs.settings, "JOB_WEBHOOK_TIMEOUT_SECONDS", 1.0)
+
+
+def make_job(tmp_path, webhook_url: str) -> dict:
+    store = jobs.JobStore(str(tmp_path / "jobs.sqlite3"))
+    job = store.create({"topic": "ML Engineer", "resume": "x" * 20}, owner="u", webhook_url=webhook_url)
+    return {**job, "status": "completed"}
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://2130706433/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:10.0.0.1]/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://10.1.2.3/hook",
+    "http://localhost:8000/hook",
+])
+def test_job_request_rejects_internal_webhook_targets(url):
+    from app.models.schemas import JobRequest
+
+    with pytest.raises(ValueError):
+        JobRequest(topic="ML Engineer", resume="x" * 20, webhook_url=url)
+
+
+def test_delivery_refuses_host_resolving_to_loopback(tmp_path, receiver, fake_dns, fast_delivery):
+    answers, _ = fake_dns
+    answers.append("127.0.0.1")
+    job = make_job(tmp_path, f"http://hook.test:{receiver.port}/done")
+
+    assert asyncio.run(jobs.notify_webhook(job)) == "failed"
+    assert receiver.requests == []
+
+
+def test_delivery_is_not_redirected_by_dns_rebinding(tmp_path, receiver, fake_dns, fast_delivery):
+    # The check sees a public address; a second lookup would return loopback
+    answers, lookups = fake_dns
+    answers.extend(["1.1.1.1", "127.0.0.1"])
+    job = make_job(tmp_path, f"http://hook.test:{receiver.port}/done")
+
+    asyncio.run(jobs.notify_webhook(job))
+
+    assert lookups == ["hook.test"]
+    assert receiver.requests == []
+
+
+def test_pinned_transport_keeps_host_header(receiver):
+    async def post():
+        async with webhooks.webhook_client("127.0.0.1", timeout=5) as client:
+            return await client.post(f"http://hook.test:{receiver.port}/done", json={})
+
+    response = asyncio.run(post())
+
+    assert response.status_code == 200
+    assert receiver.requests == [{"host": f"hook.test:{receiver.port}", "path": "/done"}]
+
+
+def test_allowed_hosts_skip_the_address_check(monkeypatch):
+    monkeypatch.setattr(webhooks.settings, "JOB_WEBHOOK_ALLOWED_HOSTS", ["localhost"])
+
+    assert asyncio.run(webhooks.resolve_webhook_host("localhost", 80)) is None
+    with pytest.raises(ValueError):
+        asyncio.run(webhooks.resolve_webhook_host("127.0.0.1", 80))
@@ -161,7 +161,7 @@ export const roadmapApi = {
           try {
             const parsed = JSON.parse(data)
             
-            if (parsed.status === 'complete' && parsed.result) {
+            if ((parsed.status === 'complete' || parsed.status === 'partial') && parsed.result) {
               finalResult = parsed.result
             } else if (parsed.status === 'error') {
               throw new Error(parsed.error || 'Unknown error occurred')
@@ -161,6 +161,7 @@ python-dotenv
 langchain-ollama
 langchain-core
 langgraph
+langgraph-checkpoint-sqlite
 
 # Vector store and embeddings
 faiss-cpu
@@ -566,17 +567,52 @@ PyJWT
             print("  Backend:  cd backend && ../venv/bin/uvicorn app.main:app --reload")
             print("  Frontend: cd frontend && npm run dev")
 
+    def worker(self, args):
+        """Run a standalone job worker that leases roadmap jobs from the shared queue."""
+        self.print_header("Starting Mapey Job Worker")
+        
+        python = self.get_venv_python() if self.check_venv() else Path(sys.executable)
+        self.print_step(f"Leasing jobs from the queue in {self.backend_dir / 'cache'} (Ctrl+C to stop)")
+        try:
+            result = subprocess.run([str(python), "-m", "app.worker", *args], cwd=self.backend_dir)
+        except KeyboardInterrupt:
+            return
+        sys.exit(result.returncode)
+
+    def catalog(self, args):
+        """Rebuild (or search) the local resource catalog index."""
+        self.print_header("Mapey Resource Catalog")
+        
+        python = self.get_venv_python() if self.check_venv() else Path(sys.executable)
+        result = subprocess.run([str(python), "-m", "app.catalog", *args], cwd=self.backend_dir)
+        sys.exit(result.returncode)
+
+    def bench(self, args):
+        """Load-test the API locally against simulated Ollama and web search backends."""
+        self.print_header("Mapey Load Test")
+        
+        python = self.get_venv_python() if self.check_venv() else Path(sys.executable)
+        self.print_step("Driving the API with simulated Ollama and search (no GPU needed)")
+        try:
+            result = subprocess.run([str(python), "-m", "benchmarks.load_test", *args], cwd=self.backend_dir)
+        except KeyboardInterrupt:
+            return
+        sys.exit(result.returncode)
+
 
 def main():
     """Main CLI entry point."""
     if len(sys.argv) < 2:
-        print("Usage: python -m mapey [setup|start|rebuild|dev]")
+        print("Usage: python -m mapey [setup|start|rebuild|dev|worker|catalog|bench]")
         print("\nCommands:")
         print("  setup   - Set up the project (venv, dependencies, env files)")
         print("  start   - Start the application with Docker Compose (does not rebuild images)")
         print("  stop    - Stop all Docker containers")
         print("  rebuild - Force rebuild Docker images with no cache and restart containers")
         print("  dev     - Run locally: Ollama (Docker) + Backend/Frontend (Local)")
+        print("  worker  - Run a job worker leasing roadmap jobs (--concurrency N, --worker-id ID)")
+        print("  catalog - Rebuild the local resource catalog index (or: catalog search QUERY)")
+        print("  bench   - Load-test the API against simulated Ollama (--concurrency N, --requests N, --mix ...)")
         sys.exit(1)
     
     command = sys.argv[1].lower()
@@ -592,9 +628,15 @@ def main():
         manager.rebuild()
     elif command == "dev":
         manager.dev()
+    elif command == "worker":
+        manager.worker(sys.argv[2:])
+    elif command == "catalog":
+        manager.catalog(sys.argv[2:])
+    elif command == "bench":
+        manager.bench(sys.argv[2:])
     else:
         print(f"Unknown command: {command}")
-        print("Available commands: setup, start, stop, rebuild, dev")
+        print("Available commands: setup, start, stop, rebuild, dev, worker, catalog, bench")
         sys.exit(1)
 
 